@@ -0,0 +1,54 @@
+"""
+Benchmark del escaneo del catálogo de imágenes (data/Poke_Img) según número de workers.
+Cada combinación se repite varias veces y se reporta la mediana y el mínimo.
+Con --drop-caches (Linux, requiere root) se vacía el page cache antes de cada
+escaneo para simular un arranque en frío.
+
+Uso: python Tests/bench_image_catalog_scan.py [--workers 1,2,4,8,16] [--repeat 5] [--drop-caches]
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVICE_DIR = os.path.join(ROOT_DIR, 'services', 'poke_images_service')
+IMAGES_DIR = os.path.join(ROOT_DIR, 'data', 'Poke_Img')
+
+def drop_caches():
+    """Vaciar el page cache y los dentries/inodes del kernel"""
+    os.sync()
+    with open('/proc/sys/vm/drop_caches', 'w') as f:
+        f.write('3\n')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', default='1,2,4,8,16,32')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--drop-caches', action='store_true')
+    args = parser.parse_args()
+
+    sys.path.insert(0, SERVICE_DIR)
+    from image_catalog import ImageCatalog
+    # El logger del servicio escribe una línea por construcción; no interesa aquí
+    import logging
+    logging.getLogger('poke_images_service').disabled = True
+
+    print(f"Dataset: {IMAGES_DIR}")
+    for workers in [int(value) for value in args.workers.split(',')]:
+        samples = []
+        snapshot = None
+        for _ in range(args.repeat):
+            if args.drop_caches:
+                drop_caches()
+            catalog = ImageCatalog(IMAGES_DIR, scan_workers=workers)
+            start = time.perf_counter()
+            snapshot = catalog.build()
+            samples.append((time.perf_counter() - start) * 1000)
+        print(f"workers={workers:<3} files={snapshot.file_count} "
+              f"size={snapshot.total_size_bytes / 1024 / 1024:.1f}MB "
+              f"p50={statistics.median(samples):8.2f}ms min={min(samples):8.2f}ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark de latencia por petición de poke_api_service según el modo de logging:
+- off: nivel CRITICAL (los mensajes se descartan antes de formatearse)
+- sync: handlers de archivo y consola en el hilo de la petición
+- async: cola acotada + hilo escritor (por defecto)
+Las peticiones se sirven desde la caché (tras una pasada contra el stub local
+de PokeAPI). Cada modo corre en un proceso nuevo; la consola va a /dev/null.
+
+Uso: python Tests/bench_logging.py [peticiones] [hilos]
+"""
+import os
+import sys
+import json
+import tempfile
+import subprocess
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVICE_DIR = os.path.join(ROOT_DIR, 'services', 'poke_api_service')
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+WORKER_CODE = """
+import os, sys, time, json, statistics
+from concurrent.futures import ThreadPoolExecutor
+sys.path.insert(0, os.environ['BENCH_TESTS_DIR'])
+from stub_pokeapi import start_stub_server
+server, base_url = start_stub_server()
+os.environ['POKE_API_BASE_URL'] = base_url
+from app import app
+from logger import get_logging_stats
+requests_count, threads = int(sys.argv[1]), int(sys.argv[2])
+names = [f"pokemon-{i}" for i in range(50)]
+client = app.test_client()
+for name in names:
+    client.get(f"/pokemon/{name}")
+
+def timed(i):
+    start = time.perf_counter()
+    assert client.get(f"/pokemon/{names[i % len(names)]}").status_code == 200
+    return (time.perf_counter() - start) * 1000
+
+start = time.perf_counter()
+with ThreadPoolExecutor(max_workers=threads) as executor:
+    samples = sorted(executor.map(timed, range(requests_count)))
+elapsed = time.perf_counter() - start
+server.shutdown()
+print(json.dumps({
+    "p50": statistics.median(samples),
+    "p95": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+    "throughput": requests_count / elapsed,
+    "logging": get_logging_stats()
+}))
+"""
+
+MODES = {
+    "off": {'POKE_API_LOG_LEVEL': 'CRITICAL'},
+    "sync": {'POKE_API_LOG_ASYNC': '0'},
+    "async": {'POKE_API_LOG_ASYNC': '1'},
+}
+
+def run_worker(mode_env, requests_count, threads, work_dir):
+    env = dict(
+        os.environ, **mode_env,
+        BENCH_TESTS_DIR=TESTS_DIR,
+        POKE_API_LOG_DIR=os.path.join(work_dir, 'logs'),
+        POKE_API_CACHE_PATH=os.path.join(work_dir, 'cache.sqlite3')
+    )
+    output = subprocess.run(
+        [sys.executable, '-c', WORKER_CODE, str(requests_count), str(threads)], cwd=SERVICE_DIR, env=env,
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    requests_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+
+    print(f"{requests_count} cached requests, {threads} thread(s)")
+    for label, mode_env in MODES.items():
+        result = run_worker(mode_env, requests_count, threads, tempfile.mkdtemp())
+        stats = result["logging"]
+        dropped = f" dropped={stats['dropped']}" if stats.get("async") else ""
+        print(f"{label:<6} p50={result['p50']:7.3f}ms p95={result['p95']:7.3f}ms "
+              f"throughput={result['throughput']:8.1f} req/s{dropped}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""
+Comparación de carga de poke_api_service: app.py (Flask, un hilo por petición)
+vs async_app.py (aiohttp, un solo event loop) contra el stub local de PokeAPI.
+Cada petición usa un nombre distinto para que todas lleguen al upstream. El stub
+corre en su propio proceso y el umbral de llamadas lentas del circuit breaker se
+eleva para medir el modelo de servidor y no el breaker. Por defecto el stub sirve
+el documento reducido para que el parseo JSON no domine en máquinas con pocos núcleos.
+Reporta latencia p50/p95, throughput, errores y el pico de hilos del servidor.
+
+Uso: python Tests/bench_poke_api_async.py [peticiones] [concurrencia] [retardo_upstream_ms] [small|full]
+"""
+import os
+import sys
+import time
+import asyncio
+import tempfile
+import threading
+import statistics
+import subprocess
+import aiohttp
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVICE_DIR = os.path.join(ROOT_DIR, 'services', 'poke_api_service')
+
+SERVERS = {
+    "flask (threaded)": "from app import app; app.run(host='127.0.0.1', port={port}, threaded=True)",
+    "aiohttp (asyncio)": "from aiohttp import web; from async_app import create_app; web.run_app(create_app(), host='127.0.0.1', port={port}, access_log=None, print=None)"
+}
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def thread_count(pid):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith('Threads:'):
+                return int(line.split()[1])
+    return 0
+
+async def wait_ready(url, timeout=20):
+    deadline = time.time() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.time() < deadline:
+            try:
+                async with session.get(f"{url}/health") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not start")
+
+async def load(url, label, requests_count, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    samples = []
+    errors = 0
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    timeout = aiohttp.ClientTimeout(total=60)
+
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        async def one(i):
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    async with session.get(f"{url}/pokemon/{label}-{i}") as response:
+                        await response.read()
+                        if response.status != 200:
+                            errors += 1
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    errors += 1
+                samples.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests_count)))
+        return samples, errors, time.perf_counter() - start
+
+def run(label, command, port, base_url, cache_dir, requests_count, concurrency):
+    env = dict(os.environ, POKE_API_BASE_URL=base_url, POKE_API_BREAKER_SLOW_CALL_MS='60000',
+               POKE_API_LOG_DIR=os.path.join(cache_dir, f"logs-{port}"),
+               POKE_API_CACHE_PATH=os.path.join(cache_dir, f"{port}.sqlite3"))
+    process = subprocess.Popen(
+        [sys.executable, '-c', command.format(port=port)], cwd=SERVICE_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    peak_threads = 0
+    stop = threading.Event()
+
+    def sample_threads():
+        nonlocal peak_threads
+        while not stop.wait(0.05):
+            try:
+                peak_threads = max(peak_threads, thread_count(process.pid))
+            except OSError:
+                return
+
+    url = f"http://127.0.0.1:{port}"
+    try:
+        asyncio.run(wait_ready(url))
+        sampler = threading.Thread(target=sample_threads, daemon=True)
+        sampler.start()
+        samples, errors, elapsed = asyncio.run(load(url, port, requests_count, concurrency))
+        stop.set()
+        sampler.join()
+    finally:
+        process.terminate()
+        process.wait()
+    print(f"{label:<18} p50={statistics.median(samples):8.2f}ms p95={percentile(samples, 0.95):8.2f}ms "
+          f"throughput={requests_count / elapsed:8.1f} req/s errors={errors} peak_threads={peak_threads}")
+
+def main():
+    requests_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    delay_ms = float(sys.argv[3]) if len(sys.argv) > 3 else 100
+    document = sys.argv[4] if len(sys.argv) > 4 else 'small'
+
+    stub_port = 5900
+    stub = subprocess.Popen(
+        [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'stub_pokeapi.py'), str(stub_port), str(delay_ms), document],
+        stdout=subprocess.DEVNULL
+    )
+    base_url = f"http://127.0.0.1:{stub_port}/api/v2/pokemon"
+    time.sleep(1)
+
+    print(f"Stub: {base_url} (delay {delay_ms}ms, {document} document) - Requests: {requests_count} - Concurrency: {concurrency}")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for offset, (label, command) in enumerate(SERVERS.items()):
+            run(label, command, stub_port + 1 + offset, base_url, cache_dir, requests_count, concurrency)
+    stub.terminate()
+    stub.wait()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark de PokeApiClient contra un stub local: requests.get por petición
+(una conexión nueva cada vez) vs la sesión con pool keep-alive del cliente.
+Reporta latencia p50/p95 y conexiones abiertas en el stub.
+
+Uso: python Tests/bench_poke_api_pooling.py [peticiones] [hilos]
+"""
+import os
+import sys
+import tempfile
+import time
+import logging
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVICE_DIR = os.path.join(ROOT_DIR, 'services', 'poke_api_service')
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def run(label, fetch, requests_count, threads, handler_class):
+    handler_class.connection_count = 0
+    handler_class.request_count = 0
+
+    def timed(i):
+        start = time.perf_counter()
+        fetch(f"pokemon-{i % 50}")
+        return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        samples = list(executor.map(timed, range(requests_count)))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<18} p50={statistics.median(samples):7.2f}ms p95={percentile(samples, 0.95):7.2f}ms "
+          f"throughput={requests_count / elapsed:8.1f} req/s connections={handler_class.connection_count}")
+
+def main():
+    requests_count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from stub_pokeapi import start_stub_server
+    server, base_url = start_stub_server()
+    handler_class = server.RequestHandlerClass
+    os.environ['POKE_API_BASE_URL'] = base_url
+    work_dir = tempfile.mkdtemp()
+    os.environ['POKE_API_CACHE_PATH'] = os.path.join(work_dir, 'cache.sqlite3')
+    os.environ['POKE_API_LOG_DIR'] = os.path.join(work_dir, 'logs')
+
+    sys.path.insert(0, SERVICE_DIR)
+    import requests
+    from poke_client import PokeApiClient
+    logging.getLogger('poke_api_service').disabled = True
+    client = PokeApiClient()
+
+    def fetch_unpooled(name):
+        response = requests.get(f"{base_url}/{name}", timeout=client.timeout)
+        response.json()
+
+    def fetch_pooled(name):
+        response = client.session.get(f"{base_url}/{name}", timeout=client.timeout)
+        response.json()
+
+    print(f"Stub: {base_url} - Requests: {requests_count} - Threads: {threads}")
+    run("requests.get", fetch_unpooled, requests_count, threads, handler_class)
+    run("pooled session", fetch_pooled, requests_count, threads, handler_class)
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Medición de lo que ahorran el registro normalizado y la proyección ?fields=
+en poke_api_service, contra el stub local de PokeAPI (documento completo).
+- Por consulta al upstream: bytes descargados y tiempo de parseo vs bytes del
+  registro que se guarda en la caché.
+- Por petición servida desde caché: bytes de respuesta y tiempo de serialización
+  de la respuesta completa vs proyectada.
+
+Uso: python Tests/bench_poke_api_projection.py [nombres] [campos]
+"""
+import os
+import sys
+import time
+import logging
+import tempfile
+import statistics
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVICE_DIR = os.path.join(ROOT_DIR, 'services', 'poke_api_service')
+
+def measure(client, path, names):
+    """Bytes medios de respuesta y mediana de latencia (ms) para una ruta"""
+    sizes = []
+    samples = []
+    for name in names:
+        start = time.perf_counter()
+        response = client.get(path.format(name=name))
+        samples.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, response.status_code
+        sizes.append(len(response.data))
+    return statistics.mean(sizes), statistics.median(samples)
+
+def main():
+    names_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    fields = sys.argv[2] if len(sys.argv) > 2 else 'stats,types'
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from stub_pokeapi import start_stub_server
+    server, base_url = start_stub_server()
+    cache_dir = tempfile.mkdtemp()
+    os.environ['POKE_API_BASE_URL'] = base_url
+    os.environ['POKE_API_CACHE_PATH'] = os.path.join(cache_dir, 'cache.sqlite3')
+    os.environ['POKE_API_LOG_DIR'] = os.path.join(cache_dir, 'logs')
+
+    sys.path.insert(0, SERVICE_DIR)
+    os.chdir(SERVICE_DIR)
+    from app import app, poke_client
+    logging.getLogger('poke_api_service').disabled = True
+    client = app.test_client()
+    names = [f"pokemon-{i}" for i in range(names_count)]
+
+    # Primera pasada: todas las consultas van al upstream y llenan la caché
+    measure(client, '/pokemon/{name}', names)
+    payload = poke_client.payload_stats.get_stats()
+    print(f"Upstream fetches: {payload['upstream_fetches']}")
+    print(f"  upstream document  {payload['avg_upstream_bytes']:>8} bytes  parse {payload['avg_upstream_parse_ms']:.3f}ms")
+    print(f"  cached record      {payload['avg_record_bytes']:>8} bytes  ({payload['bytes_saved_ratio'] * 100:.1f}% less per entry)")
+
+    # Segunda pasada: servido desde caché, completo vs proyectado
+    full_bytes, full_ms = measure(client, '/pokemon/{name}', names)
+    projected_bytes, projected_ms = measure(client, f'/pokemon/{{name}}?fields={fields}', names)
+    print(f"Cached responses ({names_count} names):")
+    print(f"  full               {full_bytes:>8.0f} bytes  p50 {full_ms:.3f}ms")
+    print(f"  fields={fields:<11} {projected_bytes:>8.0f} bytes  p50 {projected_ms:.3f}ms  "
+          f"({(1 - projected_bytes / full_bytes) * 100:.1f}% fewer bytes)")
+
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
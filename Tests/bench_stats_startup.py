@@ -0,0 +1,68 @@
+"""
+Benchmark de arranque en frío de poke_stats_service: CSV vs snapshot binario.
+Cada medición corre en un proceso nuevo (import + primera carga del dataset)
+y reporta tiempo de arranque y RSS máximo del worker.
+
+Uso: python Tests/bench_stats_startup.py [repeticiones]
+"""
+import os
+import sys
+import json
+import statistics
+import subprocess
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVICE_DIR = os.path.join(ROOT_DIR, 'services', 'poke_stats_service')
+
+WORKER_CODE = """
+import time, json, resource
+def peak_rss_kb():
+    # VmHWM es por proceso; ru_maxrss puede heredar el pico del padre tras fork+exec
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+from stats_handler import StatsHandler
+handler = StatsHandler()
+handler.get_stats_index()
+elapsed = (time.perf_counter() - start) * 1000
+info = handler.get_dataset_info()
+print(json.dumps({
+    "startup_ms": elapsed,
+    "rss_kb": peak_rss_kb(),
+    "source": info.get("source")
+}))
+"""
+
+def run_worker(use_snapshot):
+    env = dict(os.environ, POKE_STATS_USE_SNAPSHOT='1' if use_snapshot else '0')
+    output = subprocess.run(
+        [sys.executable, '-c', WORKER_CODE], cwd=SERVICE_DIR, env=env,
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def summarize(label, samples):
+    startup = [s["startup_ms"] for s in samples]
+    rss = [s["rss_kb"] / 1024 for s in samples]
+    print(f"{label:<10} source={samples[0]['source']:<9} "
+          f"startup p50={statistics.median(startup):8.2f}ms min={min(startup):8.2f}ms "
+          f"rss p50={statistics.median(rss):7.1f}MB")
+
+def main():
+    repetitions = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    sys.path.insert(0, SERVICE_DIR)
+    from stats_snapshot import write_snapshot
+    snapshot_path, rows = write_snapshot(os.path.join(ROOT_DIR, 'data', 'Poke_stats.csv'))
+    print(f"Snapshot: {snapshot_path} ({os.path.getsize(snapshot_path)} bytes, {rows} rows)")
+
+    summarize("csv", [run_worker(False) for _ in range(repetitions)])
+    summarize("snapshot", [run_worker(True) for _ in range(repetitions)])
+
+if __name__ == '__main__':
+    main()
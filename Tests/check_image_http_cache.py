@@ -0,0 +1,62 @@
+"""
+Verificación de caché HTTP en poke_images_service (sin levantar el servidor).
+Usa el test client de Flask para pedir la misma imagen varias veces como lo
+haría un navegador (reenviando ETag / Last-Modified) y compara los bytes
+transferidos contra peticiones sin validadores. También prueba Range.
+
+Uso: python Tests/check_image_http_cache.py [pokemon] [image_name] [repeticiones]
+"""
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVICE_DIR = os.path.join(ROOT_DIR, 'services', 'poke_images_service')
+
+def main():
+    pokemon = sys.argv[1] if len(sys.argv) > 1 else 'Pikachu'
+    image_name = sys.argv[2] if len(sys.argv) > 2 else '0.jpg'
+    repetitions = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+
+    os.chdir(SERVICE_DIR)
+    sys.path.insert(0, SERVICE_DIR)
+    import logging
+    from app import app
+    logging.getLogger('poke_images_service').disabled = True
+
+    client = app.test_client()
+    url = f"/pokemon/{pokemon}/image/{image_name}"
+
+    # Sin validadores: cada petición transfiere la imagen completa
+    uncached_bytes = 0
+    for _ in range(repetitions):
+        response = client.get(url)
+        assert response.status_code == 200, response.status_code
+        uncached_bytes += len(response.data)
+
+    # Con validadores: solo la primera petición transfiere el cuerpo
+    first = client.get(url)
+    etag = first.headers['ETag']
+    last_modified = first.headers['Last-Modified']
+    cached_bytes = len(first.data)
+    statuses = [first.status_code]
+    for _ in range(repetitions - 1):
+        response = client.get(url, headers={"If-None-Match": etag})
+        statuses.append(response.status_code)
+        cached_bytes += len(response.data)
+    assert all(status == 304 for status in statuses[1:]), statuses
+
+    response = client.get(url, headers={"If-Modified-Since": last_modified})
+    assert response.status_code == 304, response.status_code
+
+    response = client.get(url, headers={"Range": "bytes=0-1023"})
+    assert response.status_code == 206, response.status_code
+    assert len(response.data) == 1024, len(response.data)
+
+    print(f"URL: {url}")
+    print(f"ETag: {etag} - Last-Modified: {last_modified} - Cache-Control: {first.headers.get('Cache-Control')}")
+    print(f"Without validators: {uncached_bytes} bytes in {repetitions} requests")
+    print(f"With validators:    {cached_bytes} bytes in {repetitions} requests (statuses: {statuses})")
+    print(f"Range bytes=0-1023: 206 - {len(response.data)} bytes")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Verificación de la ingesta de telemetría de search_api (sin levantar servicios).
+Escribe un extracto real de la telemetría de poke_stats_service en un directorio
+temporal (en JSON-lines y en binario), lo pasa por LogIngester y comprueba que
+cada petición aporta una sola muestra (un 404 sigue contando como disponible).
+
+Uso: python Tests/check_log_ingest.py
+"""
+import os
+import sys
+import json
+import tempfile
+from collections import Counter
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVICE_DIR = os.path.join(ROOT_DIR, 'services', 'search_api')
+
+# Extracto de services/logs/poke_stats_service/telemetry: una petición a cada ruta
+# (Pikachu, un nombre inexistente, un lote, una consulta y /health)
+STATS_TELEMETRY_EXCERPT = """\
+{"ts":1792259469.7384124,"endpoint":"get_pokemon_stats","method":"GET","status":200,"latency_ms":0.419,"downstream_ms":null,"response_bytes":292}
+{"ts":1792259469.7393723,"endpoint":"get_pokemon_stats","method":"GET","status":404,"latency_ms":0.377,"downstream_ms":null,"response_bytes":45}
+{"ts":1792259469.740108,"endpoint":"get_batch_pokemon_stats","method":"POST","status":200,"latency_ms":0.321,"downstream_ms":null,"response_bytes":407}
+{"ts":1792259469.7413259,"endpoint":"query_stats","method":"GET","status":200,"latency_ms":0.868,"downstream_ms":null,"response_bytes":521}
+{"ts":1792259469.741931,"endpoint":"health_check","method":"GET","status":200,"latency_ms":0.202,"downstream_ms":null,"response_bytes":651}
+"""
+
+EXPECTED_SAMPLES = {
+    "poke_stats:get_pokemon_stats": 2,
+    "poke_stats:get_batch_pokemon_stats": 1,
+    "poke_stats:query_stats": 1,
+    "poke_stats:health_check": 1,
+    # La serie del módulo excluye los health checks
+    "poke_stats": 4,
+}
+
+class RecordingStore:
+    """Store mínima: cuenta las muestras por serie y las no disponibles (status 5xx)"""
+    def __init__(self):
+        self.samples = Counter()
+        self.unavailable = Counter()
+
+    def record(self, module, timestamp, latency_ms, available):
+        self.samples[module] += 1
+        if not available:
+            self.unavailable[module] += 1
+
+    def flush(self):
+        return True
+
+def check_format(log_ingest, filename, payload, partial=b''):
+    work_dir = tempfile.mkdtemp()
+    path = os.path.join(work_dir, filename)
+    with open(path, 'wb') as telemetry_file:
+        telemetry_file.write(payload + partial)
+    log_ingest.LOG_SOURCES["poke_stats"] = (work_dir, 'poke_stats_service_')
+
+    store = RecordingStore()
+    ingester = log_ingest.LogIngester(store, modules=["poke_stats"], state_path=os.path.join(work_dir, 'state.json'))
+    ingested = ingester.ingest()
+    assert dict(store.samples) == EXPECTED_SAMPLES, dict(store.samples)
+    assert not store.unavailable, dict(store.unavailable)
+    assert ingested == 5, ingested
+    # Un registro a medio escribir no se consume: el offset queda al final del último completo
+    assert ingester.get_stats()["positions"]["poke_stats"]["offset"] == len(payload)
+
+    # Una segunda pasada no relee lo ya ingerido
+    assert ingester.ingest() == 0
+
+    print(f"{filename}: records read: {ingester.records_read} - Requests ingested: {ingested}")
+    for series, count in sorted(store.samples.items()):
+        print(f"  {series:<36} {count}")
+
+def main():
+    sys.path.insert(0, SERVICE_DIR)
+    import logging
+    import log_ingest
+    from telemetry import encode_binary
+    logging.getLogger('search_api_service').disabled = True
+
+    jsonl_payload = STATS_TELEMETRY_EXCERPT.encode('utf-8')
+    check_format(log_ingest, 'poke_stats_service_20261017.telemetry.jsonl', jsonl_payload, partial=b'{"ts":17922')
+
+    records = [json.loads(line) for line in STATS_TELEMETRY_EXCERPT.splitlines()]
+    binary_payload = b''.join(encode_binary(record) for record in records)
+    check_format(log_ingest, 'poke_stats_service_20261017.telemetry.bin', binary_payload, partial=encode_binary(records[0])[:-3])
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+Servidor HTTP local que imita /api/v2/pokemon/<nombre> de PokeAPI para benchmarks.
+Responde con keep-alive (HTTP/1.1), un documento grande parecido al real y un
+retardo configurable por petición. Los nombres 'missing*' devuelven 404.
+Con 'small' se sirve un documento reducido (sin moves ni game_indices).
+
+Uso: python Tests/stub_pokeapi.py [puerto] [retardo_ms] [small]
+"""
+import sys
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+def build_pokemon_document(name, pokemon_id=25, heavy=True):
+    """Documento con la misma forma que PokeAPI (incluye moves y game_indices voluminosos)"""
+    document = {
+        "id": pokemon_id,
+        "name": name,
+        "height": 4,
+        "weight": 60,
+        "base_experience": 112,
+        "types": [{"slot": 1, "type": {"name": "electric", "url": "https://pokeapi.co/api/v2/type/13/"}}],
+        "abilities": [
+            {"ability": {"name": "static", "url": "https://pokeapi.co/api/v2/ability/9/"}, "is_hidden": False, "slot": 1},
+            {"ability": {"name": "lightning-rod", "url": "https://pokeapi.co/api/v2/ability/31/"}, "is_hidden": True, "slot": 3}
+        ],
+        "stats": [
+            {"base_stat": value, "effort": 0, "stat": {"name": stat, "url": f"https://pokeapi.co/api/v2/stat/{i + 1}/"}}
+            for i, (stat, value) in enumerate([
+                ("hp", 35), ("attack", 55), ("defense", 40),
+                ("special-attack", 50), ("special-defense", 50), ("speed", 90)
+            ])
+        ],
+        "sprites": {
+            "front_default": f"https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/{pokemon_id}.png",
+            "back_default": f"https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/back/{pokemon_id}.png",
+            "other": {f"variant_{i}": {"front_default": f"https://example.invalid/{i}.png"} for i in range(40)}
+        },
+        "moves": [
+            {
+                "move": {"name": f"move-{i}", "url": f"https://pokeapi.co/api/v2/move/{i}/"},
+                "version_group_details": [
+                    {"level_learned_at": j, "move_learn_method": {"name": "level-up", "url": "https://pokeapi.co/api/v2/move-learn-method/1/"},
+                     "version_group": {"name": f"group-{j}", "url": f"https://pokeapi.co/api/v2/version-group/{j}/"}}
+                    for j in range(8)
+                ]
+            }
+            for i in range(100)
+        ],
+        "game_indices": [
+            {"game_index": 84, "version": {"name": f"version-{i}", "url": f"https://pokeapi.co/api/v2/version/{i}/"}}
+            for i in range(20)
+        ]
+    }
+    if not heavy:
+        document["moves"] = []
+        document["game_indices"] = []
+        document["sprites"].pop("other")
+    return document
+
+def make_handler(delay_seconds, heavy=True):
+    bodies = {}
+
+    class StubPokeApiHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        request_count = 0
+        connection_count = 0
+
+        def setup(self):
+            super().setup()
+            type(self).connection_count += 1
+
+        def do_GET(self):
+            type(self).request_count += 1
+            if delay_seconds:
+                time.sleep(delay_seconds)
+            name = self.path.rstrip('/').rsplit('/', 1)[-1]
+            if name.startswith('missing'):
+                body = b'Not Found'
+                self.send_response(404)
+                self.send_header('Content-Type', 'text/plain')
+            else:
+                # El cuerpo se serializa una sola vez por nombre: el benchmark mide la red, no el stub
+                body = bodies.get(name)
+                if body is None:
+                    body = bodies[name] = json.dumps(build_pokemon_document(name, heavy=heavy)).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubPokeApiHandler
+
+class StubServer(ThreadingHTTPServer):
+    # Cola de conexiones amplia: con el valor por defecto (5) el stub rechaza ráfagas concurrentes
+    request_queue_size = 1024
+
+def start_stub_server(port=0, delay_ms=0, heavy=True):
+    """Levantar el stub en un hilo; devuelve (server, base_url)"""
+    server = StubServer(('127.0.0.1', port), make_handler(delay_ms / 1000, heavy))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/api/v2/pokemon"
+
+if __name__ == '__main__':
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8099
+    delay_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 0
+    heavy = not (len(sys.argv) > 3 and sys.argv[3] == 'small')
+    server, base_url = start_stub_server(port, delay_ms, heavy)
+    print(f"Stub PokeAPI listening on {base_url} (delay {delay_ms}ms)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -1,90 +1,114 @@
 from flask import Flask, request, jsonify
-import time
 from datetime import datetime
-from poke_client import PokeApiClient
-from logger import setup_logger
+from poke_client import PokeApiClient, STATUS_ERROR, parse_fields, project_pokemon_info
+from logger import LOG_DIR, setup_logger, get_logging_stats
+from telemetry import init_telemetry, request_latency_ms
 
 
 app = Flask(__name__)
 logger = setup_logger()
+# Telemetría estructurada por petición (JSON-lines o binaria, con muestreo): mide
+# latencia y status de cada ruta, así que las rutas solo registran errores y avisos
+telemetry = init_telemetry(app, service='poke_api_service', env_prefix='POKE_API', log_dir=LOG_DIR)
 poke_client = PokeApiClient()
 
 @app.route('/health',methods=['GET'])
 def health_check():
     """Health check endpoint para verificar disponibilidad del servicio"""
-    start_time = time.time()
     try:
-        logger.info(f"{datetime.now().isoformat()}|POKE_API_SERVICE|HEALTH|health_check Started")
-        
         # Verificar si el servicio está funcionando
-        response = {"status": "healthy", "service": "poke_api_service", "timestamp": datetime.now().isoformat()}
-        
-        end_time = time.time()
-        latency = round((end_time - start_time) * 1000, 2)  # en milisegundos
-        
-        logger.info(f"{datetime.now().isoformat()}|POKE_API_SERVICE|HEALTH|health_check Completed - Latency: {latency}ms")
+        response = {
+            "status": "healthy",
+            "service": "poke_api_service",
+            "cache": poke_client.cache.get_stats(),
+            "single_flight": poke_client.single_flight.get_stats(),
+            "circuit_breaker": poke_client.breaker.get_stats(),
+            "stale_while_revalidate": poke_client.get_revalidation_stats(),
+            "payload": poke_client.payload_stats.get_stats(),
+            "logging": get_logging_stats(),
+            "telemetry": telemetry.get_stats() if telemetry else {"enabled": False},
+            "timestamp": datetime.now().isoformat()
+        }
         
         return jsonify(response), 200
         
     except Exception as e:
-        end_time = time.time()
-        latency = round((end_time - start_time) * 1000, 2)
-        logger.error(f"{datetime.now().isoformat()}|POKE_API_SERVICE|HEALTH|health_check Failed - Latency: {latency}ms - Error: {str(e)}")
+        logger.error("POKE_API_SERVICE|HEALTH|health_check Failed - Error: %s", e)
         return jsonify({"status": "unhealthy", "error": str(e)}), 500
     
 @app.route('/pokemon/<pokemon_name>', methods=['GET'])
 def get_pokemon(pokemon_name):
-    """Obtener información de un Pokémon desde PokeAPI"""
-    start_time = time.time()
+    """
+    Obtener información de un Pokémon desde PokeAPI.
+    ?fields=stats,types devuelve solo esos campos (más 'name').
+    """
     try:
-        logger.info(f"{datetime.now().isoformat()}|POKE_API_SERVICE|EXTERNAL_API|get_pokemon Started - Pokemon: {pokemon_name}")
+        try:
+            fields = parse_fields(request.args.get('fields'))
+        except ValueError as e:
+            logger.warning("POKE_API_SERVICE|EXTERNAL_API|get_pokemon Invalid Fields - Pokemon: %s - Error: %s", pokemon_name, e)
+            return jsonify({"error": f"Invalid query parameter: {str(e)}"}), 400
         
         # Llamar al cliente de PokeAPI
-        pokemon_data = poke_client.get_pokemon(pokemon_name.lower())
+        status, pokemon_info = poke_client.get_pokemon(pokemon_name.lower())
+        if status == STATUS_ERROR:
+            # PokeAPI caída o breaker abierto sin respaldo en caché: no es un 404
+            retry_after = poke_client.breaker.retry_after()
+            logger.warning("POKE_API_SERVICE|EXTERNAL_API|get_pokemon Upstream Unavailable - Pokemon: %s - Retry After: %s", pokemon_name, retry_after)
+            response = jsonify({"error": "PokeAPI unavailable", "retry_after_seconds": retry_after})
+            if retry_after is not None:
+                response.headers['Retry-After'] = str(retry_after)
+            return response, 503
+        pokemon_data = project_pokemon_info(pokemon_info, fields)
         
         if not pokemon_data:
-            end_time = time.time()
-            latency = round((end_time - start_time) * 1000, 2)
-            logger.warning(f"{datetime.now().isoformat()}|POKE_API_SERVICE|EXTERNAL_API|get_pokemon Not Found - Pokemon: {pokemon_name} - Latency: {latency}ms")
+            logger.warning("POKE_API_SERVICE|EXTERNAL_API|get_pokemon Not Found - Pokemon: %s", pokemon_name)
             return jsonify({"error": "Pokemon not found"}), 404
         
-        end_time = time.time()
-        latency = round((end_time - start_time) * 1000, 2)
-        
-        logger.info(f"{datetime.now().isoformat()}|POKE_API_SERVICE|EXTERNAL_API|get_pokemon Completed - Pokemon: {pokemon_name} - Latency: {latency}ms")
-        
         return jsonify({
             "pokemon": pokemon_data,
             "source": "pokeapi",
-            "latency_ms": latency,
+            "latency_ms": request_latency_ms(),
             "timestamp": datetime.now().isoformat()
         }), 200
         
     except Exception as e:
-        end_time = time.time()
-        latency = round((end_time - start_time) * 1000, 2)
-        logger.error(f"{datetime.now().isoformat()}|POKE_API_SERVICE|EXTERNAL_API|get_pokemon Failed - Pokemon: {pokemon_name} - Latency: {latency}ms - Error: {str(e)}")
+        logger.error("POKE_API_SERVICE|EXTERNAL_API|get_pokemon Failed - Pokemon: %s - Error: %s", pokemon_name, e)
         return jsonify({"error": f"Internal server error: {str(e)}"}), 500
 
 @app.route('/pokemon/batch', methods=['POST'])
 def get_pokemon_batch():
-    """Obtener información de múltiples Pokémon (para testing de carga)"""
-    start_time = time.time()
+    """
+    Obtener información de múltiples Pokémon (para testing de carga).
+    Acepta "fields" (lista o texto separado por comas) como ?fields= en /pokemon/<nombre>.
+    """
     try:
         data = request.get_json()
         pokemon_names = data.get('pokemon_names', [])
-        
-        logger.info(f"{datetime.now().isoformat()}|POKE_API_SERVICE|EXTERNAL_API|get_pokemon_batch Started - Count: {len(pokemon_names)}")
+        fields = data.get('fields')
+        if isinstance(fields, list):
+            fields = ','.join(str(field) for field in fields)
+        try:
+            fields = parse_fields(fields)
+        except ValueError as e:
+            return jsonify({"error": f"Invalid fields: {str(e)}"}), 400
         
         results = []
         for name in pokemon_names:
-            pokemon_data = poke_client.get_pokemon_data(name.lower())
+            status, pokemon_info = poke_client.get_pokemon(name.lower())
+            pokemon_data = project_pokemon_info(pokemon_info, fields)
             if pokemon_data:
                 results.append({
                     "name": name,
                     "data": pokemon_data,
                     "status": "success"
                 })
+            elif status == STATUS_ERROR:
+                results.append({
+                    "name": name,
+                    "data": None,
+                    "status": "unavailable"
+                })
             else:
                 results.append({
                     "name": name,
@@ -92,27 +116,20 @@ def get_pokemon_batch():
                     "status": "not_found"
                 })
         
-        end_time = time.time()
-        latency = round((end_time - start_time) * 1000, 2)
-        
-        logger.info(f"{datetime.now().isoformat()}|POKE_API_SERVICE|EXTERNAL_API|get_pokemon_batch Completed - Count: {len(pokemon_names)} - Latency: {latency}ms")
-        
         return jsonify({
             "results": results,
             "total_processed": len(pokemon_names),
             "successful": len([r for r in results if r["status"] == "success"]),
-            "latency_ms": latency,
+            "latency_ms": request_latency_ms(),
             "timestamp": datetime.now().isoformat()
         }), 200
         
     except Exception as e:
-        end_time = time.time()
-        latency = round((end_time - start_time) * 1000, 2)
-        logger.error(f"{datetime.now().isoformat()}|POKE_API_SERVICE|EXTERNAL_API|get_pokemon_batch Failed - Latency: {latency}ms - Error: {str(e)}")
+        logger.error("POKE_API_SERVICE|EXTERNAL_API|get_pokemon_batch Failed - Error: %s", e)
         return jsonify({"error": f"Internal server error: {str(e)}"}), 500
 
 if __name__ == '__main__':
-    logger.info(f"{datetime.now().isoformat()}|POKE_API_SERVICE|SYSTEM|startup Service starting on port 5001")
+    logger.info("POKE_API_SERVICE|SYSTEM|startup Service starting on port 5001")
     app.run(host='0.0.0.0', port=5001, debug=True)
 
     
\ No newline at end of file
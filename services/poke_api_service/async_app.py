@@ -0,0 +1,110 @@
+"""
+Modo de ejecución asyncio de poke_api_service (aiohttp).
+Expone las mismas rutas que app.py (/health y /pokemon/<nombre>) con las mismas
+respuestas, pero todas las peticiones comparten un único event loop: las llamadas
+en vuelo hacia PokeAPI no ocupan un hilo cada una.
+
+Uso (en lugar de app.py): python async_app.py
+"""
+import os
+import asyncio
+import time
+from datetime import datetime
+from aiohttp import web
+from async_poke_client import AsyncPokeApiClient
+from poke_client import STATUS_ERROR, parse_fields, project_pokemon_info
+from logger import LOG_DIR, setup_logger, get_logging_stats
+from telemetry import init_aiohttp_telemetry
+
+POKE_API_ASYNC_PORT = int(os.environ.get('POKE_API_ASYNC_PORT', 5001))
+
+logger = setup_logger()
+routes = web.RouteTableDef()
+CLIENT_KEY = web.AppKey('poke_client', AsyncPokeApiClient)
+TELEMETRY_KEY = web.AppKey('telemetry', object)
+
+@routes.get('/health')
+async def health_check(request):
+    """Health check endpoint para verificar disponibilidad del servicio"""
+    poke_client = request.app[CLIENT_KEY]
+    try:
+        response = {
+            "status": "healthy",
+            "service": "poke_api_service",
+            "mode": "asyncio",
+            "cache": await asyncio.to_thread(poke_client.cache.get_stats),
+            "single_flight": poke_client.get_single_flight_stats(),
+            "circuit_breaker": poke_client.breaker.get_stats(),
+            "stale_while_revalidate": poke_client.get_revalidation_stats(),
+            "payload": poke_client.payload_stats.get_stats(),
+            "logging": get_logging_stats(),
+            "telemetry": request.app[TELEMETRY_KEY].get_stats() if request.app[TELEMETRY_KEY] else {"enabled": False},
+            "timestamp": datetime.now().isoformat()
+        }
+        return web.json_response(response, status=200)
+
+    except Exception as e:
+        logger.error("POKE_API_SERVICE|HEALTH|health_check Failed - Error: %s", e)
+        return web.json_response({"status": "unhealthy", "error": str(e)}, status=500)
+
+@routes.get('/pokemon/{pokemon_name}')
+async def get_pokemon(request):
+    """
+    Obtener información de un Pokémon desde PokeAPI.
+    ?fields=stats,types devuelve solo esos campos (más 'name').
+    """
+    # Solo para latency_ms de la respuesta: la telemetría mide la petición completa
+    start_time = time.perf_counter()
+    pokemon_name = request.match_info['pokemon_name']
+    try:
+        try:
+            fields = parse_fields(request.query.get('fields'))
+        except ValueError as e:
+            logger.warning("POKE_API_SERVICE|EXTERNAL_API|get_pokemon Invalid Fields - Pokemon: %s - Error: %s", pokemon_name, e)
+            return web.json_response({"error": f"Invalid query parameter: {str(e)}"}, status=400)
+
+        poke_client = request.app[CLIENT_KEY]
+        status, pokemon_info = await poke_client.get_pokemon(pokemon_name.lower())
+        if status == STATUS_ERROR:
+            # PokeAPI caída o breaker abierto sin respaldo en caché: no es un 404
+            retry_after = poke_client.breaker.retry_after()
+            logger.warning("POKE_API_SERVICE|EXTERNAL_API|get_pokemon Upstream Unavailable - Pokemon: %s - Retry After: %s", pokemon_name, retry_after)
+            headers = {'Retry-After': str(retry_after)} if retry_after is not None else None
+            return web.json_response({"error": "PokeAPI unavailable", "retry_after_seconds": retry_after}, status=503, headers=headers)
+        pokemon_data = project_pokemon_info(pokemon_info, fields)
+
+        if not pokemon_data:
+            logger.warning("POKE_API_SERVICE|EXTERNAL_API|get_pokemon Not Found - Pokemon: %s", pokemon_name)
+            return web.json_response({"error": "Pokemon not found"}, status=404)
+
+        return web.json_response({
+            "pokemon": pokemon_data,
+            "source": "pokeapi",
+            "latency_ms": round((time.perf_counter() - start_time) * 1000, 2),
+            "timestamp": datetime.now().isoformat()
+        }, status=200)
+
+    except Exception as e:
+        logger.error("POKE_API_SERVICE|EXTERNAL_API|get_pokemon Failed - Pokemon: %s - Error: %s", pokemon_name, e)
+        return web.json_response({"error": f"Internal server error: {str(e)}"}, status=500)
+
+async def _start_client(app):
+    await app[CLIENT_KEY].start()
+
+async def _close_client(app):
+    await app[CLIENT_KEY].close()
+
+def create_app():
+    """Crear la aplicación aiohttp con su cliente de PokeAPI"""
+    app = web.Application()
+    app[CLIENT_KEY] = AsyncPokeApiClient()
+    # Telemetría estructurada por petición, igual que en app.py
+    app[TELEMETRY_KEY] = init_aiohttp_telemetry(app, service='poke_api_service', env_prefix='POKE_API', log_dir=LOG_DIR)
+    app.add_routes(routes)
+    app.on_startup.append(_start_client)
+    app.on_cleanup.append(_close_client)
+    return app
+
+if __name__ == '__main__':
+    logger.info("POKE_API_SERVICE|SYSTEM|startup Async service starting on port %s", POKE_API_ASYNC_PORT)
+    web.run_app(create_app(), host='0.0.0.0', port=POKE_API_ASYNC_PORT, access_log=None)
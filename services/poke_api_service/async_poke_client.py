@@ -0,0 +1,223 @@
+import os
+import json
+import time
+import asyncio
+import aiohttp
+from datetime import datetime
+from logger import setup_logger
+from pokemon_cache import PokemonCache, STATUS_FOUND, STATUS_NOT_FOUND
+from circuit_breaker import CircuitBreaker
+from poke_client import (
+    STATUS_ERROR, POKE_API_BASE_URL, POKE_API_CONNECT_TIMEOUT, POKE_API_READ_TIMEOUT,
+    POKE_API_MAX_RETRIES, POKE_API_RETRY_BACKOFF, POKE_API_RETRY_STATUSES, POKE_API_STALE_WHILE_REVALIDATE,
+    POKE_API_STALE_MAX_AGE, PayloadStats, extract_pokemon_info, normalize_pokemon_name
+)
+
+# Conexiones simultáneas hacia PokeAPI desde el único proceso asyncio
+POKE_API_ASYNC_POOL_SIZE = int(os.environ.get('POKE_API_ASYNC_POOL_SIZE', 100))
+# Solo se reintenta si la conexión no llegó a establecerse (como connect=N, read=0 en
+# create_session); ConnectionTimeoutError (timeout de sock_connect) existe desde aiohttp 3.10
+_CONNECT_ERRORS = (aiohttp.ClientConnectorError, getattr(aiohttp, 'ConnectionTimeoutError', aiohttp.ClientConnectorError))
+
+class AsyncPokeApiClient:
+    def __init__(self):
+        """
+        Versión asyncio de PokeApiClient: misma caché, circuit breaker y
+        stale-while-revalidate, pero las peticiones en vuelo no ocupan hilos.
+        La sesión aiohttp se crea en start() dentro del event loop.
+        """
+        self.base_url = POKE_API_BASE_URL
+        self.timeout = aiohttp.ClientTimeout(sock_connect=POKE_API_CONNECT_TIMEOUT, sock_read=POKE_API_READ_TIMEOUT)
+        self.logger = setup_logger()
+        self.session = None
+        self.cache = PokemonCache()
+        self.breaker = CircuitBreaker('pokeapi')
+        self.payload_stats = PayloadStats()
+        # Single-flight: una tarea compartida por clave en vuelo
+        self._in_flight = {}
+        self._leaders = 0
+        self._coalesced = 0
+        self._revalidating = {}
+        self._revalidate_metrics = {"scheduled": 0, "refreshed": 0, "failed": 0}
+
+    async def start(self):
+        """Crear la sesión con pool de conexiones keep-alive"""
+        connector = aiohttp.TCPConnector(limit=POKE_API_ASYNC_POOL_SIZE, ttl_dns_cache=300)
+        self.session = aiohttp.ClientSession(
+            connector=connector, timeout=self.timeout, headers={'Accept': 'application/json'}
+        )
+
+    async def close(self):
+        for task in list(self._revalidating.values()):
+            task.cancel()
+        if self.session is not None:
+            await self.session.close()
+
+    def _normalize_pokemon_name(self, pokemon_name):
+        """Clave normalizada del Pokémon (URL y caché)"""
+        return normalize_pokemon_name(pokemon_name)
+
+    async def get_pokemon(self, pokemon_name):
+        """
+        Obtener datos de pokemon con la misma política que PokeApiClient.get_pokemon:
+        caché fresca, stale-while-revalidate, una sola llamada por clave y
+        entrada vencida como respaldo si PokeAPI falla. Devuelve (status, data).
+        """
+        key = self._normalize_pokemon_name(pokemon_name)
+        # El LRU en memoria se consulta en el loop; la lectura de SQLite va a un hilo
+        cached = self.cache.get_from_memory(key)
+        if cached is None:
+            cached = await asyncio.to_thread(self.cache.get, key)
+        entry, fresh = cached
+        if entry is not None and fresh:
+            self.logger.info("POKE_API_SERVICE|CACHE|get_pokemon_data Hit - Pokemon: %s - Status: %s", pokemon_name, entry.status)
+            return entry.status, entry.payload
+
+        if entry is not None and POKE_API_STALE_WHILE_REVALIDATE and time.time() - entry.expires_at <= POKE_API_STALE_MAX_AGE:
+            self.cache.record_stale_served()
+            self._schedule_revalidation(key)
+            self.logger.info("POKE_API_SERVICE|CACHE|get_pokemon_data Stale Hit - Pokemon: %s - Stored: %s", pokemon_name, datetime.fromtimestamp(entry.stored_at).isoformat())
+            return entry.status, entry.payload
+
+        (status, pokemon_info), shared = await self._single_flight(key)
+        if shared:
+            self.logger.info("POKE_API_SERVICE|EXTERNAL_API|get_pokemon_data Coalesced - Pokemon: %s - Status: %s", pokemon_name, status)
+        if status != STATUS_ERROR:
+            return status, pokemon_info
+        if entry is not None:
+            self.cache.record_stale_served()
+            self.logger.warning("POKE_API_SERVICE|CACHE|get_pokemon_data Serving stale entry - Pokemon: %s - Stored: %s", pokemon_name, datetime.fromtimestamp(entry.stored_at).isoformat())
+            return entry.status, entry.payload
+        return STATUS_ERROR, None
+
+    async def _single_flight(self, key):
+        """
+        Compartir una única tarea de consulta por clave. La tarea se protege con
+        shield: si un cliente cancela su petición, la consulta sigue para los demás.
+        Devuelve (resultado, shared).
+        """
+        task = self._in_flight.get(key)
+        if task is not None:
+            self._coalesced += 1
+            return await asyncio.shield(task), True
+        task = asyncio.ensure_future(self._fetch_and_store(key))
+        self._in_flight[key] = task
+        task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        self._leaders += 1
+        return await asyncio.shield(task), False
+
+    async def _fetch_and_store(self, key):
+        """Consultar PokeAPI y guardar el resultado; la escritura en SQLite sale del event loop"""
+        status, pokemon_info = await self._fetch_pokemon(key)
+        if status in (STATUS_FOUND, STATUS_NOT_FOUND):
+            await asyncio.to_thread(self.cache.put, key, status, pokemon_info)
+        return status, pokemon_info
+
+    def _schedule_revalidation(self, key):
+        """Refrescar una entrada vencida en segundo plano (una sola vez por clave)"""
+        if key in self._revalidating:
+            return
+        self._revalidate_metrics["scheduled"] += 1
+        self._revalidating[key] = asyncio.ensure_future(self._revalidate(key))
+
+    async def _revalidate(self, key):
+        try:
+            (status, _), _ = await self._single_flight(key)
+            outcome = "failed" if status == STATUS_ERROR else "refreshed"
+        except Exception as e:
+            outcome = "failed"
+            self.logger.error("POKE_API_SERVICE|CACHE|revalidate Error - Pokemon: %s - Error: %s", key, e)
+        finally:
+            self._revalidating.pop(key, None)
+        self._revalidate_metrics[outcome] += 1
+
+    def get_single_flight_stats(self):
+        return {"in_flight": len(self._in_flight), "leaders": self._leaders, "coalesced": self._coalesced}
+
+    def get_revalidation_stats(self):
+        """Contadores de stale-while-revalidate para /health"""
+        stats = dict(self._revalidate_metrics)
+        stats.update({
+            "in_flight": len(self._revalidating),
+            "enabled": POKE_API_STALE_WHILE_REVALIDATE,
+            "max_stale_seconds": POKE_API_STALE_MAX_AGE
+        })
+        return stats
+
+    async def _request(self, url):
+        """
+        GET con reintentos y backoff exponencial ante fallos al conectar, 429 y 5xx
+        (misma política que create_session). Un timeout de lectura o una conexión
+        cortada después de enviar la petición no se reintentan: se propagan de inmediato.
+        Devuelve (status_code, cuerpo en bytes o None).
+        """
+        for attempt in range(POKE_API_MAX_RETRIES + 1):
+            try:
+                async with self.session.get(url) as response:
+                    if response.status in POKE_API_RETRY_STATUSES and attempt < POKE_API_MAX_RETRIES:
+                        await response.read()
+                    elif response.status == 200:
+                        return response.status, await response.read()
+                    else:
+                        return response.status, None
+            except _CONNECT_ERRORS:
+                if attempt >= POKE_API_MAX_RETRIES:
+                    raise
+            await asyncio.sleep(POKE_API_RETRY_BACKOFF * (2 ** attempt))
+
+    async def _fetch_pokemon(self, pokemon_name):
+        """
+        Obtener datos de pokemon desde PokeApi externa.
+        Devuelve (status, data) con status 'found', 'not_found' o 'error'.
+        """
+        start_time = time.time()
+        url = f"{self.base_url}/{pokemon_name.lower()}"
+        if not self.breaker.allow_request():
+            self.logger.warning("POKE_API_SERVICE|EXTERNAL_API|get_pokemon_data Circuit Open - Pokemon: %s", pokemon_name)
+            return STATUS_ERROR, None
+        try:
+            self.logger.info("POKE_API_SERVICE|EXTERNAL_API|get_pokemon_data Started - URL: %s", url)
+            status_code, body = await self._request(url)
+            api_latency = round((time.time() - start_time) * 1000, 2)
+            if status_code == 200:
+                parse_start = time.perf_counter()
+                pokemon_info = extract_pokemon_info(json.loads(body))
+                self.payload_stats.record(len(body), (time.perf_counter() - parse_start) * 1000, pokemon_info)
+                self.breaker.record_success(api_latency)
+                self.logger.info("POKE_API_SERVICE|EXTERNAL_API|get_pokemon_data Success - Pokemon: %s - API Latency: %sms", pokemon_name, api_latency)
+                return STATUS_FOUND, pokemon_info
+            elif status_code == 404:
+                self.breaker.record_success(api_latency)
+                self.logger.warning("POKE_API_SERVICE|EXTERNAL_API|get_pokemon_data Not Found - Pokemon: %s - API Latency: %sms", pokemon_name, api_latency)
+                return STATUS_NOT_FOUND, None
+            else:
+                self.breaker.record_failure(f"HTTP {status_code}")
+                self.logger.error("POKE_API_SERVICE|EXTERNAL_API|get_pokemon_data HTTP Error - Pokemon: %s - Status: %s - API Latency: %sms", pokemon_name, status_code, api_latency)
+                return STATUS_ERROR, None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            api_latency = round((time.time() - start_time) * 1000, 2)
+            self.breaker.record_failure("request error")
+            self.logger.error("POKE_API_SERVICE|EXTERNAL_API|get_pokemon_data Request Error - Pokemon: %s - API Latency: %sms - Error: %s", pokemon_name, api_latency, str(e) or type(e).__name__)
+            return STATUS_ERROR, None
+        except Exception as e:
+            api_latency = round((time.time() - start_time) * 1000, 2)
+            self.breaker.record_failure("unexpected error")
+            self.logger.error("POKE_API_SERVICE|EXTERNAL_API|get_pokemon_data Unexpected Error - Pokemon: %s - API Latency: %sms - Error: %s", pokemon_name, api_latency, e)
+            return STATUS_ERROR, None
+
+    async def health_check(self):
+        """Realizar un health check a la PokeApi externa"""
+        start_time = time.time()
+        try:
+            async with self.session.get(f"{self.base_url}/1") as response:
+                await response.read()
+                api_latency = round((time.time() - start_time) * 1000, 2)
+                if response.status == 200:
+                    self.logger.info("POKE_API_SERVICE|EXTERNAL_API|health_check Success - API Latency: %sms", api_latency)
+                    return True, api_latency
+                self.logger.error("POKE_API_SERVICE|EXTERNAL_API|health_check Failed - Status: %s - API Latency: %sms", response.status, api_latency)
+                return False, api_latency
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            api_latency = round((time.time() - start_time) * 1000, 2)
+            self.logger.error("POKE_API_SERVICE|EXTERNAL_API|health_check Error - API Latency: %sms - Error: %s", api_latency, e)
+            return False, api_latency
@@ -0,0 +1,134 @@
+import os
+import math
+import time
+import threading
+from collections import deque
+from logger import setup_logger
+
+# Configuración del circuit breaker hacia PokeAPI
+POKE_API_BREAKER_WINDOW = int(os.environ.get('POKE_API_BREAKER_WINDOW', 20))
+POKE_API_BREAKER_MIN_CALLS = int(os.environ.get('POKE_API_BREAKER_MIN_CALLS', 10))
+POKE_API_BREAKER_FAILURE_RATIO = float(os.environ.get('POKE_API_BREAKER_FAILURE_RATIO', 0.5))
+# Una llamada más lenta que este umbral cuenta como fallo aunque haya respondido
+POKE_API_BREAKER_SLOW_CALL_MS = float(os.environ.get('POKE_API_BREAKER_SLOW_CALL_MS', 2000))
+POKE_API_BREAKER_OPEN_SECONDS = float(os.environ.get('POKE_API_BREAKER_OPEN_SECONDS', 30))
+POKE_API_BREAKER_HALF_OPEN_PROBES = int(os.environ.get('POKE_API_BREAKER_HALF_OPEN_PROBES', 1))
+
+STATE_CLOSED = 'closed'
+STATE_OPEN = 'open'
+STATE_HALF_OPEN = 'half_open'
+
+class CircuitBreaker:
+    def __init__(self, name, window=POKE_API_BREAKER_WINDOW, min_calls=POKE_API_BREAKER_MIN_CALLS,
+                 failure_ratio=POKE_API_BREAKER_FAILURE_RATIO, slow_call_ms=POKE_API_BREAKER_SLOW_CALL_MS,
+                 open_seconds=POKE_API_BREAKER_OPEN_SECONDS, half_open_probes=POKE_API_BREAKER_HALF_OPEN_PROBES):
+        """
+        Circuit breaker sobre una ventana de las últimas llamadas.
+        - closed: las llamadas pasan; si la proporción de fallos/lentas supera el umbral, se abre.
+        - open: las llamadas se rechazan sin tocar la red durante open_seconds.
+        - half_open: se dejan pasar unas pocas sondas; si todas van bien se cierra, si una falla se reabre.
+        """
+        self.logger = setup_logger()
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_ratio = failure_ratio
+        self.slow_call_ms = slow_call_ms
+        self.open_seconds = open_seconds
+        self.half_open_probes = max(1, half_open_probes)
+        self._lock = threading.Lock()
+        self._outcomes = deque(maxlen=window)
+        self._state = STATE_CLOSED
+        self._opened_at = None
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self.times_opened = 0
+        self.rejected = 0
+
+    def _transition(self, state, reason):
+        """Cambiar de estado (se llama con el lock tomado)"""
+        previous = self._state
+        self._state = state
+        if state == STATE_OPEN:
+            self._opened_at = time.monotonic()
+            self.times_opened += 1
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        if state == STATE_CLOSED:
+            self._outcomes.clear()
+        self.logger.warning("POKE_API_SERVICE|EXTERNAL_API|circuit_breaker State Changed - Breaker: %s - From: %s - To: %s - Reason: %s", self.name, previous, state, reason)
+
+    def allow_request(self):
+        """Indicar si una llamada puede salir hacia el upstream ahora mismo"""
+        with self._lock:
+            if self._state == STATE_OPEN:
+                if time.monotonic() - self._opened_at < self.open_seconds:
+                    self.rejected += 1
+                    return False
+                self._transition(STATE_HALF_OPEN, "open timeout elapsed")
+            if self._state == STATE_HALF_OPEN:
+                if self._probes_in_flight >= self.half_open_probes:
+                    self.rejected += 1
+                    return False
+                self._probes_in_flight += 1
+            return True
+
+    def record_success(self, latency_ms):
+        """Registrar una respuesta del upstream (las lentas cuentan como fallo)"""
+        if latency_ms > self.slow_call_ms:
+            self.record_failure(f"slow call {latency_ms}ms")
+            return
+        with self._lock:
+            if self._state == STATE_HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_probes:
+                    self._transition(STATE_CLOSED, "half-open probes succeeded")
+                return
+            self._outcomes.append(True)
+
+    def record_failure(self, reason="upstream error"):
+        """Registrar un error o timeout del upstream"""
+        with self._lock:
+            if self._state == STATE_HALF_OPEN:
+                self._transition(STATE_OPEN, f"half-open probe failed ({reason})")
+                return
+            if self._state == STATE_OPEN:
+                return
+            self._outcomes.append(False)
+            calls = len(self._outcomes)
+            failures = calls - sum(self._outcomes)
+            if calls >= self.min_calls and failures / calls >= self.failure_ratio:
+                self._transition(STATE_OPEN, f"{failures}/{calls} failed calls ({reason})")
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state
+
+    def retry_after(self):
+        """Segundos (redondeados hacia arriba) hasta la próxima sonda si está abierto, si no None"""
+        with self._lock:
+            if self._state != STATE_OPEN:
+                return None
+            return max(1, math.ceil(self.open_seconds - (time.monotonic() - self._opened_at)))
+
+    def get_stats(self):
+        """Estado del breaker para /health"""
+        with self._lock:
+            calls = len(self._outcomes)
+            failures = calls - sum(self._outcomes)
+            retry_in = None
+            if self._state == STATE_OPEN:
+                retry_in = round(max(0.0, self.open_seconds - (time.monotonic() - self._opened_at)), 2)
+            return {
+                "name": self.name,
+                "state": self._state,
+                "window_calls": calls,
+                "window_failures": failures,
+                "failure_ratio_threshold": self.failure_ratio,
+                "slow_call_ms": self.slow_call_ms,
+                "open_seconds": self.open_seconds,
+                "retry_in_seconds": retry_in,
+                "times_opened": self.times_opened,
+                "rejected": self.rejected
+            }
@@ -1,48 +1,24 @@
-import logging
 import os
-from datetime import datetime
+import sys
+
+# service_logging.py es compartido por los servicios y vive en services/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from service_logging import setup_service_logger, service_logging_stats
+
+SERVICE_NAME = 'poke_api_service'
+LOG_DIR = os.environ.get(
+    'POKE_API_LOG_DIR',
+    os.path.join(os.path.dirname(__file__), 'logs', 'poke_api_service')
+)
 
 def setup_logger():
     """
-    Configuracion logger standar para poke_api_service.
-    Formato return: {Fecha}{Modulo}{API}{Funcion} Message
+    Configurar logger estándar para poke_api_service
+    Formato: {Fecha}|{Modulo}|{API}|{Funcion} Message
+    Nivel y cola se configuran con POKE_API_LOG_LEVEL, POKE_API_LOG_ASYNC y POKE_API_LOG_QUEUE_SIZE.
     """
-    
-    #creando directorio de logs si no existe 
-    log_dir= os.path.join(os.path.dirname(__file__), 'logs','poke_api_service')
-    os.makedirs(log_dir, exist_ok=True)
-    
-    #nombre archivo de log con fecha
-    log_filename = f"poke_api_service_{datetime.now().strftime('%Y-%m-%d')}.log"
-    log_path = os.path.join(log_dir, log_filename)
-    
-    #configurando logger
-    logger = logging.getLogger('poke_api_service')
-    logger.setLevel(logging.INFO)
-    
-    #evitar duplicar handlers
-    if logger.handlers:
-        return logger
-    
-    #formato personalizado que sigue estandar requerido
-    # formato: {Fecha}{Modulo}{API}{Funcion} Message
-    class StandardFormatter(logging.Formatter):
-        def format(self, record):
-            #mensaje formateado
-            return record.getMessage()
-        
-    #handler para archivo
-    file_handler= logging.FileHandler(log_path,encoding='utf-8')
-    file_handler.setLevel(logging.INFO)
-    file_handler.setFormatter(StandardFormatter())
-    
-    #handler para consola
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
-    console_handler.setFormatter(StandardFormatter())
-    
-    #agregando handlers al logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
-    
-    return logger
\ No newline at end of file
+    return setup_service_logger(SERVICE_NAME, 'POKE_API', LOG_DIR, date_format='%Y-%m-%d')
+
+def get_logging_stats():
+    """Registros encolados y descartados por el handler asíncrono"""
+    return service_logging_stats(SERVICE_NAME)
@@ -1,70 +1,304 @@
+import os
+import json
 import requests
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from logger import setup_logger
+from pokemon_cache import PokemonCache, STATUS_FOUND, STATUS_NOT_FOUND
+from single_flight import SingleFlight
+from circuit_breaker import CircuitBreaker
+from telemetry import add_downstream_latency
+
+STATUS_ERROR = 'error'
+
+# Configuración del cliente HTTP hacia PokeAPI
+POKE_API_BASE_URL = os.environ.get('POKE_API_BASE_URL', "https://pokeapi.co/api/v2/pokemon")
+POKE_API_CONNECT_TIMEOUT = float(os.environ.get('POKE_API_CONNECT_TIMEOUT', 3.05))
+POKE_API_READ_TIMEOUT = float(os.environ.get('POKE_API_READ_TIMEOUT', 10))
+POKE_API_POOL_SIZE = int(os.environ.get('POKE_API_POOL_SIZE', 20))
+POKE_API_MAX_RETRIES = int(os.environ.get('POKE_API_MAX_RETRIES', 2))
+POKE_API_RETRY_BACKOFF = float(os.environ.get('POKE_API_RETRY_BACKOFF', 0.3))
+# Respuestas que se reintentan (compartido con el cliente asyncio)
+POKE_API_RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Stale-while-revalidate: servir la entrada vencida al instante y refrescarla en segundo plano
+POKE_API_STALE_WHILE_REVALIDATE = os.environ.get('POKE_API_STALE_WHILE_REVALIDATE', '1').lower() in ('1', 'true', 'yes')
+# Segundos tras el vencimiento durante los que una entrada aún puede servirse así
+POKE_API_STALE_MAX_AGE = float(os.environ.get('POKE_API_STALE_MAX_AGE', 30 * 24 * 3600))
+POKE_API_REVALIDATE_WORKERS = int(os.environ.get('POKE_API_REVALIDATE_WORKERS', 4))
+
+def normalize_pokemon_name(pokemon_name):
+    """Clave normalizada del Pokémon (URL y caché), compartida por ambos clientes y warm_cache.py"""
+    return pokemon_name.strip().lower()
+
+def create_session(pool_size=POKE_API_POOL_SIZE, max_retries=POKE_API_MAX_RETRIES, backoff=POKE_API_RETRY_BACKOFF):
+    """
+    Crear una sesión HTTP con pool de conexiones keep-alive y reintentos con backoff.
+    Solo se reintentan métodos idempotentes (GET/HEAD) ante errores de conexión,
+    429 y 5xx; los 404 se devuelven de inmediato.
+    Un timeout de lectura no se reintenta y no se espera el Retry-After del
+    upstream, así el peor caso queda acotado a los intentos de conexión más una
+    sola lectura: (max_retries + 1) * connect + read + backoff (~19s por defecto).
+    """
+    retry = Retry(
+        total=max_retries,
+        connect=max_retries,
+        read=0,
+        status=max_retries,
+        backoff_factor=backoff,
+        status_forcelist=POKE_API_RETRY_STATUSES,
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        respect_retry_after_header=False,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry, pool_block=False)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({'Accept': 'application/json', 'Connection': 'keep-alive'})
+    return session
+
+# Campos del registro normalizado que pueden pedirse con ?fields= ('name' siempre se incluye)
+POKEMON_FIELDS = ("id", "name", "height", "weight", "base_experience", "types", "abilities", "stats", "sprites")
+
+def parse_fields(fields_param):
+    """
+    Interpretar ?fields=stats,types. Devuelve la tupla de campos o None si no se pidió
+    proyección. Lanza ValueError si algún campo no existe.
+    """
+    if not fields_param:
+        return None
+    fields = [field.strip().lower() for field in fields_param.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in POKEMON_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(POKEMON_FIELDS)}")
+    return tuple(dict.fromkeys(["name"] + fields))
+
+def project_pokemon_info(pokemon_info, fields):
+    """Quedarse solo con los campos pedidos del registro normalizado"""
+    if not fields or pokemon_info is None:
+        return pokemon_info
+    return {field: pokemon_info.get(field) for field in fields}
+
+class PayloadStats:
+    def __init__(self):
+        """
+        Medición de lo que ahorra guardar el registro normalizado en lugar del
+        documento completo de PokeAPI: bytes descargados y tiempo de parseo por
+        consulta al upstream vs bytes del registro que se cachea y se sirve.
+        """
+        self._lock = threading.Lock()
+        self.upstream_fetches = 0
+        self.upstream_bytes = 0
+        self.upstream_parse_ms = 0.0
+        self.record_bytes = 0
+
+    def record(self, upstream_bytes, parse_ms, pokemon_info):
+        record_bytes = len(json.dumps(pokemon_info, separators=(',', ':')))
+        with self._lock:
+            self.upstream_fetches += 1
+            self.upstream_bytes += upstream_bytes
+            self.upstream_parse_ms += parse_ms
+            self.record_bytes += record_bytes
+
+    def get_stats(self):
+        """Promedios por consulta al upstream para /health"""
+        with self._lock:
+            fetches = self.upstream_fetches
+            if not fetches:
+                return {"upstream_fetches": 0}
+            return {
+                "upstream_fetches": fetches,
+                "avg_upstream_bytes": round(self.upstream_bytes / fetches),
+                "avg_upstream_parse_ms": round(self.upstream_parse_ms / fetches, 3),
+                "avg_record_bytes": round(self.record_bytes / fetches),
+                "bytes_saved_ratio": round(1 - self.record_bytes / self.upstream_bytes, 4) if self.upstream_bytes else None
+            }
+
+def extract_pokemon_info(data):
+    """Extraer los campos relevantes del documento de PokeAPI"""
+    return {
+        "id": data.get("id"),
+        "name": data.get("name"),
+        "height": data.get("height"),
+        "weight": data.get("weight"),
+        "base_experience": data.get("base_experience"),
+        "types": [type_info["type"]["name"] for type_info in data.get("types", [])],
+        "abilities": [ability["ability"]["name"] for ability in data.get("abilities", [])],
+        "stats": {
+            stat["stat"]["name"]: stat["base_stat"] 
+            for stat in data.get("stats", [])
+        },
+        "sprites": {
+            "front_default": data.get("sprites", {}).get("front_default"),
+            "back_default": data.get("sprites", {}).get("back_default")
+        }
+    }
 
 class PokeApiClient:
     def __init__(self):
-        self.base_url = "https://pokeapi.co/api/v2/pokemon"
-        self.timeout = 30  # Timeout in seconds
+        self.base_url = POKE_API_BASE_URL
+        # Timeouts separados (conexión, lectura) en segundos
+        self.timeout = (POKE_API_CONNECT_TIMEOUT, POKE_API_READ_TIMEOUT)
         self.logger = setup_logger()
+        # Sesión compartida entre hilos: el pool de urllib3 es thread-safe y
+        # reutiliza conexiones TCP+TLS entre peticiones
+        self.session = create_session()
+        # Caché de dos niveles (memoria + SQLite) delante de PokeAPI
+        self.cache = PokemonCache()
+        # Peticiones concurrentes del mismo Pokémon comparten una sola llamada a PokeAPI
+        self.single_flight = SingleFlight()
+        # Corta las llamadas a PokeAPI cuando está caída o lenta
+        self.breaker = CircuitBreaker('pokeapi')
+        self.payload_stats = PayloadStats()
+        self._revalidate_executor = ThreadPoolExecutor(max_workers=max(1, POKE_API_REVALIDATE_WORKERS))
+        self._revalidating = set()
+        self._revalidate_lock = threading.Lock()
+        self._revalidate_metrics = {"scheduled": 0, "refreshed": 0, "failed": 0}
         
+    def _normalize_pokemon_name(self, pokemon_name):
+        """Clave normalizada del Pokémon (URL y caché)"""
+        return normalize_pokemon_name(pokemon_name)
+    
     def get_pokemon(self, pokemon_name):
-        """Obtener datos de pokemon desde PokeApi externa"""
+        """
+        Obtener datos de pokemon: primero desde la caché y, si no hay entrada
+        fresca, desde PokeApi externa. Los 404 también se cachean (TTL corto).
+        Una entrada vencida se sirve al instante mientras se refresca en segundo
+        plano (stale-while-revalidate). Si PokeAPI falla o el circuit breaker
+        está abierto y existe una entrada vencida, se sirve esa entrada.
+        Devuelve (status, data): 'found', 'not_found' o 'error' (sin respaldo en caché).
+        """
+        key = self._normalize_pokemon_name(pokemon_name)
+        entry, fresh = self.cache.get(key)
+        if entry is not None and fresh:
+            self.logger.info("POKE_API_SERVICE|CACHE|get_pokemon_data Hit - Pokemon: %s - Status: %s", pokemon_name, entry.status)
+            return entry.status, entry.payload
+        
+        if entry is not None and POKE_API_STALE_WHILE_REVALIDATE and time.time() - entry.expires_at <= POKE_API_STALE_MAX_AGE:
+            self.cache.record_stale_served()
+            self._schedule_revalidation(key)
+            self.logger.info("POKE_API_SERVICE|CACHE|get_pokemon_data Stale Hit - Pokemon: %s - Stored: %s", pokemon_name, datetime.fromtimestamp(entry.stored_at).isoformat())
+            return entry.status, entry.payload
+        
+        (status, pokemon_info), shared = self.single_flight.do(key, self._fetch_and_store, key)
+        if shared:
+            self.logger.info("POKE_API_SERVICE|EXTERNAL_API|get_pokemon_data Coalesced - Pokemon: %s - Status: %s", pokemon_name, status)
+        if status != STATUS_ERROR:
+            return status, pokemon_info
+        if entry is not None:
+            self.cache.record_stale_served()
+            self.logger.warning("POKE_API_SERVICE|CACHE|get_pokemon_data Serving stale entry - Pokemon: %s - Stored: %s", pokemon_name, datetime.fromtimestamp(entry.stored_at).isoformat())
+            return entry.status, entry.payload
+        return STATUS_ERROR, None
+    
+    def refresh(self, pokemon_name):
+        """
+        Consultar PokeAPI sin mirar la caché y guardar el resultado (para precarga
+        o revalidación). Comparte la llamada en vuelo con get_pokemon.
+        Devuelve (status, data) como get_pokemon.
+        """
+        key = self._normalize_pokemon_name(pokemon_name)
+        return self.single_flight.do(key, self._fetch_and_store, key)[0]
+    
+    def _fetch_and_store(self, key):
+        """Consultar PokeAPI y guardar el resultado en la caché (se ejecuta una vez por clave en vuelo)"""
+        status, pokemon_info = self._fetch_pokemon(key)
+        if status == STATUS_FOUND:
+            self.cache.put(key, STATUS_FOUND, pokemon_info)
+        elif status == STATUS_NOT_FOUND:
+            self.cache.put(key, STATUS_NOT_FOUND)
+        return status, pokemon_info
+    
+    def _schedule_revalidation(self, key):
+        """Refrescar una entrada vencida en segundo plano (una sola vez por clave)"""
+        with self._revalidate_lock:
+            if key in self._revalidating:
+                return
+            self._revalidating.add(key)
+            self._revalidate_metrics["scheduled"] += 1
+        self._revalidate_executor.submit(self._revalidate, key)
+    
+    def _revalidate(self, key):
+        try:
+            status, _ = self.refresh(key)
+            outcome = "failed" if status == STATUS_ERROR else "refreshed"
+        except Exception as e:
+            outcome = "failed"
+            self.logger.error("POKE_API_SERVICE|CACHE|revalidate Error - Pokemon: %s - Error: %s", key, e)
+        with self._revalidate_lock:
+            self._revalidating.discard(key)
+            self._revalidate_metrics[outcome] += 1
+    
+    def get_revalidation_stats(self):
+        """Contadores de stale-while-revalidate para /health"""
+        with self._revalidate_lock:
+            stats = dict(self._revalidate_metrics)
+            stats["in_flight"] = len(self._revalidating)
+        stats.update({"enabled": POKE_API_STALE_WHILE_REVALIDATE, "max_stale_seconds": POKE_API_STALE_MAX_AGE})
+        return stats
+    
+    def _fetch_pokemon(self, pokemon_name):
+        """
+        Obtener datos de pokemon desde PokeApi externa.
+        Devuelve (status, data) con status 'found', 'not_found' o 'error'.
+        Con el circuit breaker abierto devuelve 'error' sin tocar la red.
+        """
         
         start_time= time.time()
         url= f"{self.base_url}/{pokemon_name.lower()}"
+        if not self.breaker.allow_request():
+            self.logger.warning("POKE_API_SERVICE|EXTERNAL_API|get_pokemon_data Circuit Open - Pokemon: %s", pokemon_name)
+            return STATUS_ERROR, None
         try:
-            self.logger.info(f"{datetime.now().isoformat()}|POKE_API_SERVICE|EXTERNAL_API|get_pokemon_data Started - URL: {url}")
+            self.logger.info("POKE_API_SERVICE|EXTERNAL_API|get_pokemon_data Started - URL: %s", url)
             
             #realizar peticion http
-            response = requests.get(url, timeout=self.timeout)
+            response = self.session.get(url, timeout=self.timeout)
             end_time = time.time()
             api_latency=round((end_time - start_time)*1000, 2)
             if response.status_code == 200:
+                parse_start = time.perf_counter()
                 data= response.json()
                 
-                #extraer infor relevante
-                pokemon_info = {
-                    "id": data.get("id"),
-                    "name": data.get("name"),
-                    "height": data.get("height"),
-                    "weight": data.get("weight"),
-                    "base_experience": data.get("base_experience"),
-                    "types": [type_info["type"]["name"] for type_info in data.get("types", [])],
-                    "abilities": [ability["ability"]["name"] for ability in data.get("abilities", [])],
-                    "stats": {
-                        stat["stat"]["name"]: stat["base_stat"] 
-                        for stat in data.get("stats", [])
-                    },
-                    "sprites": {
-                        "front_default": data.get("sprites", {}).get("front_default"),
-                        "back_default": data.get("sprites", {}).get("back_default")
-                    }
-                }
-                self.logger.info(f"{datetime.now().isoformat()}|POKE_API_SERVICE|EXTERNAL_API|get_pokemon_data Success - Pokemon: {pokemon_name} - API Latency: {api_latency}ms")
-                return pokemon_info 
+                #extraer infor relevante: solo este registro se cachea, el documento completo se descarta
+                pokemon_info = extract_pokemon_info(data)
+                self.payload_stats.record(len(response.content), (time.perf_counter() - parse_start) * 1000, pokemon_info)
+                self.breaker.record_success(api_latency)
+                self.logger.info("POKE_API_SERVICE|EXTERNAL_API|get_pokemon_data Success - Pokemon: %s - API Latency: %sms", pokemon_name, api_latency)
+                return STATUS_FOUND, pokemon_info
             elif response.status_code == 404:
-                self.logger.warning(f"{datetime.now().isoformat()}|POKE_API_SERVICE|EXTERNAL_API|get_pokemon_data Not Found - Pokemon: {pokemon_name} - API Latency: {api_latency}ms")
-                return None
+                self.breaker.record_success(api_latency)
+                self.logger.warning("POKE_API_SERVICE|EXTERNAL_API|get_pokemon_data Not Found - Pokemon: %s - API Latency: %sms", pokemon_name, api_latency)
+                return STATUS_NOT_FOUND, None
             else:
-                self.logger.error(f"{datetime.now().isoformat()}|POKE_API_SERVICE|EXTERNAL_API|get_pokemon_data HTTP Error - Pokemon: {pokemon_name} - Status: {response.status_code} - API Latency: {api_latency}ms")
-                return None
+                self.breaker.record_failure(f"HTTP {response.status_code}")
+                self.logger.error("POKE_API_SERVICE|EXTERNAL_API|get_pokemon_data HTTP Error - Pokemon: %s - Status: %s - API Latency: %sms", pokemon_name, response.status_code, api_latency)
+                return STATUS_ERROR, None
         except requests.exceptions.ConnectionError as e:
             end_time = time.time()
             api_latency = round((end_time - start_time) * 1000, 2)
-            self.logger.error(f"{datetime.now().isoformat()}|POKE_API_SERVICE|EXTERNAL_API|get_pokemon_data Connection Error - Pokemon: {pokemon_name} - API Latency: {api_latency}ms")
-            return None
+            self.breaker.record_failure("connection error")
+            self.logger.error("POKE_API_SERVICE|EXTERNAL_API|get_pokemon_data Connection Error - Pokemon: %s - API Latency: %sms", pokemon_name, api_latency)
+            return STATUS_ERROR, None
         except requests.exceptions.RequestException as e:
             end_time = time.time()
             api_latency = round((end_time - start_time) * 1000, 2)
-            self.logger.error(f"{datetime.now().isoformat()}|POKE_API_SERVICE|EXTERNAL_API|get_pokemon_data Request Error - Pokemon: {pokemon_name} - API Latency: {api_latency}ms - Error: {str(e)}")
-            return None            
+            self.breaker.record_failure("request error")
+            self.logger.error("POKE_API_SERVICE|EXTERNAL_API|get_pokemon_data Request Error - Pokemon: %s - API Latency: %sms - Error: %s", pokemon_name, api_latency, e)
+            return STATUS_ERROR, None
         except Exception as e:
             end_time = time.time()
             api_latency = round((end_time - start_time) * 1000, 2)
-            self.logger.error(f"{datetime.now().isoformat()}|POKE_API_SERVICE|EXTERNAL_API|get_pokemon_data Unexpected Error - Pokemon: {pokemon_name} - API Latency: {api_latency}ms - Error: {str(e)}")
-            return None
+            self.breaker.record_failure("unexpected error")
+            self.logger.error("POKE_API_SERVICE|EXTERNAL_API|get_pokemon_data Unexpected Error - Pokemon: %s - API Latency: %sms - Error: %s", pokemon_name, api_latency, e)
+            return STATUS_ERROR, None
+        finally:
+            # Tiempo en PokeAPI para la telemetría de la petición que lo pidió
+            add_downstream_latency((time.time() - start_time) * 1000)
 
     def health_check(self):
         """Realizar un health check a la PokeApi externa"""
@@ -72,19 +306,19 @@ class PokeApiClient:
         start_time = time.time()
         try:
             # Hacer una petición simple para verificar conectividad
-            response = requests.get(f"{self.base_url}/1", timeout=10)  # Bulbasaur siempre existe
+            response = self.session.get(f"{self.base_url}/1", timeout=self.timeout)  # Bulbasaur siempre existe
             
             end_time = time.time()
             api_latency = round((end_time - start_time) * 1000, 2)
             
             if response.status_code == 200:
-                self.logger.info(f"{datetime.now().isoformat()}|POKE_API_SERVICE|EXTERNAL_API|health_check Success - API Latency: {api_latency}ms")
+                self.logger.info("POKE_API_SERVICE|EXTERNAL_API|health_check Success - API Latency: %sms", api_latency)
                 return True, api_latency
             else:
-                self.logger.error(f"{datetime.now().isoformat()}|POKE_API_SERVICE|EXTERNAL_API|health_check Failed - Status: {response.status_code} - API Latency: {api_latency}ms")
+                self.logger.error("POKE_API_SERVICE|EXTERNAL_API|health_check Failed - Status: %s - API Latency: %sms", response.status_code, api_latency)
                 return False, api_latency
         except requests.exceptions.RequestException as e:
             end_time = time.time()
             api_latency = round((end_time - start_time) * 1000, 2)
-            self.logger.error(f"{datetime.now().isoformat()}|POKE_API_SERVICE|EXTERNAL_API|health_check Error - API Latency: {api_latency}ms - Error: {str(e)}")
+            self.logger.error("POKE_API_SERVICE|EXTERNAL_API|health_check Error - API Latency: %sms - Error: %s", api_latency, e)
             return False, api_latency                            
\ No newline at end of file
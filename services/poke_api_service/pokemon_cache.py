@@ -0,0 +1,209 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict, namedtuple
+from logger import setup_logger
+
+# Caché de respuestas de PokeAPI: LRU en memoria + SQLite persistente
+POKE_API_CACHE_PATH = os.environ.get(
+    'POKE_API_CACHE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'pokeapi_cache.sqlite3')
+)
+POKE_API_CACHE_MEMORY_ENTRIES = int(os.environ.get('POKE_API_CACHE_MEMORY_ENTRIES', 2000))
+# Los datos de PokeAPI prácticamente no cambian: TTL largo para aciertos, corto para 404
+POKE_API_CACHE_TTL = float(os.environ.get('POKE_API_CACHE_TTL', 7 * 24 * 3600))
+POKE_API_CACHE_NEGATIVE_TTL = float(os.environ.get('POKE_API_CACHE_NEGATIVE_TTL', 3600))
+
+STATUS_FOUND = 'found'
+STATUS_NOT_FOUND = 'not_found'
+
+CacheEntry = namedtuple('CacheEntry', ['status', 'payload', 'stored_at', 'expires_at'])
+
+class PokemonCache:
+    def __init__(self, path=POKE_API_CACHE_PATH, memory_entries=POKE_API_CACHE_MEMORY_ENTRIES,
+                 ttl=POKE_API_CACHE_TTL, negative_ttl=POKE_API_CACHE_NEGATIVE_TTL):
+        """
+        Caché de dos niveles para datos de Pokémon.
+        - Nivel 1: LRU en memoria acotado por número de entradas.
+        - Nivel 2: SQLite en disco, sobrevive reinicios.
+        Las entradas vencidas no se borran: se devuelven marcadas como no frescas
+        para poder servirlas si el upstream falla.
+        Todos los hilos comparten una conexión SQLite protegida por un lock: abrir
+        una por hilo de petición repetía la conexión y los PRAGMA en cada hilo nuevo.
+        """
+        self.logger = setup_logger()
+        self.path = path
+        self.memory_entries = memory_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._memory = OrderedDict()
+        self._memory_lock = threading.Lock()
+        self._connection = None
+        self._disk_lock = threading.Lock()
+        self._disk_entries = None
+        self._metrics = {
+            "memory_hits": 0, "disk_hits": 0, "misses": 0, "expired": 0,
+            "negative_hits": 0, "stale_served": 0, "writes": 0, "disk_errors": 0
+        }
+        self._metrics_lock = threading.Lock()
+        self._disk_enabled = self._init_disk()
+
+    def _init_disk(self):
+        """Crear la base SQLite si no existe; si falla se usa solo la memoria"""
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS pokemon_cache ("
+                "key TEXT PRIMARY KEY, status TEXT NOT NULL, payload TEXT, "
+                "stored_at REAL NOT NULL, expires_at REAL NOT NULL)"
+            )
+            connection.commit()
+            # Conteo inicial; después se mantiene en put() para no hacer COUNT(*) en cada /health
+            self._disk_entries = connection.execute("SELECT COUNT(*) FROM pokemon_cache").fetchone()[0]
+            self._connection = connection
+            return True
+        except sqlite3.Error as e:
+            self.logger.error("POKE_API_SERVICE|CACHE|init_disk Error - Path: %s - Error: %s", self.path, e)
+            return False
+
+    def _count(self, metric, amount=1):
+        with self._metrics_lock:
+            self._metrics[metric] += amount
+
+    def _remember(self, key, entry):
+        """Guardar en el LRU en memoria expulsando la entrada menos reciente"""
+        with self._memory_lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _memory_get(self, key):
+        with self._memory_lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+        return entry
+
+    def _classify(self, entry, now, level):
+        """
+        (entry, fresh). Una entrada vencida cuenta como "expired", no como acierto
+        del nivel (memory_hits / disk_hits); los aciertos negativos se cuentan aparte.
+        """
+        fresh = entry.expires_at > now
+        if not fresh:
+            self._count("expired")
+            return entry, fresh
+        self._count(level)
+        if entry.status == STATUS_NOT_FOUND:
+            self._count("negative_hits")
+        return entry, fresh
+
+    def get_from_memory(self, key):
+        """
+        Solo el nivel en memoria, sin tocar SQLite (seguro dentro de un event loop).
+        Devuelve (entry, fresh), o None si hay que consultar el disco con get().
+        """
+        entry = self._memory_get(key)
+        if entry is None:
+            return None
+        return self._classify(entry, time.time(), "memory_hits")
+
+    def _disk_get(self, key):
+        """Leer una entrada de SQLite (None si no existe o el disco falla)"""
+        try:
+            with self._disk_lock:
+                row = self._connection.execute(
+                    "SELECT status, payload, stored_at, expires_at FROM pokemon_cache WHERE key = ?", (key,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            self._count("disk_errors")
+            self.logger.error("POKE_API_SERVICE|CACHE|get Disk Error - Key: %s - Error: %s", key, e)
+            return None
+        if row is None:
+            return None
+        status, payload, stored_at, expires_at = row
+        return CacheEntry(status, json.loads(payload) if payload else None, stored_at, expires_at)
+
+    def get(self, key):
+        """
+        Buscar una entrada. Devuelve (entry, fresh) o (None, False) si no existe.
+        """
+        now = time.time()
+        level = "memory_hits"
+        entry = self._memory_get(key)
+        if entry is None and self._disk_enabled:
+            entry = self._disk_get(key)
+            if entry is not None:
+                self._remember(key, entry)
+                level = "disk_hits"
+        if entry is None:
+            self._count("misses")
+            return None, False
+        return self._classify(entry, now, level)
+
+    def peek(self, key):
+        """
+        (entry, fresh) como get(), pero sin contar aciertos ni fallos y sin subir la
+        entrada al LRU en memoria: para herramientas como warm_cache.py, que solo
+        necesitan saber si la clave ya está fresca.
+        """
+        with self._memory_lock:
+            entry = self._memory.get(key)
+        if entry is None and self._disk_enabled:
+            entry = self._disk_get(key)
+        if entry is None:
+            return None, False
+        return entry, entry.expires_at > time.time()
+
+    def put(self, key, status, payload=None):
+        """Guardar un resultado (found / not_found) en ambos niveles"""
+        now = time.time()
+        ttl = self.ttl if status == STATUS_FOUND else self.negative_ttl
+        entry = CacheEntry(status, payload, now, now + ttl)
+        self._remember(key, entry)
+        self._count("writes")
+        if self._disk_enabled:
+            row = (json.dumps(payload, separators=(',', ':')) if payload is not None else None, status, entry.stored_at, entry.expires_at, key)
+            try:
+                with self._disk_lock:
+                    # INSERT OR IGNORE + UPDATE: así se sabe si la clave es nueva para el conteo
+                    inserted = self._connection.execute(
+                        "INSERT OR IGNORE INTO pokemon_cache (payload, status, stored_at, expires_at, key) VALUES (?, ?, ?, ?, ?)", row
+                    ).rowcount
+                    if not inserted:
+                        self._connection.execute(
+                            "UPDATE pokemon_cache SET payload = ?, status = ?, stored_at = ?, expires_at = ? WHERE key = ?", row
+                        )
+                    self._connection.commit()
+                    self._disk_entries += inserted
+            except sqlite3.Error as e:
+                self._count("disk_errors")
+                self.logger.error("POKE_API_SERVICE|CACHE|put Disk Error - Key: %s - Error: %s", key, e)
+        return entry
+
+    def record_stale_served(self):
+        self._count("stale_served")
+
+    def get_stats(self):
+        """Métricas de aciertos/fallos para /health"""
+        with self._metrics_lock:
+            metrics = dict(self._metrics)
+        lookups = metrics["memory_hits"] + metrics["disk_hits"] + metrics["expired"] + metrics["misses"]
+        with self._memory_lock:
+            memory_size = len(self._memory)
+        metrics.update({
+            "hit_ratio": round((metrics["memory_hits"] + metrics["disk_hits"]) / lookups, 4) if lookups else None,
+            "memory_entries": memory_size,
+            "memory_capacity": self.memory_entries,
+            "disk_entries": self._disk_entries if self._disk_enabled else None,
+            "disk_path": self.path if self._disk_enabled else None,
+            "ttl_seconds": self.ttl,
+            "negative_ttl_seconds": self.negative_ttl
+        })
+        return metrics
@@ -0,0 +1,65 @@
+import threading
+
+class _Call:
+    """Llamada en vuelo: los seguidores esperan el evento y leen el resultado"""
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+class SingleFlight:
+    def __init__(self):
+        """
+        Deduplicación de llamadas concurrentes por clave (single-flight).
+        Mientras una llamada para una clave está en curso, las demás peticiones
+        con la misma clave esperan y reciben su mismo resultado.
+        """
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key, function, *args):
+        """
+        Ejecutar function(*args) una sola vez por clave en vuelo.
+        Devuelve (resultado, shared) donde shared indica si se reutilizó otra llamada.
+        Si la llamada líder lanza una excepción, todos los seguidores la reciben.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = function(*args)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+        return call.result, False
+
+    def get_stats(self):
+        """Contadores para monitoreo"""
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "waiting": sum(call.waiters for call in self._calls.values()),
+                "leaders": self.leaders,
+                "coalesced": self.coalesced
+            }
@@ -0,0 +1,174 @@
+"""
+Precarga (warm-up) de la caché de PokeApiClient antes de recibir tráfico.
+Toma los nombres de data/Poke_stats.csv y/o de los directorios de data/Poke_Img,
+los consulta con concurrencia acotada y rate limit, guarda el progreso en un
+archivo para poder reanudar y al final imprime un resumen.
+Las claves se normalizan igual que en el servicio (normalize_pokemon_name), así
+la caché precargada es la que consultan las peticiones con esos nombres. Los que
+PokeAPI no reconoce ("Mr. Mime" -> "mr. mime") quedan como 404 en la caché,
+igual que si los pidiera el servicio, y se listan en el resumen (not_found_names).
+Tras una ejecución sin errores el archivo de progreso se vacía.
+
+Uso: python warm_cache.py [--source csv|images|all] [--concurrency 8] [--rate 10]
+                          [--progress-file ruta] [--limit N] [--force]
+"""
+import os
+import csv
+import sys
+import json
+import time
+import argparse
+import threading
+import statistics
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+from poke_client import PokeApiClient, STATUS_ERROR, normalize_pokemon_name
+from logger import setup_logger
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+STATS_CSV_PATH = os.path.join(ROOT_DIR, 'data', 'Poke_stats.csv')
+IMAGES_DIR_PATH = os.path.join(ROOT_DIR, 'data', 'Poke_Img')
+DEFAULT_PROGRESS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'warm_progress.jsonl')
+
+logger = setup_logger()
+
+class RateLimiter:
+    def __init__(self, rate_per_second):
+        """Token bucket compartido entre hilos (rate <= 0 desactiva el límite)"""
+        self.rate = rate_per_second
+        self._lock = threading.Lock()
+        self._next_time = time.monotonic()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait_time = self._next_time - now
+            self._next_time = max(now, self._next_time) + 1.0 / self.rate
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+def load_names(source):
+    """Nombres a precargar, normalizados como en el servicio y sin duplicados"""
+    names = []
+    if source in ('csv', 'all') and os.path.exists(STATS_CSV_PATH):
+        with open(STATS_CSV_PATH, encoding='utf-8') as f:
+            names.extend(row['Name'] for row in csv.DictReader(f) if row.get('Name'))
+    if source in ('images', 'all') and os.path.isdir(IMAGES_DIR_PATH):
+        names.extend(sorted(
+            entry.name for entry in os.scandir(IMAGES_DIR_PATH) if entry.is_dir()
+        ))
+    unique = {}
+    for name in names:
+        unique.setdefault(normalize_pokemon_name(name), None)
+    return list(unique)
+
+def load_progress(progress_path):
+    """
+    Nombres completados en ejecuciones anteriores. Solo se saltan si además
+    siguen frescos en la caché (ver warm_cache).
+    """
+    done = set()
+    if os.path.exists(progress_path):
+        with open(progress_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    done.add(json.loads(line)["name"])
+                except (ValueError, KeyError):
+                    continue
+    return done
+
+def warm_cache(client, names, concurrency, rate, progress_path, force=False):
+    """Precargar los nombres y devolver el resumen"""
+    limiter = RateLimiter(rate)
+    done = set() if force else load_progress(progress_path)
+    os.makedirs(os.path.dirname(progress_path), exist_ok=True)
+    summary = {"total": len(names), "resumed": 0, "cached": 0, "found": 0, "not_found": 0, "errors": 0}
+    latencies = []
+    not_found_names = []
+
+    def warm(name):
+        if not force:
+            # Un nombre completado antes se vuelve a consultar si su entrada ya venció.
+            # peek no cuenta aciertos ni fallos: la precarga no altera las métricas del servicio
+            entry, fresh = client.cache.peek(name)
+            if entry is not None and fresh:
+                return name, "resumed" if name in done else "cached", 0.0
+        limiter.acquire()
+        start = time.perf_counter()
+        status, _ = client.refresh(name)
+        return name, status, (time.perf_counter() - start) * 1000
+
+    pending_names = list(names)
+
+    start_time = time.time()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor, open(progress_path, 'a', encoding='utf-8') as progress:
+        iterator = iter(pending_names)
+        pending = set()
+        for name in iterator:
+            pending.add(executor.submit(warm, name))
+            if len(pending) >= concurrency * 2:
+                break
+        completed = 0
+        while pending:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = next(iterator, None)
+                if name is not None:
+                    pending.add(executor.submit(warm, name))
+                name, status, latency = future.result()
+                completed += 1
+                if status == STATUS_ERROR:
+                    summary["errors"] += 1
+                elif status == "resumed":
+                    summary["resumed"] += 1
+                else:
+                    summary[status] += 1
+                    if status != "cached":
+                        latencies.append(latency)
+                    if status == "not_found":
+                        not_found_names.append(name)
+                    # Los errores no se registran: se reintentan en la siguiente ejecución
+                    progress.write(json.dumps({"name": name, "status": status, "at": datetime.now().isoformat()}) + "\n")
+                    progress.flush()
+                if completed % 50 == 0:
+                    print(f"Progress: {completed}/{len(pending_names)} - Errors: {summary['errors']}", file=sys.stderr)
+
+    if summary["errors"] == 0:
+        # Ejecución completa: el progreso solo sirve para reanudar una interrumpida
+        open(progress_path, 'w', encoding='utf-8').close()
+
+    elapsed = time.time() - start_time
+    summary.update({
+        "elapsed_seconds": round(elapsed, 2),
+        "upstream_requests": len(latencies),
+        "effective_rate": round(len(latencies) / elapsed, 2) if elapsed > 0 else None,
+        "latency_p50_ms": round(statistics.median(latencies), 2) if latencies else None,
+        "latency_p95_ms": round(statistics.quantiles(latencies, n=20)[-1], 2) if len(latencies) > 1 else None,
+        "not_found_names": sorted(not_found_names),
+        "cache": client.cache.get_stats()
+    })
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm the PokeAPI cache of poke_api_service")
+    parser.add_argument('--source', choices=['csv', 'images', 'all'], default='all')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--rate', type=float, default=10.0, help="max upstream requests per second (0 = unlimited)")
+    parser.add_argument('--progress-file', default=DEFAULT_PROGRESS_PATH)
+    parser.add_argument('--limit', type=int, default=None)
+    parser.add_argument('--force', action='store_true', help="ignore progress and fresh cache entries")
+    args = parser.parse_args()
+
+    names = load_names(args.source)
+    if args.limit is not None:
+        names = names[:args.limit]
+    logger.info("POKE_API_SERVICE|CACHE|warm_cache Started - Names: %s - Concurrency: %s - Rate: %s/s", len(names), args.concurrency, args.rate)
+    summary = warm_cache(PokeApiClient(), names, max(1, args.concurrency), args.rate, args.progress_file, args.force)
+    logger.info("POKE_API_SERVICE|CACHE|warm_cache Completed - Found: %s - Not Found: %s - Errors: %s - Elapsed: %ss", summary['found'], summary['not_found'], summary['errors'], summary['elapsed_seconds'])
+    print(json.dumps(summary, indent=2))
+    return 0 if summary["errors"] == 0 else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,21 +1,77 @@
-from flask import Flask, request, jsonify, send_file
+import re
+import json
+import mimetypes
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from flask import Flask, Response, request, jsonify, send_file
 import time
 import os
 from datetime import datetime
 from image_handler import ImageHandler
-from logger import setup_logger
+from image_variants import VARIANT_FORMATS
+from sprite_sheets import SPRITE_SHEET_DEFAULT_TILE
+from logger import LOG_DIR, setup_logger, get_logging_stats
+from telemetry import init_telemetry, request_latency_ms
 
 app = Flask(__name__)
 logger = setup_logger()
+# Telemetría estructurada por petición (JSON-lines o binaria, con muestreo): mide
+# latencia y status de cada ruta, así que las rutas solo registran errores y avisos
+telemetry = init_telemetry(app, service='poke_images_service', env_prefix='POKE_IMAGES', log_dir=LOG_DIR)
 image_handler = ImageHandler()
 
+# Política de caché HTTP para imágenes servidas
+# Las imágenes por nombre son estables: se pueden cachear max-age segundos.
+# /random-image cambia de imagen en cada petición: se revalida siempre (no-cache).
+IMAGE_CACHE_MAX_AGE = int(os.environ.get('POKE_IMAGES_CACHE_MAX_AGE', 86400))
+IMAGE_CACHE_PRIVATE = os.environ.get('POKE_IMAGES_CACHE_PRIVATE', '0') == '1'
+
+# Pool compartido para resolver lotes de /pokemon/batch-images en paralelo
+BATCH_WORKERS = int(os.environ.get('POKE_IMAGES_BATCH_WORKERS', 8))
+batch_executor = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix='batch-images')
+# Construir el catálogo al arrancar y refrescarlo ante cambios en los directorios.
+# Con debug=True el reloader de Werkzeug ejecuta este módulo también en el proceso
+# padre (que solo vigila archivos): el hilo arranca solo en el que sirve peticiones
+if __name__ != '__main__' or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+    image_handler.catalog.start_refresher()
+
+def _send_catalog_image(image, max_age):
+    """
+    Servir una imagen con validadores de caché: ETag fuerte y Last-Modified
+    tomados del catálogo. send_file(conditional=True) responde 304 a
+    If-None-Match / If-Modified-Since y 206 a peticiones Range.
+    """
+    etag = image_handler.get_image_etag(image)
+    data = image_handler.get_image_bytes(image)
+    if data is None:
+        response = send_file(
+            image.path,
+            conditional=True,
+            etag=etag,
+            last_modified=image.mtime,
+            max_age=max_age if max_age > 0 else None
+        )
+    else:
+        # Servir desde la caché en memoria con los mismos validadores que send_file
+        mimetype = mimetypes.guess_type(image.filename)[0] or 'application/octet-stream'
+        response = Response(data, mimetype=mimetype, direct_passthrough=True)
+        response.set_etag(etag)
+        response.last_modified = image.mtime
+        if max_age > 0:
+            response.cache_control.public = True
+            response.cache_control.max_age = max_age
+        response = response.make_conditional(request, accept_ranges=True, complete_length=len(data))
+    if max_age > 0:
+        if IMAGE_CACHE_PRIVATE:
+            response.cache_control.public = False
+            response.cache_control.private = True
+    else:
+        response.cache_control.no_cache = True
+    return response
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint para verificar disponibilidad del servicio"""
-    start_time = time.time()
     try:
-        logger.info(f"{datetime.now().isoformat()}|POKE_IMAGES_SERVICE|LOCAL_FILES|health_check Started")
-        
         # Verificar si el directorio de imágenes existe
         images_dir = image_handler.get_images_base_path()
         if os.path.exists(images_dir):
@@ -25,192 +81,299 @@ def health_check():
             status = "unhealthy"
             message = f"Images directory not found at {images_dir}"
         
-        end_time = time.time()
-        latency = round((end_time - start_time) * 1000, 2)
-        
         response = {
             "status": status,
             "service": "poke_images_service",
             "message": message,
+            "catalog": image_handler.get_catalog_info(),
+            "logging": get_logging_stats(),
+            "telemetry": telemetry.get_stats() if telemetry else {"enabled": False},
             "timestamp": datetime.now().isoformat()
         }
         
         if status == "healthy":
-            logger.info(f"{datetime.now().isoformat()}|POKE_IMAGES_SERVICE|LOCAL_FILES|health_check Completed - Latency: {latency}ms")
             return jsonify(response), 200
         else:
-            logger.error(f"{datetime.now().isoformat()}|POKE_IMAGES_SERVICE|LOCAL_FILES|health_check Failed - Latency: {latency}ms - {message}")
+            logger.error("POKE_IMAGES_SERVICE|LOCAL_FILES|health_check Failed - %s", message)
             return jsonify(response), 500
             
     except Exception as e:
-        end_time = time.time()
-        latency = round((end_time - start_time) * 1000, 2)
-        logger.error(f"{datetime.now().isoformat()}|POKE_IMAGES_SERVICE|LOCAL_FILES|health_check Failed - Latency: {latency}ms - Error: {str(e)}")
+        logger.error("POKE_IMAGES_SERVICE|LOCAL_FILES|health_check Failed - Error: %s", e)
         return jsonify({"status": "unhealthy", "error": str(e)}), 500
 
+def _send_variant_image(image, width, image_format, negotiated, max_age):
+    """Servir una variante derivada (redimensionada / convertida) desde la caché en disco"""
+    variant_path, mimetype, digest = image_handler.variants.get_variant(image, width, image_format)
+    response = send_file(
+        variant_path,
+        mimetype=mimetype,
+        conditional=True,
+        etag=digest,
+        last_modified=image.mtime,
+        max_age=max_age if max_age > 0 else None
+    )
+    if negotiated:
+        # El formato depende del header Accept: los caches deben distinguirlo
+        response.vary.add('Accept')
+    return response
+
+@app.route('/image-cache/stats', methods=['GET'])
+def get_image_cache_stats():
+    """Contadores de la caché de bytes de imágenes (hits, misses, expulsiones)"""
+    return jsonify({
+        "service": "poke_images_service",
+        "image_cache": image_handler.byte_cache.get_stats(),
+        "variants": image_handler.variants.get_stats(),
+        "sprite_sheets": image_handler.sprite_sheets.get_stats(),
+        "timestamp": datetime.now().isoformat()
+    }), 200
+
 @app.route('/pokemon/<pokemon_name>/images', methods=['GET'])
 def get_pokemon_images(pokemon_name):
     """Obtener lista de imágenes disponibles para un Pokémon"""
-    start_time = time.time()
     try:
-        logger.info(f"{datetime.now().isoformat()}|POKE_IMAGES_SERVICE|LOCAL_FILES|get_pokemon_images Started - Pokemon: {pokemon_name}")
-        
         images_info = image_handler.get_pokemon_images_info(pokemon_name)
         
-        end_time = time.time()
-        latency = round((end_time - start_time) * 1000, 2)
-        
         if images_info:
-            logger.info(f"{datetime.now().isoformat()}|POKE_IMAGES_SERVICE|LOCAL_FILES|get_pokemon_images Completed - Pokemon: {pokemon_name} - Images: {len(images_info['images'])} - Latency: {latency}ms")
-            
             return jsonify({
                 "pokemon": pokemon_name,
                 "images_info": images_info,
                 "source": "local_files",
-                "latency_ms": latency,
+                "latency_ms": request_latency_ms(),
                 "timestamp": datetime.now().isoformat()
             }), 200
         else:
-            logger.warning(f"{datetime.now().isoformat()}|POKE_IMAGES_SERVICE|LOCAL_FILES|get_pokemon_images Not Found - Pokemon: {pokemon_name} - Latency: {latency}ms")
+            logger.warning("POKE_IMAGES_SERVICE|LOCAL_FILES|get_pokemon_images Not Found - Pokemon: %s", pokemon_name)
             return jsonify({"error": f"No images found for pokemon: {pokemon_name}"}), 404
             
     except Exception as e:
-        end_time = time.time()
-        latency = round((end_time - start_time) * 1000, 2)
-        logger.error(f"{datetime.now().isoformat()}|POKE_IMAGES_SERVICE|LOCAL_FILES|get_pokemon_images Failed - Pokemon: {pokemon_name} - Latency: {latency}ms - Error: {str(e)}")
+        logger.error("POKE_IMAGES_SERVICE|LOCAL_FILES|get_pokemon_images Failed - Pokemon: %s - Error: %s", pokemon_name, e)
         return jsonify({"error": f"Internal server error: {str(e)}"}), 500
 
 @app.route('/pokemon/<pokemon_name>/image/<image_name>', methods=['GET'])
 def get_pokemon_image(pokemon_name, image_name):
-    """Servir una imagen específica de un Pokémon"""
-    start_time = time.time()
+    """
+    Servir una imagen específica de un Pokémon.
+    Parámetros query opcionales:
+    - w: ancho de la variante redimensionada (ver POKE_IMAGES_VARIANT_WIDTHS)
+    - format: 'webp', 'jpeg' o 'png'; si se omite con w se negocia por Accept
+    """
     try:
-        logger.info(f"{datetime.now().isoformat()}|POKE_IMAGES_SERVICE|LOCAL_FILES|get_pokemon_image Started - Pokemon: {pokemon_name} - Image: {image_name}")
-        
-        image_path = image_handler.get_pokemon_image_path(pokemon_name, image_name)
+        image = image_handler.get_pokemon_image_entry(pokemon_name, image_name)
         
-        if image_path and os.path.exists(image_path):
-            end_time = time.time()
-            latency = round((end_time - start_time) * 1000, 2)
+        if image:
+            if 'w' in request.args or 'format' in request.args:
+                try:
+                    width, image_format, negotiated = image_handler.variants.resolve_params(
+                        request.args.get('w'), request.args.get('format'),
+                        request.headers.get('Accept'), image.filename
+                    )
+                except ValueError as e:
+                    logger.warning("POKE_IMAGES_SERVICE|LOCAL_FILES|get_pokemon_image Invalid Params - Pokemon: %s - Image: %s - Error: %s", pokemon_name, image_name, e)
+                    return jsonify({"error": f"Invalid variant parameter: {str(e)}"}), 400
+                try:
+                    return _send_variant_image(image, width, image_format, negotiated, IMAGE_CACHE_MAX_AGE)
+                except ImportError:
+                    logger.error("POKE_IMAGES_SERVICE|LOCAL_FILES|get_pokemon_image Variant unavailable - Pillow not installed")
+                    return jsonify({"error": "Image variants are not available on this server"}), 501
             
-            logger.info(f"{datetime.now().isoformat()}|POKE_IMAGES_SERVICE|LOCAL_FILES|get_pokemon_image Completed - Pokemon: {pokemon_name} - Image: {image_name} - Latency: {latency}ms")
-            
-            return send_file(image_path)
+            return _send_catalog_image(image, IMAGE_CACHE_MAX_AGE)
         else:
-            end_time = time.time()
-            latency = round((end_time - start_time) * 1000, 2)
-            
-            logger.warning(f"{datetime.now().isoformat()}|POKE_IMAGES_SERVICE|LOCAL_FILES|get_pokemon_image Not Found - Pokemon: {pokemon_name} - Image: {image_name} - Latency: {latency}ms")
+            logger.warning("POKE_IMAGES_SERVICE|LOCAL_FILES|get_pokemon_image Not Found - Pokemon: %s - Image: %s", pokemon_name, image_name)
             return jsonify({"error": f"Image not found: {image_name} for pokemon: {pokemon_name}"}), 404
             
+    except FileNotFoundError:
+        # El archivo se eliminó después del último refresco del catálogo
+        logger.warning("POKE_IMAGES_SERVICE|LOCAL_FILES|get_pokemon_image Stale catalog entry - Pokemon: %s - Image: %s", pokemon_name, image_name)
+        return jsonify({"error": f"No images found for pokemon: {pokemon_name}"}), 404
     except Exception as e:
-        end_time = time.time()
-        latency = round((end_time - start_time) * 1000, 2)
-        logger.error(f"{datetime.now().isoformat()}|POKE_IMAGES_SERVICE|LOCAL_FILES|get_pokemon_image Failed - Pokemon: {pokemon_name} - Image: {image_name} - Latency: {latency}ms - Error: {str(e)}")
+        logger.error("POKE_IMAGES_SERVICE|LOCAL_FILES|get_pokemon_image Failed - Pokemon: %s - Image: %s - Error: %s", pokemon_name, image_name, e)
         return jsonify({"error": f"Internal server error: {str(e)}"}), 500
 
 @app.route('/pokemon/<pokemon_name>/random-image', methods=['GET'])
 def get_random_pokemon_image(pokemon_name):
     """Obtener una imagen aleatoria de un Pokémon"""
-    start_time = time.time()
     try:
-        logger.info(f"{datetime.now().isoformat()}|POKE_IMAGES_SERVICE|LOCAL_FILES|get_random_pokemon_image Started - Pokemon: {pokemon_name}")
-        
-        random_image_path = image_handler.get_random_pokemon_image(pokemon_name)
+        random_image = image_handler.get_random_pokemon_image_entry(pokemon_name)
         
-        if random_image_path and os.path.exists(random_image_path):
-            end_time = time.time()
-            latency = round((end_time - start_time) * 1000, 2)
-            
-            image_name = os.path.basename(random_image_path)
-            logger.info(f"{datetime.now().isoformat()}|POKE_IMAGES_SERVICE|LOCAL_FILES|get_random_pokemon_image Completed - Pokemon: {pokemon_name} - Image: {image_name} - Latency: {latency}ms")
-            
-            return send_file(random_image_path)
+        if random_image:
+            return _send_catalog_image(random_image, 0)
         else:
-            end_time = time.time()
-            latency = round((end_time - start_time) * 1000, 2)
-            
-            logger.warning(f"{datetime.now().isoformat()}|POKE_IMAGES_SERVICE|LOCAL_FILES|get_random_pokemon_image Not Found - Pokemon: {pokemon_name} - Latency: {latency}ms")
+            logger.warning("POKE_IMAGES_SERVICE|LOCAL_FILES|get_random_pokemon_image Not Found - Pokemon: %s", pokemon_name)
             return jsonify({"error": f"No images found for pokemon: {pokemon_name}"}), 404
             
+    except FileNotFoundError:
+        # El archivo se eliminó después del último refresco del catálogo
+        logger.warning("POKE_IMAGES_SERVICE|LOCAL_FILES|get_random_pokemon_image Stale catalog entry - Pokemon: %s", pokemon_name)
+        return jsonify({"error": f"No images found for pokemon: {pokemon_name}"}), 404
     except Exception as e:
-        end_time = time.time()
-        latency = round((end_time - start_time) * 1000, 2)
-        logger.error(f"{datetime.now().isoformat()}|POKE_IMAGES_SERVICE|LOCAL_FILES|get_random_pokemon_image Failed - Pokemon: {pokemon_name} - Latency: {latency}ms - Error: {str(e)}")
+        logger.error("POKE_IMAGES_SERVICE|LOCAL_FILES|get_random_pokemon_image Failed - Pokemon: %s - Error: %s", pokemon_name, e)
         return jsonify({"error": f"Internal server error: {str(e)}"}), 500
 
+def _resolve_batch_item(name):
+    """Resolver un nombre del lote midiendo su latencia individual"""
+    start_time = time.time()
+    images_info = image_handler.get_pokemon_images_info(name)
+    return {
+        "name": name,
+        "images_info": images_info,
+        "status": "success" if images_info else "not_found",
+        "latency_ms": round((time.time() - start_time) * 1000, 2)
+    }
+
+def _iter_batch_results(pokemon_names):
+    """
+    Resolver el lote en el pool y entregar cada resultado apenas termina.
+    Solo hay como máximo 2 * BATCH_WORKERS tareas en vuelo, así la memoria
+    no crece con el tamaño del lote.
+    """
+    names = iter(pokemon_names)
+    pending = set()
+    for name in names:
+        pending.add(batch_executor.submit(_resolve_batch_item, name))
+        if len(pending) >= BATCH_WORKERS * 2:
+            break
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            name = next(names, None)
+            if name is not None:
+                pending.add(batch_executor.submit(_resolve_batch_item, name))
+            yield future.result()
+
+def _stream_batch_results(pokemon_names, start_time):
+    """Generar la respuesta NDJSON: una línea por Pokémon y una línea final de resumen"""
+    successful = 0
+    try:
+        for result in _iter_batch_results(pokemon_names):
+            if result["status"] == "success":
+                successful += 1
+            yield json.dumps(result) + "\n"
+        latency = round((time.time() - start_time) * 1000, 2)
+        logger.info("POKE_IMAGES_SERVICE|LOCAL_FILES|get_batch_pokemon_images Completed - Count: %s - Streamed: True - Latency: %sms", len(pokemon_names), latency)
+        yield json.dumps({
+            "summary": {
+                "total_processed": len(pokemon_names),
+                "successful": successful,
+                "latency_ms": latency,
+                "timestamp": datetime.now().isoformat()
+            }
+        }) + "\n"
+    except Exception as e:
+        latency = round((time.time() - start_time) * 1000, 2)
+        logger.error("POKE_IMAGES_SERVICE|LOCAL_FILES|get_batch_pokemon_images Failed - Streamed: True - Latency: %sms - Error: %s", latency, e)
+        yield json.dumps({"error": f"Internal server error: {str(e)}"}) + "\n"
+
 @app.route('/pokemon/batch-images', methods=['POST'])
 def get_batch_pokemon_images():
-    """Obtener información de imágenes de múltiples Pokémon (para testing)"""
+    """
+    Obtener información de imágenes de múltiples Pokémon (para testing).
+    Los nombres se resuelven en paralelo. Con ?stream=1 o Accept: application/x-ndjson
+    la respuesta es NDJSON y cada resultado se envía apenas está listo.
+    """
+    # La telemetría mide hasta enviar las cabeceras: el resumen del stream lleva su propia latencia
     start_time = time.time()
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True) or {}
         pokemon_names = data.get('pokemon_names', [])
         
-        logger.info(f"{datetime.now().isoformat()}|POKE_IMAGES_SERVICE|LOCAL_FILES|get_batch_pokemon_images Started - Count: {len(pokemon_names)}")
-        
-        results = []
-        for name in pokemon_names:
-            images_info = image_handler.get_pokemon_images_info(name)
-            if images_info:
-                results.append({
-                    "name": name,
-                    "images_info": images_info,
-                    "status": "success"
-                })
-            else:
-                results.append({
-                    "name": name,
-                    "images_info": None,
-                    "status": "not_found"
-                })
-        
-        end_time = time.time()
-        latency = round((end_time - start_time) * 1000, 2)
-        
-        logger.info(f"{datetime.now().isoformat()}|POKE_IMAGES_SERVICE|LOCAL_FILES|get_batch_pokemon_images Completed - Count: {len(pokemon_names)} - Latency: {latency}ms")
+        if not isinstance(pokemon_names, list) or not all(isinstance(name, str) for name in pokemon_names):
+            return jsonify({"error": "pokemon_names must be a list of strings"}), 400
+        
+        stream = request.args.get('stream') == '1' or 'application/x-ndjson' in request.headers.get('Accept', '')
+        
+        if stream:
+            return Response(_stream_batch_results(pokemon_names, start_time), mimetype='application/x-ndjson'), 200
+        
+        # map conserva el orden de entrada
+        results = list(batch_executor.map(_resolve_batch_item, pokemon_names))
         
         return jsonify({
             "results": results,
             "total_processed": len(pokemon_names),
             "successful": len([r for r in results if r["status"] == "success"]),
-            "latency_ms": latency,
+            "latency_ms": request_latency_ms(),
             "timestamp": datetime.now().isoformat()
         }), 200
         
     except Exception as e:
-        end_time = time.time()
-        latency = round((end_time - start_time) * 1000, 2)
-        logger.error(f"{datetime.now().isoformat()}|POKE_IMAGES_SERVICE|LOCAL_FILES|get_batch_pokemon_images Failed - Latency: {latency}ms - Error: {str(e)}")
+        logger.error("POKE_IMAGES_SERVICE|LOCAL_FILES|get_batch_pokemon_images Failed - Error: %s", e)
         return jsonify({"error": f"Internal server error: {str(e)}"}), 500
 
+@app.route('/pokemon/sprite-sheet', methods=['POST'])
+def get_sprite_sheet():
+    """
+    Empaquetar las miniaturas de varios Pokémon en un único sprite sheet.
+    Body JSON: {"pokemon_names": [...], "tile": 64, "format": "webp"}
+    Devuelve el mapa de coordenadas y la URL (inmutable) de la imagen.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        pokemon_names = data.get('pokemon_names', [])
+        
+        try:
+            tile_size, image_format = image_handler.sprite_sheets.resolve_params(
+                pokemon_names, data.get('tile', SPRITE_SHEET_DEFAULT_TILE), data.get('format')
+            )
+        except (TypeError, ValueError) as e:
+            logger.warning("POKE_IMAGES_SERVICE|LOCAL_FILES|get_sprite_sheet Invalid Params - Error: %s", e)
+            return jsonify({"error": f"Invalid sprite sheet parameter: {str(e)}"}), 400
+        
+        try:
+            sheet_id, sheet_map, missing = image_handler.sprite_sheets.get_sprite_sheet(pokemon_names, tile_size, image_format)
+        except ImportError:
+            logger.error("POKE_IMAGES_SERVICE|LOCAL_FILES|get_sprite_sheet Unavailable - Pillow not installed")
+            return jsonify({"error": "Sprite sheets are not available on this server"}), 501
+        
+        if sheet_id is None:
+            logger.warning("POKE_IMAGES_SERVICE|LOCAL_FILES|get_sprite_sheet Not Found - Count: %s", len(pokemon_names))
+            return jsonify({"error": "No images found for the requested pokemon", "missing": missing}), 404
+        
+        return jsonify({
+            "sheet_id": sheet_id,
+            "sheet_url": f"/sprite-sheets/{sheet_id}{VARIANT_FORMATS[image_format][0]}",
+            "sheet": sheet_map,
+            "missing": missing,
+            "latency_ms": request_latency_ms(),
+            "timestamp": datetime.now().isoformat()
+        }), 200
+        
+    except Exception as e:
+        logger.error("POKE_IMAGES_SERVICE|LOCAL_FILES|get_sprite_sheet Failed - Error: %s", e)
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+@app.route('/sprite-sheets/<sheet_file>', methods=['GET'])
+def get_sprite_sheet_image(sheet_file):
+    """Servir la imagen de un sprite sheet generado (direccionada por contenido)"""
+    match = re.fullmatch(r'([0-9a-f]{40})(\.[a-z]+)', sheet_file)
+    formats_by_extension = {extension: name for name, (extension, _, _) in VARIANT_FORMATS.items()}
+    if not match or match.group(2) not in formats_by_extension:
+        return jsonify({"error": f"Sprite sheet not found: {sheet_file}"}), 404
+    sheet_path = image_handler.sprite_sheets.sheet_path(match.group(1), formats_by_extension[match.group(2)])
+    if not os.path.exists(sheet_path):
+        return jsonify({"error": f"Sprite sheet not found: {sheet_file}"}), 404
+    # El id depende del contenido: la URL nunca cambia de significado
+    response = send_file(sheet_path, conditional=True, etag=match.group(1), max_age=IMAGE_CACHE_MAX_AGE)
+    response.cache_control.immutable = True
+    return response
+
 @app.route('/available-pokemon', methods=['GET'])
 def get_available_pokemon():
     """Obtener lista de Pokémon que tienen imágenes disponibles"""
-    start_time = time.time()
     try:
-        logger.info(f"{datetime.now().isoformat()}|POKE_IMAGES_SERVICE|LOCAL_FILES|get_available_pokemon Started")
-        
         available_pokemon = image_handler.get_available_pokemon_list()
         
-        end_time = time.time()
-        latency = round((end_time - start_time) * 1000, 2)
-        
-        logger.info(f"{datetime.now().isoformat()}|POKE_IMAGES_SERVICE|LOCAL_FILES|get_available_pokemon Completed - Count: {len(available_pokemon)} - Latency: {latency}ms")
-        
         return jsonify({
             "available_pokemon": available_pokemon,
             "total_count": len(available_pokemon),
-            "latency_ms": latency,
+            "latency_ms": request_latency_ms(),
             "timestamp": datetime.now().isoformat()
         }), 200
         
     except Exception as e:
-        end_time = time.time()
-        latency = round((end_time - start_time) * 1000, 2)
-        logger.error(f"{datetime.now().isoformat()}|POKE_IMAGES_SERVICE|LOCAL_FILES|get_available_pokemon Failed - Latency: {latency}ms - Error: {str(e)}")
+        logger.error("POKE_IMAGES_SERVICE|LOCAL_FILES|get_available_pokemon Failed - Error: %s", e)
         return jsonify({"error": f"Internal server error: {str(e)}"}), 500
 
 if __name__ == '__main__':
-    logger.info(f"{datetime.now().isoformat()}|POKE_IMAGES_SERVICE|SYSTEM|startup Service starting on port 5003")
+    logger.info("POKE_IMAGES_SERVICE|SYSTEM|startup Service starting on port 5003")
     app.run(host='0.0.0.0', port=5003, debug=True)
\ No newline at end of file
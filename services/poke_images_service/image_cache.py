@@ -0,0 +1,102 @@
+import os
+import threading
+from collections import OrderedDict
+
+# Presupuesto de memoria (MB) para bytes de imágenes calientes; 0 desactiva la caché
+IMAGE_BYTE_CACHE_MB = float(os.environ.get('POKE_IMAGES_BYTE_CACHE_MB', 32))
+# Tamaño máximo de una imagen individual para entrar en la caché (MB)
+IMAGE_BYTE_CACHE_MAX_ITEM_MB = float(os.environ.get('POKE_IMAGES_BYTE_CACHE_MAX_ITEM_MB', 2))
+
+class ImageByteCache:
+    def __init__(self, max_bytes, max_item_bytes):
+        """
+        Caché LRU en memoria de bytes de imágenes, acotada por un presupuesto de bytes.
+        La clave incluye tamaño y mtime del catálogo, así una imagen modificada
+        no se sirve desde una versión vieja en memoria.
+        """
+        self.max_bytes = int(max_bytes)
+        self.max_item_bytes = int(max_item_bytes)
+        self._items = OrderedDict()
+        self._current_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejected = 0
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def get(self, key):
+        """Obtener bytes cacheados (y marcarlos como recientes) o None"""
+        with self._lock:
+            data = self._items.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def admits(self, size):
+        """Si una imagen de size bytes puede entrar en la caché"""
+        return size <= self.max_item_bytes and size <= self.max_bytes
+
+    def put(self, key, data):
+        """Guardar bytes, expulsando las entradas menos recientes hasta respetar el presupuesto"""
+        size = len(data)
+        if not self.admits(size):
+            with self._lock:
+                self.rejected += 1
+            return False
+        with self._lock:
+            previous = self._items.pop(key, None)
+            if previous is not None:
+                self._current_bytes -= len(previous)
+            self._items[key] = data
+            self._current_bytes += size
+            while self._current_bytes > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._current_bytes -= len(evicted)
+                self.evictions += 1
+        return True
+
+    def get_or_load(self, key, path, size_bytes=None):
+        """
+        Obtener bytes desde la caché o leerlos de disco y cachearlos.
+        Si size_bytes (tamaño del catálogo) no entra en la caché devuelve None sin
+        leer el archivo: el llamador la sirve desde disco con send_file.
+        """
+        if size_bytes is not None and not self.admits(size_bytes):
+            with self._lock:
+                self.rejected += 1
+            return None
+        data = self.get(key)
+        if data is None:
+            with open(path, 'rb') as f:
+                data = f.read()
+            self.put(key, data)
+        return data
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._current_bytes = 0
+
+    def get_stats(self):
+        """Contadores de la caché para monitoreo"""
+        with self._lock:
+            requests_count = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._items),
+                "current_bytes": self._current_bytes,
+                "max_bytes": self.max_bytes,
+                "max_item_bytes": self.max_item_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "rejected": self.rejected,
+                "hit_ratio": round(self.hits / requests_count, 4) if requests_count else None
+            }
@@ -0,0 +1,277 @@
+import os
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from collections import namedtuple
+from types import MappingProxyType
+from datetime import datetime
+from logger import setup_logger
+
+# Intervalo (segundos) con el que se revisan cambios en los directorios de imágenes
+CATALOG_REFRESH_INTERVAL = float(os.environ.get('POKE_IMAGES_CATALOG_REFRESH_INTERVAL', 10))
+# Hilos usados para escanear directorios en paralelo (1 = escaneo secuencial)
+CATALOG_SCAN_WORKERS = int(os.environ.get('POKE_IMAGES_CATALOG_SCAN_WORKERS', 8))
+
+SUPPORTED_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp')
+
+# Estructuras inmutables del catálogo
+ImageEntry = namedtuple('ImageEntry', ['filename', 'path', 'size_bytes', 'mtime', 'modified_date'])
+PokemonEntry = namedtuple('PokemonEntry', ['name', 'directory_path', 'directory_mtime', 'images', 'files', 'total_size_bytes'])
+CatalogSnapshot = namedtuple('CatalogSnapshot', [
+    'entries', 'directories', 'pokemon_list', 'version', 'base_mtime', 'pokemon_count', 'file_count',
+    'total_size_bytes', 'memory_bytes', 'built_at', 'build_latency_ms'
+])
+
+def normalize_catalog_key(pokemon_name):
+    """Clave de búsqueda del catálogo (case-insensitive)"""
+    return pokemon_name.strip().lower()
+
+def _estimate_memory(entries, pokemon_list):
+    """Estimación del tamaño en memoria de las estructuras del catálogo"""
+    total = sys.getsizeof(entries) + sys.getsizeof(pokemon_list)
+    for key, entry in entries.items():
+        total += sys.getsizeof(key) + sys.getsizeof(entry) + sys.getsizeof(entry.name)
+        total += sys.getsizeof(entry.directory_path) + sys.getsizeof(entry.images) + sys.getsizeof(entry.files)
+        for image in entry.images:
+            total += sys.getsizeof(image) + sys.getsizeof(image.filename) + sys.getsizeof(image.path)
+            total += sys.getsizeof(image.modified_date)
+    for item in pokemon_list:
+        total += sys.getsizeof(item)
+    return total
+
+class ImageCatalog:
+    def __init__(self, base_images_path, scan_workers=CATALOG_SCAN_WORKERS):
+        """
+        Catálogo en memoria de data/Poke_Img: archivos, tamaños y mtimes por Pokémon.
+        Se construye una vez y se refresca de forma incremental en segundo plano;
+        los lectores solo acceden al snapshot publicado, sin tocar el sistema de archivos.
+        """
+        self.logger = setup_logger()
+        self.base_images_path = base_images_path
+        self.scan_workers = max(1, scan_workers)
+        self._snapshot = None
+        self._version = 0
+        self._build_lock = threading.Lock()
+        self._init_lock = threading.Lock()
+        self._refresh_thread = None
+        self._refresh_stop = threading.Event()
+
+    def _scan_directory(self, name, directory_path, directory_mtime):
+        """Escanear un directorio de Pokémon con os.scandir y construir su entrada"""
+        images = []
+        with os.scandir(directory_path) as iterator:
+            for dir_entry in iterator:
+                _, ext = os.path.splitext(dir_entry.name.lower())
+                if ext not in SUPPORTED_EXTENSIONS or not dir_entry.is_file():
+                    continue
+                file_stats = dir_entry.stat()
+                images.append(ImageEntry(
+                    filename=dir_entry.name,
+                    path=dir_entry.path,
+                    size_bytes=file_stats.st_size,
+                    mtime=file_stats.st_mtime,
+                    modified_date=datetime.fromtimestamp(file_stats.st_mtime).isoformat()
+                ))
+        images.sort(key=lambda image: image.filename)
+        return PokemonEntry(
+            name=name,
+            directory_path=directory_path,
+            directory_mtime=directory_mtime,
+            images=tuple(images),
+            files=MappingProxyType({image.filename: image for image in images}),
+            total_size_bytes=sum(image.size_bytes for image in images)
+        )
+
+    def _list_directories(self):
+        """Listar los directorios de Pokémon con su mtime actual"""
+        directories = []
+        with os.scandir(self.base_images_path) as iterator:
+            for dir_entry in iterator:
+                if dir_entry.is_dir():
+                    directories.append((dir_entry.name, dir_entry.path, dir_entry.stat().st_mtime))
+        directories.sort()
+        return directories
+
+    def _scan_directory_safe(self, directory):
+        """Escanear un directorio registrando errores en lugar de propagarlos"""
+        name, directory_path, directory_mtime = directory
+        try:
+            return self._scan_directory(name, directory_path, directory_mtime)
+        except OSError as e:
+            self.logger.error("POKE_IMAGES_SERVICE|LOCAL_FILES|scan_directory Error - Path: %s - Error: %s", directory_path, e)
+            return None
+
+    def _files_changed(self, entry):
+        """
+        True si algún archivo del directorio cambió de tamaño o mtime (o desapareció).
+        Sobrescribir un archivo en el mismo lugar no cambia el mtime del directorio,
+        pero sí el del archivo: sin esta comprobación el catálogo (y el ETag y las
+        claves de caché derivadas de él) seguirían con los valores viejos.
+        """
+        try:
+            for image in entry.images:
+                file_stats = os.stat(image.path)
+                if file_stats.st_size != image.size_bytes or file_stats.st_mtime != image.mtime:
+                    return True
+        except OSError:
+            return True
+        return False
+
+    def _map_directories(self, function, items):
+        """Aplicar function a cada elemento, en el pool de hilos si hay más de un worker"""
+        workers = min(self.scan_workers, len(items))
+        if workers <= 1:
+            return [function(item) for item in items]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='catalog-scan') as executor:
+            return list(executor.map(function, items))
+
+    def _scan_directories(self, directories):
+        """
+        Escanear una lista de directorios (nombre, ruta, mtime) y devolver sus entradas.
+        Con varios workers el escaneo se reparte en un pool de hilos: la latencia
+        de cada scandir/stat (disco frío o volumen de red) se solapa entre directorios.
+        """
+        entries = self._map_directories(self._scan_directory_safe, directories)
+        return [entry for entry in entries if entry is not None]
+
+    def _publish(self, entries, base_mtime, start_time, rescanned):
+        """Construir un snapshot nuevo a partir de las entradas y publicarlo con una sola asignación"""
+        by_key = {}
+        for entry in entries:
+            if entry.images:
+                by_key[normalize_catalog_key(entry.name)] = entry
+        pokemon_list = tuple(
+            {"name": entry.name, "images_count": len(entry.images), "directory_path": entry.directory_path}
+            for entry in sorted(by_key.values(), key=lambda entry: entry.name)
+        )
+        latency = round((time.time() - start_time) * 1000, 2)
+        self._version += 1
+        snapshot = CatalogSnapshot(
+            entries=MappingProxyType(by_key),
+            directories=MappingProxyType({entry.directory_path: entry for entry in entries}),
+            pokemon_list=pokemon_list,
+            version=self._version,
+            base_mtime=base_mtime,
+            pokemon_count=len(by_key),
+            file_count=sum(len(entry.images) for entry in by_key.values()),
+            total_size_bytes=sum(entry.total_size_bytes for entry in by_key.values()),
+            memory_bytes=_estimate_memory(by_key, pokemon_list),
+            built_at=datetime.now().isoformat(),
+            build_latency_ms=latency
+        )
+        self._snapshot = snapshot
+        self.logger.info("POKE_IMAGES_SERVICE|LOCAL_FILES|build_catalog Success - Version: %s - Pokemon: %s - Files: %s - Rescanned: %s - Workers: %s - Latency: %sms", snapshot.version, snapshot.pokemon_count, snapshot.file_count, rescanned, self.scan_workers, latency)
+        return snapshot
+
+    def build(self):
+        """Escaneo completo del directorio base"""
+        start_time = time.time()
+        with self._build_lock:
+            try:
+                base_mtime = os.stat(self.base_images_path).st_mtime
+                directories = self._list_directories()
+                entries = self._scan_directories(directories)
+                return self._publish(entries, base_mtime, start_time, len(directories))
+            except OSError as e:
+                latency = round((time.time() - start_time) * 1000, 2)
+                self.logger.error("POKE_IMAGES_SERVICE|LOCAL_FILES|build_catalog Error - Path: %s - Latency: %sms - Error: %s", self.base_images_path, latency, e)
+                return None
+
+    def refresh(self):
+        """
+        Refresco incremental: se vuelven a escanear los directorios nuevos, los cuyo
+        mtime cambió (archivos agregados/eliminados) y aquellos con algún archivo
+        sobrescrito en el lugar (se hace stat de cada archivo ya catalogado).
+        Devuelve True si hubo cambios.
+        """
+        if self._snapshot is None:
+            return self.get_snapshot() is not None
+        start_time = time.time()
+        with self._build_lock:
+            snapshot = self._snapshot
+            base_mtime = os.stat(self.base_images_path).st_mtime
+            directories = self._list_directories()
+            current = snapshot.directories
+            changed = [
+                directory for directory in directories
+                if directory[1] not in current or current[directory[1]].directory_mtime != directory[2]
+            ]
+            changed_paths = {directory[1] for directory in changed}
+            unchanged = [directory for directory in directories if directory[1] not in changed_paths]
+            stale = self._map_directories(lambda directory: self._files_changed(current[directory[1]]), unchanged)
+            changed.extend(directory for directory, is_stale in zip(unchanged, stale) if is_stale)
+            listed_paths = {directory[1] for directory in directories}
+            removed = [path for path in current if path not in listed_paths]
+            if not changed and not removed and base_mtime == snapshot.base_mtime:
+                return False
+            rescanned = {entry.directory_path: entry for entry in self._scan_directories(changed)}
+            entries = [
+                rescanned.get(path) or current.get(path)
+                for _, path, _ in directories
+                if path in rescanned or path in current
+            ]
+            self._publish(entries, base_mtime, start_time, len(changed))
+            return True
+
+    def _refresh_loop(self, interval):
+        """Bucle de refresco en segundo plano"""
+        while not self._refresh_stop.wait(interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                self.logger.error("POKE_IMAGES_SERVICE|LOCAL_FILES|refresh_catalog Error - Error: %s", e)
+
+    def start_refresher(self, interval=CATALOG_REFRESH_INTERVAL):
+        """Construir el catálogo (si hace falta) e iniciar el hilo de refresco incremental"""
+        if self._refresh_thread is not None and self._refresh_thread.is_alive():
+            return self._refresh_thread
+        self.get_snapshot()
+        self._refresh_stop.clear()
+        self._refresh_thread = threading.Thread(
+            target=self._refresh_loop, args=(interval,), name='image-catalog-refresher', daemon=True
+        )
+        self._refresh_thread.start()
+        return self._refresh_thread
+
+    def stop_refresher(self):
+        """Detener el hilo de refresco"""
+        self._refresh_stop.set()
+        if self._refresh_thread is not None:
+            self._refresh_thread.join(timeout=5)
+            self._refresh_thread = None
+
+    def get_snapshot(self):
+        """Obtener el snapshot publicado, construyéndolo la primera vez"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._init_lock:
+                if self._snapshot is None:
+                    self.build()
+                snapshot = self._snapshot
+        return snapshot
+
+    def get_entry(self, pokemon_name):
+        """Buscar la entrada de un Pokémon (O(1), sin tocar disco)"""
+        snapshot = self.get_snapshot()
+        if snapshot is None:
+            return None
+        return snapshot.entries.get(normalize_catalog_key(pokemon_name))
+
+    def get_info(self):
+        """Métricas del catálogo para /health"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            return {"built": False, "version": 0}
+        return {
+            "built": True,
+            "version": snapshot.version,
+            "pokemon_count": snapshot.pokemon_count,
+            "file_count": snapshot.file_count,
+            "total_size_bytes": snapshot.total_size_bytes,
+            "memory_bytes": snapshot.memory_bytes,
+            "built_at": snapshot.built_at,
+            "build_latency_ms": snapshot.build_latency_ms,
+            "scan_workers": self.scan_workers,
+            "refresher_running": self._refresh_thread is not None and self._refresh_thread.is_alive()
+        }
@@ -1,8 +1,11 @@
 import os
 import random
 import time
-from datetime import datetime
 from logger import setup_logger
+from image_catalog import ImageCatalog, SUPPORTED_EXTENSIONS
+from image_cache import ImageByteCache, IMAGE_BYTE_CACHE_MB, IMAGE_BYTE_CACHE_MAX_ITEM_MB
+from image_variants import ImageVariantService
+from sprite_sheets import SpriteSheetService
 
 class ImageHandler:
     def __init__(self):
@@ -13,74 +16,64 @@ class ImageHandler:
             'data', 
             'Poke_Img'
         )
-        self.supported_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp']
+        self.supported_extensions = list(SUPPORTED_EXTENSIONS)
+        # Catálogo en memoria: el camino caliente no consulta metadatos del disco
+        self.catalog = ImageCatalog(self.base_images_path)
+        # Caché LRU de bytes para las imágenes más pedidas (opcional)
+        self.byte_cache = ImageByteCache(
+            IMAGE_BYTE_CACHE_MB * 1024 * 1024,
+            IMAGE_BYTE_CACHE_MAX_ITEM_MB * 1024 * 1024
+        )
+        # Variantes redimensionadas / convertidas con caché persistente en disco
+        self.variants = ImageVariantService()
+        # Sprite sheets construidos a partir de las miniaturas cacheadas
+        self.sprite_sheets = SpriteSheetService(self.catalog, self.variants)
         
     def get_images_base_path(self):
         """Obtener la ruta base del directorio de imágenes"""
         return self.base_images_path
     
-    def _normalize_pokemon_name(self, pokemon_name):
-        """Normalizar el nombre del Pokémon para búsqueda de carpetas"""
-        # Capitalizar primera letra (ej: pikachu -> Pikachu)
-        return pokemon_name.strip().capitalize()
+    def _image_to_dict(self, image):
+        """Convertir una entrada del catálogo al formato de respuesta"""
+        return {
+            "filename": image.filename,
+            "path": image.path,
+            "size_bytes": image.size_bytes,
+            "modified_date": image.modified_date
+        }
     
-    def _get_pokemon_directory(self, pokemon_name):
-        """Obtener el directorio de un Pokémon específico"""
-        normalized_name = self._normalize_pokemon_name(pokemon_name)
-        pokemon_dir = os.path.join(self.base_images_path, normalized_name)
-        return pokemon_dir if os.path.exists(pokemon_dir) else None
+    def get_image_etag(self, image):
+        """ETag fuerte derivado del catálogo: tamaño + mtime (en microsegundos)"""
+        return f"{image.size_bytes:x}-{int(image.mtime * 1000000):x}"
     
-    def _get_image_files(self, directory_path):
-        """Obtener lista de archivos de imagen en un directorio"""
-        start_time = time.time()
-        
-        try:
-            if not os.path.exists(directory_path):
-                return []
-            
-            image_files = []
-            for filename in os.listdir(directory_path):
-                file_path = os.path.join(directory_path, filename)
-                if os.path.isfile(file_path):
-                    # Verificar extensión
-                    _, ext = os.path.splitext(filename.lower())
-                    if ext in self.supported_extensions:
-                        # Obtener información del archivo
-                        file_stats = os.stat(file_path)
-                        image_files.append({
-                            "filename": filename,
-                            "path": file_path,
-                            "size_bytes": file_stats.st_size,
-                            "modified_date": datetime.fromtimestamp(file_stats.st_mtime).isoformat()
-                        })
-            
-            end_time = time.time()
-            scan_latency = round((end_time - start_time) * 1000, 2)
-            
-            self.logger.info(f"{datetime.now().isoformat()}|POKE_IMAGES_SERVICE|LOCAL_FILES|_get_image_files Scanned directory - Path: {directory_path} - Files: {len(image_files)} - Scan Latency: {scan_latency}ms")
-            
-            return image_files
-            
-        except Exception as e:
-            end_time = time.time()
-            scan_latency = round((end_time - start_time) * 1000, 2)
-            self.logger.error(f"{datetime.now().isoformat()}|POKE_IMAGES_SERVICE|LOCAL_FILES|_get_image_files Error scanning directory - Path: {directory_path} - Scan Latency: {scan_latency}ms - Error: {str(e)}")
-            return []
+    def get_image_bytes(self, image):
+        """
+        Obtener los bytes de una imagen desde la caché en memoria.
+        Devuelve None si la caché está desactivada o la imagen supera el tamaño
+        máximo por entrada (se sirve desde disco).
+        """
+        if not self.byte_cache.enabled:
+            return None
+        return self.byte_cache.get_or_load((image.path, image.size_bytes, image.mtime), image.path, image.size_bytes)
+    
+    def get_catalog_info(self):
+        """Métricas del catálogo (tiempo de construcción, memoria, conteos)"""
+        return self.catalog.get_info()
     
     def get_pokemon_images_info(self, pokemon_name):
         """Obtener información de todas las imágenes de un Pokémon"""
         start_time = time.time()
         
         try:
-            pokemon_dir = self._get_pokemon_directory(pokemon_name)
+            entry = self.catalog.get_entry(pokemon_name)
             
-            if not pokemon_dir:
+            if not entry:
                 end_time = time.time()
                 latency = round((end_time - start_time) * 1000, 2)
-                self.logger.warning(f"{datetime.now().isoformat()}|POKE_IMAGES_SERVICE|LOCAL_FILES|get_pokemon_images_info Directory not found - Pokemon: {pokemon_name} - Latency: {latency}ms")
+                self.logger.warning("POKE_IMAGES_SERVICE|LOCAL_FILES|get_pokemon_images_info Directory not found - Pokemon: %s - Latency: %sms", pokemon_name, latency)
                 return None
             
-            image_files = self._get_image_files(pokemon_dir)
+            image_files = [self._image_to_dict(image) for image in entry.images]
             
             end_time = time.time()
             latency = round((end_time - start_time) * 1000, 2)
@@ -88,74 +81,75 @@ class ImageHandler:
             if image_files:
                 result = {
                     "pokemon_name": pokemon_name,
-                    "directory_path": pokemon_dir,
+                    "directory_path": entry.directory_path,
                     "images_count": len(image_files),
                     "images": image_files,
-                    "total_size_bytes": sum(img["size_bytes"] for img in image_files)
+                    "total_size_bytes": entry.total_size_bytes
                 }
                 
-                self.logger.info(f"{datetime.now().isoformat()}|POKE_IMAGES_SERVICE|LOCAL_FILES|get_pokemon_images_info Success - Pokemon: {pokemon_name} - Images: {len(image_files)} - Latency: {latency}ms")
+                self.logger.info("POKE_IMAGES_SERVICE|LOCAL_FILES|get_pokemon_images_info Success - Pokemon: %s - Images: %s - Latency: %sms", pokemon_name, len(image_files), latency)
                 return result
             else:
-                self.logger.warning(f"{datetime.now().isoformat()}|POKE_IMAGES_SERVICE|LOCAL_FILES|get_pokemon_images_info No images found - Pokemon: {pokemon_name} - Latency: {latency}ms")
+                self.logger.warning("POKE_IMAGES_SERVICE|LOCAL_FILES|get_pokemon_images_info No images found - Pokemon: %s - Latency: %sms", pokemon_name, latency)
                 return None
                 
         except Exception as e:
             end_time = time.time()
             latency = round((end_time - start_time) * 1000, 2)
-            self.logger.error(f"{datetime.now().isoformat()}|POKE_IMAGES_SERVICE|LOCAL_FILES|get_pokemon_images_info Error - Pokemon: {pokemon_name} - Latency: {latency}ms - Error: {str(e)}")
+            self.logger.error("POKE_IMAGES_SERVICE|LOCAL_FILES|get_pokemon_images_info Error - Pokemon: %s - Latency: %sms - Error: %s", pokemon_name, latency, e)
             return None
     
-    def get_pokemon_image_path(self, pokemon_name, image_name):
-        """Obtener la ruta completa de una imagen específica"""
+    def get_pokemon_image_entry(self, pokemon_name, image_name):
+        """Obtener la entrada del catálogo (ruta, tamaño, mtime) de una imagen específica"""
         start_time = time.time()
         
         try:
-            pokemon_dir = self._get_pokemon_directory(pokemon_name)
+            entry = self.catalog.get_entry(pokemon_name)
             
-            if not pokemon_dir:
+            if not entry:
                 end_time = time.time()
                 latency = round((end_time - start_time) * 1000, 2)
-                self.logger.warning(f"{datetime.now().isoformat()}|POKE_IMAGES_SERVICE|LOCAL_FILES|get_pokemon_image_path Directory not found - Pokemon: {pokemon_name} - Image: {image_name} - Latency: {latency}ms")
+                self.logger.warning("POKE_IMAGES_SERVICE|LOCAL_FILES|get_pokemon_image_entry Directory not found - Pokemon: %s - Image: %s - Latency: %sms", pokemon_name, image_name, latency)
                 return None
             
-            image_path = os.path.join(pokemon_dir, image_name)
+            # Solo se sirven archivos presentes en el catálogo (evita rutas arbitrarias)
+            image = entry.files.get(image_name)
             
             end_time = time.time()
             latency = round((end_time - start_time) * 1000, 2)
             
-            if os.path.exists(image_path) and os.path.isfile(image_path):
-                self.logger.info(f"{datetime.now().isoformat()}|POKE_IMAGES_SERVICE|LOCAL_FILES|get_pokemon_image_path Success - Pokemon: {pokemon_name} - Image: {image_name} - Latency: {latency}ms")
-                return image_path
+            if image:
+                self.logger.info("POKE_IMAGES_SERVICE|LOCAL_FILES|get_pokemon_image_entry Success - Pokemon: %s - Image: %s - Latency: %sms", pokemon_name, image_name, latency)
+                return image
             else:
-                self.logger.warning(f"{datetime.now().isoformat()}|POKE_IMAGES_SERVICE|LOCAL_FILES|get_pokemon_image_path File not found - Pokemon: {pokemon_name} - Image: {image_name} - Latency: {latency}ms")
+                self.logger.warning("POKE_IMAGES_SERVICE|LOCAL_FILES|get_pokemon_image_entry File not found - Pokemon: %s - Image: %s - Latency: %sms", pokemon_name, image_name, latency)
                 return None
                 
         except Exception as e:
             end_time = time.time()
             latency = round((end_time - start_time) * 1000, 2)
-            self.logger.error(f"{datetime.now().isoformat()}|POKE_IMAGES_SERVICE|LOCAL_FILES|get_pokemon_image_path Error - Pokemon: {pokemon_name} - Image: {image_name} - Latency: {latency}ms - Error: {str(e)}")
+            self.logger.error("POKE_IMAGES_SERVICE|LOCAL_FILES|get_pokemon_image_entry Error - Pokemon: %s - Image: %s - Latency: %sms - Error: %s", pokemon_name, image_name, latency, e)
             return None
     
-    def get_random_pokemon_image(self, pokemon_name):
-        """Obtener una imagen aleatoria de un Pokémon"""
+    def get_random_pokemon_image_entry(self, pokemon_name):
+        """Obtener la entrada del catálogo de una imagen aleatoria de un Pokémon"""
         start_time = time.time()
         
         try:
-            pokemon_dir = self._get_pokemon_directory(pokemon_name)
+            entry = self.catalog.get_entry(pokemon_name)
             
-            if not pokemon_dir:
+            if not entry:
                 end_time = time.time()
                 latency = round((end_time - start_time) * 1000, 2)
-                self.logger.warning(f"{datetime.now().isoformat()}|POKE_IMAGES_SERVICE|LOCAL_FILES|get_random_pokemon_image Directory not found - Pokemon: {pokemon_name} - Latency: {latency}ms")
+                self.logger.warning("POKE_IMAGES_SERVICE|LOCAL_FILES|get_random_pokemon_image_entry Directory not found - Pokemon: %s - Latency: %sms", pokemon_name, latency)
                 return None
             
-            image_files = self._get_image_files(pokemon_dir)
+            image_files = entry.images
             
             if not image_files:
                 end_time = time.time()
                 latency = round((end_time - start_time) * 1000, 2)
-                self.logger.warning(f"{datetime.now().isoformat()}|POKE_IMAGES_SERVICE|LOCAL_FILES|get_random_pokemon_image No images found - Pokemon: {pokemon_name} - Latency: {latency}ms")
+                self.logger.warning("POKE_IMAGES_SERVICE|LOCAL_FILES|get_random_pokemon_image_entry No images found - Pokemon: %s - Latency: %sms", pokemon_name, latency)
                 return None
             
             # Seleccionar imagen aleatoria
@@ -164,14 +158,14 @@ class ImageHandler:
             end_time = time.time()
             latency = round((end_time - start_time) * 1000, 2)
             
-            self.logger.info(f"{datetime.now().isoformat()}|POKE_IMAGES_SERVICE|LOCAL_FILES|get_random_pokemon_image Success - Pokemon: {pokemon_name} - Selected: {random_image['filename']} - Latency: {latency}ms")
+            self.logger.info("POKE_IMAGES_SERVICE|LOCAL_FILES|get_random_pokemon_image_entry Success - Pokemon: %s - Selected: %s - Latency: %sms", pokemon_name, random_image.filename, latency)
             
-            return random_image["path"]
+            return random_image
             
         except Exception as e:
             end_time = time.time()
             latency = round((end_time - start_time) * 1000, 2)
-            self.logger.error(f"{datetime.now().isoformat()}|POKE_IMAGES_SERVICE|LOCAL_FILES|get_random_pokemon_image Error - Pokemon: {pokemon_name} - Latency: {latency}ms - Error: {str(e)}")
+            self.logger.error("POKE_IMAGES_SERVICE|LOCAL_FILES|get_random_pokemon_image_entry Error - Pokemon: %s - Latency: %sms - Error: %s", pokemon_name, latency, e)
             return None
     
     def get_available_pokemon_list(self):
@@ -179,34 +173,25 @@ class ImageHandler:
         start_time = time.time()
         
         try:
-            if not os.path.exists(self.base_images_path):
+            snapshot = self.catalog.get_snapshot()
+            if snapshot is None:
                 end_time = time.time()
                 latency = round((end_time - start_time) * 1000, 2)
-                self.logger.error(f"{datetime.now().isoformat()}|POKE_IMAGES_SERVICE|LOCAL_FILES|get_available_pokemon_list Base directory not found - Path: {self.base_images_path} - Latency: {latency}ms")
+                self.logger.error("POKE_IMAGES_SERVICE|LOCAL_FILES|get_available_pokemon_list Base directory not found - Path: %s - Latency: %sms", self.base_images_path, latency)
                 return []
             
-            pokemon_list = []
-            for item in os.listdir(self.base_images_path):
-                item_path = os.path.join(self.base_images_path, item)
-                if os.path.isdir(item_path):
-                    # Verificar si tiene imágenes
-                    image_files = self._get_image_files(item_path)
-                    if image_files:
-                        pokemon_list.append({
-                            "name": item,
-                            "images_count": len(image_files),
-                            "directory_path": item_path
-                        })
+            # Lista precomputada al construir el catálogo
+            pokemon_list = list(snapshot.pokemon_list)
             
             end_time = time.time()
             latency = round((end_time - start_time) * 1000, 2)
             
-            self.logger.info(f"{datetime.now().isoformat()}|POKE_IMAGES_SERVICE|LOCAL_FILES|get_available_pokemon_list Success - Pokemon count: {len(pokemon_list)} - Latency: {latency}ms")
+            self.logger.info("POKE_IMAGES_SERVICE|LOCAL_FILES|get_available_pokemon_list Success - Pokemon count: %s - Latency: %sms", len(pokemon_list), latency)
             
             return pokemon_list
             
         except Exception as e:
             end_time = time.time()
             latency = round((end_time - start_time) * 1000, 2)
-            self.logger.error(f"{datetime.now().isoformat()}|POKE_IMAGES_SERVICE|LOCAL_FILES|get_available_pokemon_list Error - Latency: {latency}ms - Error: {str(e)}")
+            self.logger.error("POKE_IMAGES_SERVICE|LOCAL_FILES|get_available_pokemon_list Error - Latency: %sms - Error: %s", latency, e)
             return []
\ No newline at end of file
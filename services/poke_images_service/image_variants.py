@@ -0,0 +1,217 @@
+import os
+import time
+import hashlib
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+from logger import setup_logger
+
+# Directorio de la caché persistente de variantes derivadas (miniaturas, WebP...)
+VARIANT_CACHE_DIR = os.environ.get(
+    'POKE_IMAGES_VARIANT_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'data', 'derived_images')
+)
+# Anchos permitidos: acotan cuántas variantes pueden generarse por imagen
+VARIANT_WIDTHS = tuple(int(value) for value in os.environ.get('POKE_IMAGES_VARIANT_WIDTHS', '64,128,256,512').split(','))
+# Procesos del pool de redimensionado y tiempo máximo de espera por variante
+VARIANT_WORKERS = int(os.environ.get('POKE_IMAGES_VARIANT_WORKERS', max(1, (os.cpu_count() or 2) // 2)))
+VARIANT_TIMEOUT = float(os.environ.get('POKE_IMAGES_VARIANT_TIMEOUT', 10))
+VARIANT_QUALITY = int(os.environ.get('POKE_IMAGES_VARIANT_QUALITY', 80))
+
+# Formato de salida -> (extensión, mimetype, formato de Pillow)
+VARIANT_FORMATS = {
+    'webp': ('.webp', 'image/webp', 'WEBP'),
+    'jpeg': ('.jpg', 'image/jpeg', 'JPEG'),
+    'png': ('.png', 'image/png', 'PNG')
+}
+_SOURCE_FORMATS = {'.jpg': 'jpeg', '.jpeg': 'jpeg', '.png': 'png', '.webp': 'webp'}
+
+def render_variant(source_path, target_path, width, image_format, quality):
+    """
+    Generar una variante redimensionada (se ejecuta en un proceso del pool).
+    Escribe en un temporal y lo renombra para que nunca se sirva un archivo a medias.
+    """
+    from PIL import Image
+
+    with Image.open(source_path) as source:
+        image = source
+        if width and width < source.width:
+            height = max(1, round(source.height * width / source.width))
+            image = source.resize((width, height), Image.LANCZOS)
+        pil_format = VARIANT_FORMATS[image_format][2]
+        if pil_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        tmp_path = f"{target_path}.tmp{os.getpid()}"
+        image.save(tmp_path, format=pil_format, quality=quality, optimize=True)
+    os.replace(tmp_path, target_path)
+    return os.path.getsize(target_path)
+
+class ImageVariantService:
+    def __init__(self, cache_dir=VARIANT_CACHE_DIR, workers=VARIANT_WORKERS):
+        """
+        Variantes derivadas de imágenes (ancho y formato) con caché persistente en disco.
+        El redimensionado corre en un pool de procesos; peticiones concurrentes de
+        la misma variante comparten un único trabajo.
+        """
+        self.logger = setup_logger()
+        self.cache_dir = cache_dir
+        self.workers = max(1, workers)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._in_flight = {}
+        self._in_flight_lock = threading.Lock()
+        self.generated = 0
+        self.cache_hits = 0
+        self.failures = 0
+
+    def _get_executor(self):
+        """Crear el pool de procesos bajo demanda"""
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def resolve_params(self, width_param, format_param, accept_header, source_filename):
+        """
+        Validar ?w= y ?format= y negociar el formato con el header Accept.
+        Devuelve (ancho, formato, negociado). Lanza ValueError si los parámetros son inválidos.
+        """
+        width = None
+        if width_param is not None:
+            try:
+                width = int(width_param)
+            except ValueError:
+                raise ValueError(f"Invalid width: {width_param}")
+            if width not in VARIANT_WIDTHS:
+                raise ValueError(f"Width must be one of {list(VARIANT_WIDTHS)}")
+        negotiated = False
+        if format_param:
+            image_format = format_param.strip().lower()
+            if image_format == 'jpg':
+                image_format = 'jpeg'
+            if image_format not in VARIANT_FORMATS:
+                raise ValueError(f"Format must be one of {list(VARIANT_FORMATS)}")
+        else:
+            negotiated = True
+            if 'image/webp' in (accept_header or ''):
+                image_format = 'webp'
+            else:
+                _, ext = os.path.splitext(source_filename.lower())
+                image_format = _SOURCE_FORMATS.get(ext, 'jpeg')
+        return width, image_format, negotiated
+
+    def _variant_path(self, image, width, image_format):
+        """Ruta en caché: hash del archivo fuente (ruta, tamaño, mtime) y parámetros"""
+        key = f"{image.path}|{image.size_bytes}|{image.mtime}|{width}|{image_format}|{VARIANT_QUALITY}"
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], digest + VARIANT_FORMATS[image_format][0]), digest
+
+    def get_variant(self, image, width, image_format):
+        """
+        Obtener (ruta, mimetype, etag) de la variante, generándola una sola vez.
+        Lanza ImportError si Pillow no está instalado.
+        """
+        start_time = time.time()
+        target_path, digest = self._variant_path(image, width, image_format)
+        mimetype = VARIANT_FORMATS[image_format][1]
+        if os.path.exists(target_path):
+            self.cache_hits += 1
+            return target_path, mimetype, digest
+
+        try:
+            size, owner = self.run_once(
+                target_path, render_variant, image.path, target_path, width, image_format, VARIANT_QUALITY
+            )
+        except Exception:
+            self.failures += 1
+            raise
+        if owner:
+            self.generated += 1
+            latency = round((time.time() - start_time) * 1000, 2)
+            self.logger.info("POKE_IMAGES_SERVICE|LOCAL_FILES|get_variant Generated - Source: %s - Width: %s - Format: %s - Bytes: %s - Latency: %sms", image.path, width, image_format, size, latency)
+        return target_path, mimetype, digest
+
+    def get_variants(self, images, width, image_format):
+        """
+        Rutas de las variantes de varias imágenes (en el mismo orden). Las que
+        faltan se envían todas juntas al pool y se esperan al final, así se
+        generan en paralelo en lugar de una tras otra.
+        Lanza ImportError si Pillow no está instalado.
+        """
+        start_time = time.time()
+        paths = []
+        pending = []
+        for image in images:
+            target_path, _ = self._variant_path(image, width, image_format)
+            paths.append(target_path)
+            if os.path.exists(target_path):
+                self.cache_hits += 1
+                continue
+            future, owner = self.submit_once(
+                target_path, render_variant, image.path, target_path, width, image_format, VARIANT_QUALITY
+            )
+            pending.append((future, owner))
+        if not pending:
+            return paths
+
+        done, not_done = wait([future for future, _ in pending], timeout=VARIANT_TIMEOUT)
+        try:
+            if not_done:
+                raise TimeoutError(f"{len(not_done)} variants not ready after {VARIANT_TIMEOUT}s")
+            for future in done:
+                future.result()
+        except Exception:
+            self.failures += 1
+            raise
+        generated = sum(1 for _, owner in pending if owner)
+        self.generated += generated
+        latency = round((time.time() - start_time) * 1000, 2)
+        self.logger.info("POKE_IMAGES_SERVICE|LOCAL_FILES|get_variants Generated - Count: %s - Width: %s - Format: %s - Latency: %sms", generated, width, image_format, latency)
+        return paths
+
+    def submit_once(self, key, function, *args):
+        """
+        Enviar function(*args) al pool de procesos, compartiendo el trabajo entre
+        peticiones concurrentes con la misma clave (la clave se libera al terminar).
+        Devuelve (future, owner) donde owner indica si esta llamada lo lanzó.
+        """
+        with self._in_flight_lock:
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._get_executor().submit(function, *args)
+                self._in_flight[key] = future
+        if owner:
+            future.add_done_callback(lambda done: self._release(key, done))
+        return future, owner
+
+    def _release(self, key, future):
+        with self._in_flight_lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    def run_once(self, key, function, *args):
+        """
+        Ejecutar function(*args) en el pool de procesos, compartiendo el trabajo
+        entre peticiones concurrentes con la misma clave.
+        Devuelve (resultado, owner) donde owner indica si esta llamada lo lanzó.
+        """
+        future, owner = self.submit_once(key, function, *args)
+        return future.result(timeout=VARIANT_TIMEOUT), owner
+
+    def get_stats(self):
+        """Contadores de generación y aciertos de la caché de variantes"""
+        return {
+            "cache_dir": self.cache_dir,
+            "workers": self.workers,
+            "allowed_widths": list(VARIANT_WIDTHS),
+            "generated": self.generated,
+            "cache_hits": self.cache_hits,
+            "failures": self.failures,
+            "in_flight": len(self._in_flight)
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
@@ -1,49 +1,24 @@
-import logging
 import os
-from datetime import datetime
+import sys
+
+# service_logging.py es compartido por los servicios y vive en services/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from service_logging import setup_service_logger, service_logging_stats
+
+SERVICE_NAME = 'poke_images_service'
+LOG_DIR = os.environ.get(
+    'POKE_IMAGES_LOG_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), 'logs', 'poke_images_service')
+)
 
 def setup_logger():
     """
     Configurar logger estándar para poke_images_service
-    Formato: {Fecha}{Modulo}{API}{Funcion} Message
+    Formato: {Fecha}|{Modulo}|{API}|{Funcion} Message
+    Nivel y cola se configuran con POKE_IMAGES_LOG_LEVEL, POKE_IMAGES_LOG_ASYNC y POKE_IMAGES_LOG_QUEUE_SIZE.
     """
-    
-    # Crear directorio de logs si no existe
-    log_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'logs', 'poke_images_service')
-    os.makedirs(log_dir, exist_ok=True)
-    
-    # Nombre del archivo de log con fecha
-    log_filename = f"poke_images_service_{datetime.now().strftime('%Y%m%d')}.log"
-    log_path = os.path.join(log_dir, log_filename)
-    
-    # Configurar logger
-    logger = logging.getLogger('poke_images_service')
-    logger.setLevel(logging.INFO)
-    
-    # Evitar duplicar handlers si ya está configurado
-    if logger.handlers:
-        return logger
-    
-    # Formatter personalizado que sigue el estándar requerido
-    # Formato: {Fecha}{Modulo}{API}{Funcion} Message
-    class StandardFormatter(logging.Formatter):
-        def format(self, record):
-            # El mensaje ya viene formateado desde las funciones
-            return record.getMessage()
-    
-    # Handler para archivo
-    file_handler = logging.FileHandler(log_path, encoding='utf-8')
-    file_handler.setLevel(logging.INFO)
-    file_handler.setFormatter(StandardFormatter())
-    
-    # Handler para consola (opcional para desarrollo)
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
-    console_handler.setFormatter(StandardFormatter())
-    
-    # Agregar handlers
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
-    
-    return logger
-    
\ No newline at end of file
+    return setup_service_logger(SERVICE_NAME, 'POKE_IMAGES', LOG_DIR, date_format='%Y%m%d')
+
+def get_logging_stats():
+    """Registros encolados y descartados por el handler asíncrono"""
+    return service_logging_stats(SERVICE_NAME)
@@ -0,0 +1,143 @@
+import os
+import json
+import math
+import time
+import hashlib
+from logger import setup_logger
+from image_catalog import normalize_catalog_key
+from image_variants import VARIANT_FORMATS, VARIANT_QUALITY, VARIANT_WIDTHS
+
+# Máximo de Pokémon por sprite sheet y tamaño de celda por defecto
+SPRITE_SHEET_MAX_NAMES = int(os.environ.get('POKE_IMAGES_SPRITE_SHEET_MAX_NAMES', 100))
+SPRITE_SHEET_DEFAULT_TILE = int(os.environ.get('POKE_IMAGES_SPRITE_SHEET_TILE', 64))
+
+def render_sprite_sheet(tiles, target_path, map_path, tile_size, columns, image_format, quality):
+    """
+    Empaquetar miniaturas en una grilla (se ejecuta en un proceso del pool).
+    tiles: lista de (nombre, ruta de la miniatura). Escribe la imagen y el mapa
+    de coordenadas de forma atómica y devuelve el mapa.
+    """
+    from PIL import Image
+
+    rows = max(1, math.ceil(len(tiles) / columns))
+    mode = 'RGB' if VARIANT_FORMATS[image_format][2] == 'JPEG' else 'RGBA'
+    background = (255, 255, 255) if mode == 'RGB' else (0, 0, 0, 0)
+    sheet = Image.new(mode, (columns * tile_size, rows * tile_size), background)
+    sprites = {}
+    for position, (name, tile_path) in enumerate(tiles):
+        with Image.open(tile_path) as tile:
+            tile = tile.convert(mode)
+            tile.thumbnail((tile_size, tile_size))
+            cell_x = (position % columns) * tile_size
+            cell_y = (position // columns) * tile_size
+            # Centrar la miniatura dentro de su celda
+            x = cell_x + (tile_size - tile.width) // 2
+            y = cell_y + (tile_size - tile.height) // 2
+            sheet.paste(tile, (x, y))
+            sprites[name] = {"x": x, "y": y, "w": tile.width, "h": tile.height}
+
+    sheet_map = {
+        "width": sheet.width,
+        "height": sheet.height,
+        "tile_size": tile_size,
+        "columns": columns,
+        "format": image_format,
+        "sprites": sprites
+    }
+    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+    tmp_path = f"{target_path}.tmp{os.getpid()}"
+    sheet.save(tmp_path, format=VARIANT_FORMATS[image_format][2], quality=quality)
+    os.replace(tmp_path, target_path)
+    tmp_map_path = f"{map_path}.tmp{os.getpid()}"
+    with open(tmp_map_path, 'w', encoding='utf-8') as f:
+        json.dump(sheet_map, f)
+    os.replace(tmp_map_path, map_path)
+    return sheet_map
+
+class SpriteSheetService:
+    def __init__(self, catalog, variants):
+        """
+        Sprite sheets: muchas miniaturas empaquetadas en una sola imagen más un
+        mapa de coordenadas JSON. Se construyen a partir de las miniaturas cacheadas
+        de ImageVariantService y se guardan en disco por lista ordenada de nombres.
+        """
+        self.logger = setup_logger()
+        self.catalog = catalog
+        self.variants = variants
+        self.sheets_dir = os.path.join(variants.cache_dir, 'sheets')
+        self.generated = 0
+        self.cache_hits = 0
+
+    def resolve_params(self, pokemon_names, tile_size, image_format):
+        """Validar los parámetros de la petición. Lanza ValueError si son inválidos."""
+        if not isinstance(pokemon_names, list) or not all(isinstance(name, str) for name in pokemon_names):
+            raise ValueError("pokemon_names must be a list of strings")
+        if not pokemon_names:
+            raise ValueError("pokemon_names must not be empty")
+        if len(pokemon_names) > SPRITE_SHEET_MAX_NAMES:
+            raise ValueError(f"At most {SPRITE_SHEET_MAX_NAMES} pokemon per sprite sheet")
+        tile_size = int(tile_size)
+        if tile_size not in VARIANT_WIDTHS:
+            raise ValueError(f"Tile size must be one of {list(VARIANT_WIDTHS)}")
+        image_format = (image_format or 'webp').strip().lower()
+        if image_format == 'jpg':
+            image_format = 'jpeg'
+        if image_format not in VARIANT_FORMATS:
+            raise ValueError(f"Format must be one of {list(VARIANT_FORMATS)}")
+        return tile_size, image_format
+
+    def sheet_path(self, sheet_id, image_format):
+        """Ruta de la imagen de un sprite sheet por id"""
+        return os.path.join(self.sheets_dir, sheet_id + VARIANT_FORMATS[image_format][0])
+
+    def get_sprite_sheet(self, pokemon_names, tile_size, image_format):
+        """
+        Obtener (sheet_id, mapa, no_encontrados) para la lista de nombres.
+        Los nombres se deduplican y ordenan: la misma lista en otro orden
+        reutiliza el mismo sheet. Se usa la primera imagen de cada Pokémon.
+        El mapa y missing usan el nombre normalizado (normalize_catalog_key).
+        """
+        start_time = time.time()
+        entries = []
+        missing = []
+        for name in sorted({normalize_catalog_key(name) for name in pokemon_names}):
+            entry = self.catalog.get_entry(name)
+            if entry and entry.images:
+                entries.append((name, entry))
+            else:
+                missing.append(name)
+        if not entries:
+            return None, None, missing
+
+        # La clave incluye la identidad de cada archivo fuente: si cambia, cambia el sheet
+        key_parts = [f"{tile_size}|{image_format}|{VARIANT_QUALITY}"]
+        key_parts.extend(
+            f"{name}|{entry.images[0].path}|{entry.images[0].size_bytes}|{entry.images[0].mtime}"
+            for name, entry in entries
+        )
+        sheet_id = hashlib.sha1('\n'.join(key_parts).encode('utf-8')).hexdigest()
+        target_path = self.sheet_path(sheet_id, image_format)
+        map_path = os.path.join(self.sheets_dir, sheet_id + '.json')
+
+        if os.path.exists(target_path) and os.path.exists(map_path):
+            with open(map_path, encoding='utf-8') as f:
+                sheet_map = json.load(f)
+            self.cache_hits += 1
+            return sheet_id, sheet_map, missing
+
+        # Miniaturas desde la caché de variantes (las que faltan se generan en paralelo)
+        tile_paths = self.variants.get_variants([entry.images[0] for _, entry in entries], tile_size, 'png')
+        tiles = [(name, tile_path) for (name, _), tile_path in zip(entries, tile_paths)]
+        columns = max(1, math.ceil(math.sqrt(len(tiles))))
+        sheet_map, owner = self.variants.run_once(
+            target_path, render_sprite_sheet, tiles, target_path, map_path,
+            tile_size, columns, image_format, VARIANT_QUALITY
+        )
+        if owner:
+            self.generated += 1
+            latency = round((time.time() - start_time) * 1000, 2)
+            self.logger.info("POKE_IMAGES_SERVICE|LOCAL_FILES|get_sprite_sheet Generated - Sheet: %s - Pokemon: %s - Tile: %s - Format: %s - Latency: %sms", sheet_id, len(tiles), tile_size, image_format, latency)
+        return sheet_id, sheet_map, missing
+
+    def get_stats(self):
+        return {"generated": self.generated, "cache_hits": self.cache_hits}
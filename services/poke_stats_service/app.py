@@ -1,21 +1,27 @@
 from flask import Flask, request, jsonify
-import time
 import os
 from datetime import datetime
-from stats_handler import StatsHandler
-from logger import setup_logger
+from stats_handler import StatsHandler, NUMERIC_QUERY_COLUMNS, STATS_QUERY_DEFAULT_LIMIT, STATS_BATCH_MAX_SIZE
+from logger import LOG_DIR, setup_logger, get_logging_stats
+from telemetry import init_telemetry, request_latency_ms
 
 app = Flask(__name__)
 logger = setup_logger()
+# Telemetría estructurada por petición (JSON-lines o binaria, con muestreo): mide
+# latencia y status de cada ruta, así que las rutas solo registran errores y avisos
+telemetry = init_telemetry(app, service='poke_stats_service', env_prefix='POKE_STATS', log_dir=LOG_DIR)
 stats_handler = StatsHandler()
 
+# Recargar el CSV en segundo plano cuando cambie en disco. Con debug=True el
+# reloader de Werkzeug ejecuta este módulo también en el proceso padre (que solo
+# vigila archivos): el hilo arranca solo en el proceso que sirve peticiones
+if __name__ != '__main__' or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+    stats_handler.start_watcher()
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint para verificar disponibilidad del servicio"""
-    start_time = time.time()
     try:
-        logger.info(f"{datetime.now().isoformat()}|POKE_STATS_SERVICE|HEALTH_CHECK Started")
-        
         # Verificar si el archivo CSV existe
         stats_path = stats_handler.base_stats_path
         if os.path.exists(stats_path):
@@ -25,91 +31,187 @@ def health_check():
             status = "unhealthy"
             message = f"Stats CSV not found at {stats_path}"
         
-        end_time = time.time()
-        latency = round((end_time - start_time)*1000, 2)
-        
         response = {
             "status": status,
             "service": "poke_stats_service",
             "message": message,
+            "dataset": stats_handler.get_dataset_info(),
+            "logging": get_logging_stats(),
+            "telemetry": telemetry.get_stats() if telemetry else {"enabled": False},
             "timestamp": datetime.now().isoformat()
         }
         
         if status == "healthy":
-            logger.info(f"{datetime.now().isoformat()}|POKE_STATS_SERVICE|HEALTH_CHECK Completed - Latency: {latency}ms")
             return jsonify(response), 200
         else:
-            logger.error(f"{datetime.now().isoformat()}|POKE_STATS_SERVICE|HEALTH_CHECK Failed - Latency: {latency}ms - {message}")
+            logger.error("POKE_STATS_SERVICE|HEALTH_CHECK Failed - %s", message)
             return jsonify(response), 500
     
     except Exception as e:
-        end_time = time.time()
-        latency = round((end_time - start_time)*1000, 2)
-        logger.error(f"{datetime.now().isoformat()}|POKE_STATS_SERVICE|HEALTH_CHECK Failed - Latency: {latency}ms - Error: {str(e)}")
+        logger.error("POKE_STATS_SERVICE|HEALTH_CHECK Failed - Error: %s", e)
         return jsonify({"status": "unhealthy", "error": str(e)}), 500
 
 @app.route('/pokemon/<pokemon_name>/stats', methods=['GET'])
 def get_pokemon_stats(pokemon_name):
     """Obtener estadísticas de un Pokémon específico"""
-    start_time = time.time()
     try:
-        logger.info(f"{datetime.now().isoformat()}|POKE_STATS_SERVICE|GET_POKEMON_STATS Started - Pokemon: {pokemon_name}")
-        
-        stats_df = stats_handler.get_pokemon_stats(pokemon_name)
+        stats_records = stats_handler.get_pokemon_stats(pokemon_name)
         
-        end_time = time.time()
-        latency = round((end_time - start_time)*1000, 2)
-        
-        if stats_df is not None and not stats_df.empty:
-            # Convertir DataFrame a lista de dicts para JSON
-            stats_json = stats_df.to_dict(orient='records')
-            
-            logger.info(f"{datetime.now().isoformat()}|POKE_STATS_SERVICE|GET_POKEMON_STATS Completed - Pokemon: {pokemon_name} - Rows: {len(stats_json)} - Latency: {latency}ms")
-            
+        if stats_records:
+            # Los registros ya vienen listos para JSON desde el índice
             return jsonify({
                 "pokemon": pokemon_name,
-                "stats": stats_json,
+                "stats": list(stats_records),
                 "source": "poke_stats_csv",
-                "latency_ms": latency,
+                "latency_ms": request_latency_ms(),
                 "timestamp": datetime.now().isoformat()
             }), 200
         else:
-            logger.warning(f"{datetime.now().isoformat()}|POKE_STATS_SERVICE|GET_POKEMON_STATS Not Found - Pokemon: {pokemon_name} - Latency: {latency}ms")
             return jsonify({"error": f"No stats found for pokemon: {pokemon_name}"}), 404
     
     except Exception as e:
-        end_time = time.time()
-        latency = round((end_time - start_time)*1000, 2)
-        logger.error(f"{datetime.now().isoformat()}|POKE_STATS_SERVICE|GET_POKEMON_STATS Failed - Pokemon: {pokemon_name} - Latency: {latency}ms - Error: {str(e)}")
+        logger.error("POKE_STATS_SERVICE|GET_POKEMON_STATS Failed - Pokemon: %s - Error: %s", pokemon_name, e)
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+@app.route('/pokemon/batch-stats', methods=['POST'])
+def get_batch_pokemon_stats():
+    """Obtener estadísticas de múltiples Pokémon en una sola petición"""
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            logger.warning("POKE_STATS_SERVICE|GET_BATCH_POKEMON_STATS Invalid Params - Body is not a JSON object")
+            return jsonify({"error": "Request body must be a JSON object with a pokemon_names list"}), 400
+        pokemon_names = data.get('pokemon_names')
+        
+        if not isinstance(pokemon_names, list) or not all(isinstance(name, str) for name in pokemon_names):
+            return jsonify({"error": "pokemon_names must be a list of strings"}), 400
+        if len(pokemon_names) > STATS_BATCH_MAX_SIZE:
+            logger.warning("POKE_STATS_SERVICE|GET_BATCH_POKEMON_STATS Rejected - Count: %s - Max: %s", len(pokemon_names), STATS_BATCH_MAX_SIZE)
+            return jsonify({"error": f"Batch size {len(pokemon_names)} exceeds maximum of {STATS_BATCH_MAX_SIZE}"}), 400
+        
+        resolved = stats_handler.get_batch_pokemon_stats(pokemon_names)
+        if resolved is None:
+            return jsonify({"error": "Stats dataset not available"}), 503
+        
+        results = []
+        for name, records in resolved:
+            if records:
+                results.append({
+                    "name": name,
+                    "stats": list(records),
+                    "status": "success"
+                })
+            else:
+                results.append({
+                    "name": name,
+                    "stats": None,
+                    "status": "not_found"
+                })
+        
+        return jsonify({
+            "results": results,
+            "total_processed": len(pokemon_names),
+            "successful": len([r for r in results if r["status"] == "success"]),
+            "source": "poke_stats_csv",
+            "latency_ms": request_latency_ms(),
+            "timestamp": datetime.now().isoformat()
+        }), 200
+    
+    except Exception as e:
+        logger.error("POKE_STATS_SERVICE|GET_BATCH_POKEMON_STATS Failed - Error: %s", e)
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+def _split_query_values(name):
+    """Leer un parámetro repetible o separado por comas como lista"""
+    values = []
+    for raw in request.args.getlist(name):
+        values.extend(value.strip() for value in raw.split(',') if value.strip())
+    return values
+
+def _parse_bool(value):
+    """Interpretar true/false de un query param"""
+    normalized = value.strip().lower()
+    if normalized in ('true', '1', 'yes'):
+        return True
+    if normalized in ('false', '0', 'no'):
+        return False
+    raise ValueError(f"Invalid boolean value: {value}")
+
+@app.route('/stats/query', methods=['GET'])
+def query_stats():
+    """
+    Consultar la tabla de estadísticas con filtros, orden y top-K.
+    Parámetros query:
+    - type, type1, type2: tipos (repetibles o separados por comas)
+    - generation: generaciones (repetible o separado por comas)
+    - legendary: true/false
+    - min_<columna>, max_<columna>: rangos numéricos (hp, attack, speed, total, ...)
+    - sort: columna numérica; order: 'desc' (defecto) o 'asc'
+    - offset, limit: paginación
+    """
+    try:
+        try:
+            ranges = {}
+            for param in NUMERIC_QUERY_COLUMNS:
+                minimum = request.args.get(f"min_{param}")
+                maximum = request.args.get(f"max_{param}")
+                if minimum is not None or maximum is not None:
+                    ranges[param] = (
+                        float(minimum) if minimum is not None else None,
+                        float(maximum) if maximum is not None else None
+                    )
+            legendary = request.args.get('legendary')
+            order = request.args.get('order', 'desc').lower()
+            if order not in ('asc', 'desc'):
+                raise ValueError("order must be 'asc' or 'desc'")
+            result = stats_handler.query_stats(
+                types=_split_query_values('type'),
+                type1=_split_query_values('type1'),
+                type2=_split_query_values('type2'),
+                generations=[int(value) for value in _split_query_values('generation')],
+                legendary=_parse_bool(legendary) if legendary is not None else None,
+                ranges=ranges,
+                sort_by=request.args.get('sort', '').lower() or None,
+                descending=order == 'desc',
+                offset=int(request.args.get('offset', 0)),
+                limit=int(request.args.get('limit', STATS_QUERY_DEFAULT_LIMIT))
+            )
+        except ValueError as e:
+            logger.warning("POKE_STATS_SERVICE|QUERY_STATS Invalid Params - Error: %s", e)
+            return jsonify({"error": f"Invalid query parameter: {str(e)}"}), 400
+        
+        if result is None:
+            logger.error("POKE_STATS_SERVICE|QUERY_STATS Failed - Stats not loaded")
+            return jsonify({"error": "Stats dataset not available"}), 503
+        
+        result.update({
+            "source": "poke_stats_csv",
+            "latency_ms": request_latency_ms(),
+            "timestamp": datetime.now().isoformat()
+        })
+        return jsonify(result), 200
+    
+    except Exception as e:
+        logger.error("POKE_STATS_SERVICE|QUERY_STATS Failed - Error: %s", e)
         return jsonify({"error": f"Internal server error: {str(e)}"}), 500
 
 @app.route('/available-pokemon', methods=['GET'])
 def get_available_pokemon():
     """Obtener lista de nombres de Pokémon con estadísticas disponibles"""
-    start_time = time.time()
     try:
-        logger.info(f"{datetime.now().isoformat()}|POKE_STATS_SERVICE|GET_AVAILABLE_POKEMON Started")
-        
         pokemon_names = stats_handler.get_all_pokemon_names()
         
-        end_time = time.time()
-        latency = round((end_time - start_time)*1000, 2)
-        
-        logger.info(f"{datetime.now().isoformat()}|POKE_STATS_SERVICE|GET_AVAILABLE_POKEMON Completed - Count: {len(pokemon_names)} - Latency: {latency}ms")
-        
         return jsonify({
             "available_pokemon": pokemon_names,
             "total_count": len(pokemon_names),
-            "latency_ms": latency,
+            "latency_ms": request_latency_ms(),
             "timestamp": datetime.now().isoformat()
         }), 200
     
     except Exception as e:
-        end_time = time.time()
-        latency = round((end_time - start_time)*1000, 2)
-        logger.error(f"{datetime.now().isoformat()}|POKE_STATS_SERVICE|GET_AVAILABLE_POKEMON Failed - Latency: {latency}ms - Error: {str(e)}")
+        logger.error("POKE_STATS_SERVICE|GET_AVAILABLE_POKEMON Failed - Error: %s", e)
         return jsonify({"error": f"Internal server error: {str(e)}"}), 500
 
 if __name__ == '__main__':
-    logger.info(f"{datetime.now().isoformat()}|POKE_STATS_SERVICE|SYSTEM|startup Service starting on port 5002")
+    logger.info("POKE_STATS_SERVICE|SYSTEM|startup Service starting on port 5002")
     app.run(host='0.0.0.0', port=5002, debug=True)
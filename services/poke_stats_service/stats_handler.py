@@ -1,8 +1,87 @@
 import os
 import time
-import pandas as pd
+import threading
+from collections import namedtuple
+from collections.abc import Sequence
+from types import MappingProxyType
 from datetime import datetime
+import numpy as np
 from logger import setup_logger
+from stats_snapshot import StringColumn, columns_from_dataframe, default_snapshot_path, is_snapshot_fresh, load_snapshot
+
+# Intervalo (segundos) con el que el watcher revisa cambios en el CSV
+STATS_RELOAD_INTERVAL = float(os.environ.get('POKE_STATS_RELOAD_INTERVAL', 5))
+# Usar el snapshot binario (stats_snapshot.py) cuando esté al día con el CSV
+STATS_USE_SNAPSHOT = os.environ.get('POKE_STATS_USE_SNAPSHOT', '1') != '0'
+# Tamaño de página por defecto y máximo para /stats/query
+STATS_QUERY_DEFAULT_LIMIT = int(os.environ.get('POKE_STATS_QUERY_DEFAULT_LIMIT', 50))
+STATS_QUERY_MAX_LIMIT = int(os.environ.get('POKE_STATS_QUERY_MAX_LIMIT', 200))
+# Máximo de nombres aceptados por /pokemon/batch-stats
+STATS_BATCH_MAX_SIZE = int(os.environ.get('POKE_STATS_BATCH_MAX_SIZE', 100))
+
+# Parámetros de consulta -> columnas numéricas del CSV (filtros de rango y orden)
+NUMERIC_QUERY_COLUMNS = {
+    'number': '#',
+    'total': 'Total',
+    'hp': 'HP',
+    'attack': 'Attack',
+    'defense': 'Defense',
+    'sp_atk': 'Sp. Atk',
+    'sp_def': 'Sp. Def',
+    'speed': 'Speed',
+    'generation': 'Generation'
+}
+
+# Versión inmutable del dataset. Se reemplaza completa en cada recarga, así
+# los lectores siempre ven columnas, índice y nombres consistentes entre sí.
+StatsSnapshot = namedtuple('StatsSnapshot', [
+    'columns', 'column_order', 'string_codes', 'records', 'index', 'names', 'version', 'rows',
+    'source', 'source_mtime', 'loaded_at', 'load_latency_ms'
+])
+
+class LazyRecords(Sequence):
+    """
+    Registros del dataset (un dict por fila) construidos bajo demanda a partir
+    de las columnas y memorizados. Con el snapshot mmap las columnas se comparten
+    entre workers; así cada worker solo convierte a objetos Python las filas que sirve.
+    """
+    def __init__(self, columns, column_order, rows):
+        self._columns = tuple((name, columns[name]) for name in column_order)
+        self._rows = rows
+        self._built = {}
+
+    def __len__(self):
+        return self._rows
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(self._rows))]
+        if position < 0:
+            position += self._rows
+        if not 0 <= position < self._rows:
+            raise IndexError("record index out of range")
+        record = self._built.get(position)
+        if record is None:
+            record = self._built.setdefault(position, self._build(position))
+        return record
+
+    def _build(self, position):
+        """Convertir una fila a tipos nativos de Python (NaN/vacío -> None)"""
+        record = {}
+        for name, column in self._columns:
+            if isinstance(column, StringColumn):
+                code = int(column.codes[position])
+                value = column.values[code] if code >= 0 else None
+            else:
+                value = column[position].item()
+                if column.dtype.kind == 'f' and value != value:
+                    value = None
+            record[name] = value
+        return record
+
+    def built_count(self):
+        """Filas ya convertidas a dict"""
+        return len(self._built)
 
 class StatsHandler:
     def __init__(self):
@@ -13,85 +92,375 @@ class StatsHandler:
         self.base_stats_path= os.path.join(
             os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data', 'Poke_stats.csv'
         )
-        self._dataframe = None
+        self.snapshot_path = default_snapshot_path(self.base_stats_path)
+        self._snapshot = None
+        self._version = 0
+        self._load_lock = threading.Lock()
+        self._dataframe_cache = (0, None)
+        self._watcher_thread = None
+        self._watcher_stop = threading.Event()
         
+    def _normalize_pokemon_name(self, pokemon_name):
+        """Normalizar el nombre del Pokémon para búsqueda case-insensitive"""
+        return pokemon_name.strip().lower()
+    
+    def _column_values(self, column):
+        """Convertir una columna a lista de valores nativos de Python (NaN/vacío -> None)"""
+        if isinstance(column, StringColumn):
+            values = column.values
+            return [values[code] if code >= 0 else None for code in column.codes.tolist()]
+        values = column.tolist()
+        if column.dtype.kind == 'f':
+            return [None if value != value else value for value in values]
+        return values
+    
+    def _build_index(self, columns, column_order, rows):
+        """
+        Construir los registros y el índice nombre -> posiciones de fila.
+        Solo se materializa la columna Name; los registros (LazyRecords) se
+        convierten a tipos nativos la primera vez que se piden.
+        """
+        records = LazyRecords(columns, column_order, rows)
+        index = {}
+        names = {}
+        for position, name in enumerate(self._column_values(columns['Name'])):
+            if name is None:
+                continue
+            key = self._normalize_pokemon_name(str(name))
+            names.setdefault(name, None)
+            index.setdefault(key, []).append(position)
+        index = {key: tuple(group) for key, group in index.items()}
+        return records, MappingProxyType(index), tuple(names)
+
+    def _records_for(self, snapshot, key):
+        """Registros de un nombre normalizado, o None si no existe"""
+        positions = snapshot.index.get(key)
+        if not positions:
+            return None
+        records = snapshot.records
+        return tuple(records[position] for position in positions)
+    
+    def _build_string_codes(self, columns):
+        """
+        Precomputar, por columna de texto, valor en minúsculas -> códigos,
+        para filtrar por igualdad comparando enteros en lugar de strings.
+        """
+        string_codes = {}
+        for name, column in columns.items():
+            if isinstance(column, StringColumn):
+                lookup = {}
+                for code, value in enumerate(column.values):
+                    lookup.setdefault(value.lower(), []).append(code)
+                string_codes[name] = MappingProxyType({key: np.array(codes, dtype=np.int32) for key, codes in lookup.items()})
+        return MappingProxyType(string_codes)
+    
+    def _read_columns(self):
+        """
+        Obtener las columnas del dataset: desde el snapshot binario si está al día
+        (mmap, sin parseo) o desde el CSV con pandas como respaldo.
+        """
+        if STATS_USE_SNAPSHOT and is_snapshot_fresh(self.snapshot_path, self.base_stats_path):
+            try:
+                columns, header = load_snapshot(self.snapshot_path)
+                return columns, [meta["name"] for meta in header["columns"]], header["rows"], "snapshot"
+            except Exception as e:
+                self.logger.warning("POKE_STATS_SERVICE|LOAD_STATS|Snapshot unreadable, falling back to CSV - Path: %s - Error: %s", self.snapshot_path, e)
+        # pandas se importa solo cuando hace falta parsear el CSV: su import domina el arranque
+        import pandas as pd
+        df = pd.read_csv(self.base_stats_path)
+        return columns_from_dataframe(df), list(df.columns), len(df), "csv"
+    
     def _load_stats(self):
-        """Cargar el csv en un DataFrame de pandas, manejo errores y logging"""
+        """
+        Cargar el dataset, construir un nuevo snapshot en memoria y publicarlo con
+        una única asignación (swap atómico). Si la carga falla se conserva el anterior.
+        """
         start_time = time.time()
         
         try:
             if not os.path.exists(self.base_stats_path):
-                self.logger.error(f"{datetime.now().isoformat()}|POKE_STATS_SERVICE|FILE_NOT_FOUND|Path: {self.base_stats_path}")
+                self.logger.error("POKE_STATS_SERVICE|FILE_NOT_FOUND|Path: %s", self.base_stats_path)
+                return None
+            source_mtime = os.stat(self.base_stats_path).st_mtime
+            columns, column_order, rows, source = self._read_columns()
+            if 'Name' not in columns:
+                self.logger.error("POKE_STATS_SERVICE|LOAD_STATS|Column 'Name' not found in CSV")
                 return None
-            df = pd.read_csv(self.base_stats_path)
-            self._dataframe = df
+            records, index, names = self._build_index(columns, column_order, rows)
+            string_codes = self._build_string_codes(columns)
             end_time = time.time()
             latency = round((end_time - start_time)*1000, 2)
-            self.logger.info(f"{datetime.now().isoformat()}|POKE_STATS_SERVICE|LOAD_STATS|Success loading CSV - Rows: {len(df)} - Latency: {latency}ms")
-            return df
+            self._version += 1
+            snapshot = StatsSnapshot(
+                columns=MappingProxyType(columns),
+                column_order=tuple(column_order),
+                string_codes=string_codes,
+                records=records,
+                index=index,
+                names=names,
+                version=self._version,
+                rows=rows,
+                source=source,
+                source_mtime=source_mtime,
+                loaded_at=datetime.now().isoformat(),
+                load_latency_ms=latency
+            )
+            self._snapshot = snapshot
+            self.logger.info("POKE_STATS_SERVICE|LOAD_STATS|Success loading %s - Version: %s - Rows: %s - Names: %s - Latency: %sms", source, self._version, rows, len(index), latency)
+            return snapshot
         except Exception as e:
             end_time = time.time()
             latency = round((end_time - start_time)*1000, 2)
-            self.logger.error(f"{datetime.now().isoformat()}|POKE_STATS_SERVICE|LOAD_STATS|Error loading CSV - Latency: {latency}ms - Error: {str(e)}")
+            self.logger.error("POKE_STATS_SERVICE|LOAD_STATS|Error loading CSV - Latency: %sms - Error: %s", latency, e)
             return None
+    def _ensure_loaded(self):
+        """Cargar el CSV una única vez aunque varios hilos lleguen a la vez"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._load_lock:
+                if self._snapshot is None:
+                    self._load_stats()
+                snapshot = self._snapshot
+        return snapshot
+    
+    def reload_if_changed(self):
+        """Recargar el CSV si su mtime cambió respecto al snapshot publicado"""
+        try:
+            current_mtime = os.stat(self.base_stats_path).st_mtime
+        except OSError:
+            return False
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.source_mtime == current_mtime:
+            return False
+        with self._load_lock:
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.source_mtime == current_mtime:
+                return False
+            self.logger.info("POKE_STATS_SERVICE|RELOAD_STATS|Change detected - Path: %s", self.base_stats_path)
+            return self._load_stats() is not None
+    
+    def _watch_loop(self, interval):
+        """Bucle del watcher: revisa el mtime del CSV hasta que se pida detenerlo"""
+        while not self._watcher_stop.wait(interval):
+            try:
+                self.reload_if_changed()
+            except Exception as e:
+                self.logger.error("POKE_STATS_SERVICE|RELOAD_STATS|Watcher error - Error: %s", e)
+    
+    def start_watcher(self, interval=STATS_RELOAD_INTERVAL):
+        """
+        Iniciar el hilo en segundo plano que recarga el CSV al detectar cambios.
+        El parseo ocurre fuera del camino de las peticiones.
+        """
+        if self._watcher_thread is not None and self._watcher_thread.is_alive():
+            return self._watcher_thread
+        self._ensure_loaded()
+        self._watcher_stop.clear()
+        self._watcher_thread = threading.Thread(
+            target=self._watch_loop, args=(interval,), name='stats-csv-watcher', daemon=True
+        )
+        self._watcher_thread.start()
+        self.logger.info("POKE_STATS_SERVICE|RELOAD_STATS|Watcher started - Interval: %ss", interval)
+        return self._watcher_thread
+    
+    def stop_watcher(self):
+        """Detener el watcher de recarga"""
+        self._watcher_stop.set()
+        if self._watcher_thread is not None:
+            self._watcher_thread.join(timeout=5)
+            self._watcher_thread = None
+    
+    def get_dataset_info(self):
+        """Información del snapshot publicado (versión, filas, última recarga)"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            return {"loaded": False, "version": 0}
+        return {
+            "loaded": True,
+            "version": snapshot.version,
+            "rows": snapshot.rows,
+            "names": len(snapshot.index),
+            "records_built": snapshot.records.built_count(),
+            "source": snapshot.source,
+            "source_mtime": datetime.fromtimestamp(snapshot.source_mtime).isoformat(),
+            "last_reload": snapshot.loaded_at,
+            "reload_latency_ms": snapshot.load_latency_ms,
+            "watcher_running": self._watcher_thread is not None and self._watcher_thread.is_alive()
+        }
+    
     def get_stats_dataframe(self):
-        """Obtener DataFrame con todos los datos del CSV, cargar si no está ya cargado"""
-        if self._dataframe is None:
-            return self._load_stats()
-        return self._dataframe
+        """
+        Obtener DataFrame con todos los datos del CSV, cargar si no está ya cargado.
+        Se construye bajo demanda a partir de los registros y se cachea por versión.
+        """
+        snapshot = self._ensure_loaded()
+        if snapshot is None:
+            return None
+        version, df = self._dataframe_cache
+        if version != snapshot.version:
+            import pandas as pd
+            df = pd.DataFrame.from_records(list(snapshot.records), columns=list(snapshot.column_order))
+            self._dataframe_cache = (snapshot.version, df)
+        return df
+    
+    def get_stats_index(self):
+        """Obtener el índice inmutable nombre normalizado -> posiciones de fila en snapshot.records"""
+        snapshot = self._ensure_loaded()
+        return snapshot.index if snapshot is not None else None
     def get_pokemon_stats(self, pokemon_name):
         """
-        Filtrar el DataFrame para obtener estadísticas de un Pokémon específico.
-        Se espera que el CSV tenga una columna con nombre 'pokemon' o similar (ajustar según CSV)
+        Obtener los registros de estadísticas de un Pokémon específico.
+        Búsqueda O(1) en el índice precomputado; devuelve una tupla de dicts
+        listos para JSON o None si no existe.
         """
         start_time = time.time()
         try:
-            df = self.get_stats_dataframe()
-            if df is None:
+            snapshot = self._ensure_loaded()
+            if snapshot is None:
                 return None
 
             # Normalizar a minúsculas para búsqueda case-insensitive
-            normalized_name = pokemon_name.strip().lower()
+            normalized_name = self._normalize_pokemon_name(pokemon_name)
+            records = self._records_for(snapshot, normalized_name)
+
+            end_time = time.time()
+            latency = round((end_time - start_time) * 1000, 2)
 
-            # Verificar que 'Name' está en columnas
-            if 'Name' not in df.columns:
-                self.logger.error(f"{datetime.now().isoformat()}|POKE_STATS_SERVICE|GET_POKEMON_STATS|Column 'Name' not found in CSV")
+            if records:
+                self.logger.info("POKE_STATS_SERVICE|GET_POKEMON_STATS|Found stats for %s - Rows: %s - Latency: %sms", pokemon_name, len(records), latency)
+                return records
+            else:
+                self.logger.warning("POKE_STATS_SERVICE|GET_POKEMON_STATS|No stats found for %s - Latency: %sms", pokemon_name, latency)
                 return None
 
-            # Crear una columna temporal en minúsculas para comparación
-            df['Name_lower'] = df['Name'].str.lower()
+        except Exception as e:
+            end_time = time.time()
+            latency = round((end_time - start_time) * 1000, 2)
+            self.logger.error("POKE_STATS_SERVICE|GET_POKEMON_STATS|Error - Pokemon: %s - Latency: %sms - Error: %s", pokemon_name, latency, e)
+            return None
+    def get_batch_pokemon_stats(self, pokemon_names):
+        """
+        Resolver varios nombres contra el índice en una sola pasada.
+        Devuelve una lista de (nombre, registros o None) en el orden recibido,
+        con un único log para todo el lote.
+        """
+        start_time = time.time()
+        try:
+            snapshot = self._ensure_loaded()
+            if snapshot is None:
+                return None
 
-            filtered = df[df['Name_lower'] == normalized_name]
+            results = [(name, self._records_for(snapshot, self._normalize_pokemon_name(name))) for name in pokemon_names]
+            found = sum(1 for _, records in results if records)
 
             end_time = time.time()
             latency = round((end_time - start_time) * 1000, 2)
-
-            if not filtered.empty:
-                self.logger.info(f"{datetime.now().isoformat()}|POKE_STATS_SERVICE|GET_POKEMON_STATS|Found stats for {pokemon_name} - Rows: {len(filtered)} - Latency: {latency}ms")
-                # Opcional: eliminar la columna temporal antes de devolver
-                filtered = filtered.drop(columns=['Name_lower'])
-                return filtered
-            else:
-                self.logger.warning(f"{datetime.now().isoformat()}|POKE_STATS_SERVICE|GET_POKEMON_STATS|No stats found for {pokemon_name} - Latency: {latency}ms")
-                return None
+            self.logger.info("POKE_STATS_SERVICE|GET_BATCH_POKEMON_STATS|Resolved batch - Count: %s - Found: %s - Latency: %sms", len(results), found, latency)
+            return results
 
         except Exception as e:
             end_time = time.time()
             latency = round((end_time - start_time) * 1000, 2)
-            self.logger.error(f"{datetime.now().isoformat()}|POKE_STATS_SERVICE|GET_POKEMON_STATS|Error - Pokemon: {pokemon_name} - Latency: {latency}ms - Error: {str(e)}")
+            self.logger.error("POKE_STATS_SERVICE|GET_BATCH_POKEMON_STATS|Error - Count: %s - Latency: %sms - Error: %s", len(pokemon_names), latency, e)
             return None
     def get_all_pokemon_names(self):
         """
         Devuelve la lista única de nombres de Pokémon en el CSV 
         """
         try:
-            df = self.get_stats_dataframe()
-            if df is None or 'Name' not in df.columns:
+            snapshot = self._ensure_loaded()
+            if snapshot is None:
                 return []
             
-            unique_names = df['Name'].dropna().unique().tolist()
-            return unique_names
+            return list(snapshot.names)
         
         except Exception as e:
-            self.logger.error(f"{datetime.now().isoformat()}|POKE_STATS_SERVICE|GET_ALL_POKEMON_NAMES|Error: {str(e)}")
+            self.logger.error("POKE_STATS_SERVICE|GET_ALL_POKEMON_NAMES|Error: %s", e)
             return []
+    
+    def _string_mask(self, snapshot, column_name, values):
+        """Máscara booleana de filas cuya columna de texto coincide con alguno de los valores"""
+        column = snapshot.columns.get(column_name)
+        if not isinstance(column, StringColumn):
+            raise ValueError(f"Column '{column_name}' not available for filtering")
+        lookup = snapshot.string_codes[column_name]
+        codes = [lookup[value.strip().lower()] for value in values if value.strip().lower() in lookup]
+        if not codes:
+            return np.zeros(snapshot.rows, dtype=bool)
+        return np.isin(column.codes, np.concatenate(codes))
+    
+    def query_stats(self, types=None, type1=None, type2=None, generations=None, legendary=None,
+                    ranges=None, sort_by=None, descending=True, offset=0, limit=STATS_QUERY_DEFAULT_LIMIT):
+        """
+        Filtrar, ordenar y paginar la tabla de estadísticas con operaciones vectorizadas.
+        - types: lista de tipos que deben aparecer en Type 1 o Type 2
+        - type1 / type2: listas de tipos para cada columna
+        - generations: lista de generaciones
+        - legendary: True/False o None para no filtrar
+        - ranges: dict parámetro -> (min, max) sobre NUMERIC_QUERY_COLUMNS
+        - sort_by: parámetro de NUMERIC_QUERY_COLUMNS; con offset+limit se usa top-K parcial
+        Lanza ValueError si algún parámetro es inválido.
+        """
+        start_time = time.time()
+        snapshot = self._ensure_loaded()
+        if snapshot is None:
+            return None
+        if limit < 1 or limit > STATS_QUERY_MAX_LIMIT:
+            raise ValueError(f"limit must be between 1 and {STATS_QUERY_MAX_LIMIT}")
+        if offset < 0:
+            raise ValueError("offset must be >= 0")
+
+        columns = snapshot.columns
+        mask = np.ones(snapshot.rows, dtype=bool)
+        if types:
+            mask &= self._string_mask(snapshot, 'Type 1', types) | self._string_mask(snapshot, 'Type 2', types)
+        if type1:
+            mask &= self._string_mask(snapshot, 'Type 1', type1)
+        if type2:
+            mask &= self._string_mask(snapshot, 'Type 2', type2)
+        if generations:
+            mask &= np.isin(columns['Generation'], np.array(generations, dtype=np.int64))
+        if legendary is not None:
+            mask &= columns['Legendary'] == bool(legendary)
+        for param, (minimum, maximum) in (ranges or {}).items():
+            if param not in NUMERIC_QUERY_COLUMNS:
+                raise ValueError(f"Invalid range column: {param}")
+            values = columns[NUMERIC_QUERY_COLUMNS[param]]
+            if minimum is not None:
+                mask &= values >= minimum
+            if maximum is not None:
+                mask &= values <= maximum
+
+        matches = np.flatnonzero(mask)
+        end = offset + limit
+        if sort_by is not None:
+            if sort_by not in NUMERIC_QUERY_COLUMNS:
+                raise ValueError(f"Invalid sort column: {sort_by}")
+            keys = columns[NUMERIC_QUERY_COLUMNS[sort_by]][matches].astype(np.float64)
+            if descending:
+                keys = -keys
+            if end < len(matches):
+                # Top-K: solo se ordenan los candidatos hasta la clave k-ésima, incluidos
+                # todos sus empates, para desempatar por fila igual que el orden completo
+                kth_key = np.partition(keys, end - 1)[end - 1]
+                candidates = np.flatnonzero(keys <= kth_key)
+                order = candidates[np.lexsort((matches[candidates], keys[candidates]))][:end]
+            else:
+                order = np.lexsort((matches, keys))
+            page = matches[order][offset:end]
+        else:
+            page = matches[offset:end]
+
+        records = snapshot.records
+        results = [records[i] for i in page.tolist()]
+        total = int(len(matches))
+        latency = round((time.time() - start_time) * 1000, 2)
+        self.logger.info("POKE_STATS_SERVICE|QUERY_STATS|Matches: %s - Returned: %s - Sort: %s - Latency: %sms", total, len(results), sort_by, latency)
+        return {
+            "results": results,
+            "total_matches": total,
+            "offset": offset,
+            "limit": limit,
+            "next_offset": end if end < total else None,
+            "dataset_version": snapshot.version
+        }
@@ -0,0 +1,214 @@
+import os
+import sys
+import json
+import mmap
+import time
+import struct
+from collections import namedtuple
+from datetime import datetime
+import numpy as np
+
+# Snapshot binario columnar de data/Poke_stats.csv
+# Formato: MAGIC | uint32 largo del header | header JSON | padding | datos
+# Los datos son arrays numéricos de ancho fijo y una tabla de strings
+# (offsets uint32 + blob utf-8). Las columnas de texto guardan códigos int32
+# que apuntan a la tabla (-1 = valor vacío).
+SNAPSHOT_MAGIC = b'PKSNAP01'
+SNAPSHOT_FORMAT = 1
+_ALIGNMENT = 8
+
+# Columna de texto: códigos por fila + valores únicos
+StringColumn = namedtuple('StringColumn', ['codes', 'values'])
+
+def default_snapshot_path(csv_path):
+    """Ruta del snapshot asociado a un CSV (mismo nombre con extensión .snap)"""
+    return os.path.splitext(csv_path)[0] + '.snap'
+
+def _align(offset):
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+def columns_from_dataframe(df):
+    """
+    Convertir un DataFrame a la representación columnar usada por StatsHandler:
+    arrays numpy para columnas numéricas y StringColumn para columnas de texto.
+    """
+    columns = {}
+    for name in df.columns:
+        series = df[name]
+        kind = series.dtype.kind
+        if kind == 'b':
+            columns[name] = series.to_numpy(dtype=np.bool_)
+        elif kind in 'iu':
+            columns[name] = series.to_numpy(dtype=np.int64)
+        elif kind == 'f':
+            columns[name] = series.to_numpy(dtype=np.float64)
+        else:
+            values = []
+            positions = {}
+            codes = np.full(len(series), -1, dtype=np.int32)
+            for i, value in enumerate(series.tolist()):
+                if value is None or (isinstance(value, float) and value != value):
+                    continue
+                value = str(value)
+                code = positions.get(value)
+                if code is None:
+                    code = positions[value] = len(values)
+                    values.append(value)
+                codes[i] = code
+            columns[name] = StringColumn(codes=codes, values=tuple(values))
+    return columns
+
+def write_snapshot(csv_path, snapshot_path=None):
+    """
+    Compilar el CSV a un snapshot binario. Se escribe en un archivo temporal
+    y se reemplaza con os.replace para que los lectores nunca vean un archivo a medias.
+    """
+    import pandas as pd
+
+    snapshot_path = snapshot_path or default_snapshot_path(csv_path)
+    source_stat = os.stat(csv_path)
+    df = pd.read_csv(csv_path)
+    columns = columns_from_dataframe(df)
+
+    # Tabla de strings compartida por todas las columnas de texto
+    table = []
+    table_positions = {}
+    for column in columns.values():
+        if isinstance(column, StringColumn):
+            for value in column.values:
+                if value not in table_positions:
+                    table_positions[value] = len(table)
+                    table.append(value)
+
+    encoded = [value.encode('utf-8') for value in table]
+    string_offsets = np.zeros(len(encoded) + 1, dtype='<u4')
+    string_offsets[1:] = np.cumsum([len(value) for value in encoded], dtype=np.uint64)
+    blob = b''.join(encoded)
+
+    chunks = []
+    offset = 0
+
+    def add_chunk(data):
+        nonlocal offset
+        start = _align(offset)
+        chunks.append((start, data))
+        offset = start + len(data)
+        return start
+
+    column_meta = []
+    for name, column in columns.items():
+        if isinstance(column, StringColumn):
+            remap = np.array([table_positions[value] for value in column.values] or [0], dtype='<i4')
+            codes = np.where(column.codes >= 0, remap[np.maximum(column.codes, 0)], -1).astype('<i4')
+            column_meta.append({"name": name, "kind": "str", "offset": add_chunk(codes.tobytes())})
+        elif column.dtype == np.bool_:
+            column_meta.append({"name": name, "kind": "bool", "offset": add_chunk(column.astype('|u1').tobytes())})
+        elif column.dtype.kind == 'i':
+            column_meta.append({"name": name, "kind": "int64", "offset": add_chunk(column.astype('<i8').tobytes())})
+        else:
+            column_meta.append({"name": name, "kind": "float64", "offset": add_chunk(column.astype('<f8').tobytes())})
+
+    strings_meta = {
+        "count": len(table),
+        "offsets_offset": add_chunk(string_offsets.tobytes()),
+        "blob_offset": add_chunk(blob),
+        "blob_length": len(blob)
+    }
+
+    header = json.dumps({
+        "format": SNAPSHOT_FORMAT,
+        "source_mtime": source_stat.st_mtime,
+        "source_size": source_stat.st_size,
+        "rows": len(df),
+        "columns": column_meta,
+        "strings": strings_meta,
+        "created_at": datetime.now().isoformat()
+    }).encode('utf-8')
+
+    prefix = SNAPSHOT_MAGIC + struct.pack('<I', len(header)) + header
+    data_start = _align(len(prefix))
+
+    tmp_path = f"{snapshot_path}.tmp{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(prefix)
+        f.write(b'\0' * (data_start - len(prefix)))
+        position = 0
+        for start, data in chunks:
+            f.write(b'\0' * (start - position))
+            f.write(data)
+            position = start + len(data)
+    os.replace(tmp_path, snapshot_path)
+    return snapshot_path, len(df)
+
+def is_snapshot_fresh(snapshot_path, csv_path):
+    """Verificar que el snapshot existe y corresponde a la versión actual del CSV"""
+    try:
+        header = read_snapshot_header(snapshot_path)
+        source_stat = os.stat(csv_path)
+    except (OSError, ValueError):
+        return False
+    return header["source_mtime"] == source_stat.st_mtime and header["source_size"] == source_stat.st_size
+
+def read_snapshot_header(snapshot_path):
+    """Leer solo el header JSON del snapshot"""
+    with open(snapshot_path, 'rb') as f:
+        magic = f.read(len(SNAPSHOT_MAGIC))
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"Invalid snapshot magic in {snapshot_path}")
+        (header_length,) = struct.unpack('<I', f.read(4))
+        header = json.loads(f.read(header_length).decode('utf-8'))
+    if header.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"Unsupported snapshot format: {header.get('format')}")
+    return header
+
+def load_snapshot(snapshot_path):
+    """
+    Mapear el snapshot en memoria (solo lectura) y devolver (columns, header).
+    Los arrays numéricos son vistas sobre el mmap, por lo que procesos
+    hijos de un fork comparten las mismas páginas sin copiar ni parsear.
+    """
+    with open(snapshot_path, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if buffer[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+        raise ValueError(f"Invalid snapshot magic in {snapshot_path}")
+    (header_length,) = struct.unpack_from('<I', buffer, len(SNAPSHOT_MAGIC))
+    header_start = len(SNAPSHOT_MAGIC) + 4
+    header = json.loads(bytes(buffer[header_start:header_start + header_length]).decode('utf-8'))
+    if header.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"Unsupported snapshot format: {header.get('format')}")
+    data_start = _align(header_start + header_length)
+    rows = header["rows"]
+
+    strings_meta = header["strings"]
+    string_offsets = np.frombuffer(
+        buffer, dtype='<u4', count=strings_meta["count"] + 1,
+        offset=data_start + strings_meta["offsets_offset"]
+    ).tolist()
+    blob_start = data_start + strings_meta["blob_offset"]
+    blob = buffer[blob_start:blob_start + strings_meta["blob_length"]]
+    table = tuple(
+        blob[string_offsets[i]:string_offsets[i + 1]].decode('utf-8')
+        for i in range(strings_meta["count"])
+    )
+
+    dtypes = {"int64": '<i8', "float64": '<f8', "bool": np.bool_, "str": '<i4'}
+    columns = {}
+    for meta in header["columns"]:
+        array = np.frombuffer(buffer, dtype=dtypes[meta["kind"]], count=rows, offset=data_start + meta["offset"])
+        if meta["kind"] == "str":
+            columns[meta["name"]] = StringColumn(codes=array, values=table)
+        else:
+            columns[meta["name"]] = array
+    return columns, header
+
+if __name__ == '__main__':
+    # Paso de build: python stats_snapshot.py [ruta_csv] [ruta_snapshot]
+    base_csv_path = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'data', 'Poke_stats.csv'
+    )
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else base_csv_path
+    snapshot_path = sys.argv[2] if len(sys.argv) > 2 else None
+    start_time = time.time()
+    output_path, rows = write_snapshot(csv_path, snapshot_path)
+    latency = round((time.time() - start_time) * 1000, 2)
+    print(f"Snapshot written to {output_path} - Rows: {rows} - Size: {os.path.getsize(output_path)} bytes - Latency: {latency}ms")
@@ -1,5 +1,6 @@
+import os
 from flask import Flask
-from routes import bp as search_api_bp
+from routes import bp as search_api_bp, probe_scheduler, timeseries_store, log_ingester
 from logger import setup_logger
 from datetime import datetime
 
@@ -8,6 +9,20 @@ logger = setup_logger()
 
 app.register_blueprint(search_api_bp)
 
+def start_background_tasks():
+    # Sondeo periódico de los módulos: /check_latency y /check_availability leen su caché
+    probe_scheduler.start()
+    # Volcado periódico de la serie temporal (muestras crudas y rollups) a SQLite
+    timeseries_store.start_flusher()
+    # Lectura incremental de la telemetría de los servicios para /render_graph?source=logs
+    log_ingester.start()
+
+# Con debug=True el reloader de Werkzeug ejecuta este módulo en el proceso padre
+# (que solo vigila archivos) y en el hijo que sirve (WERKZEUG_RUN_MAIN=true):
+# los hilos arrancan solo en el proceso que sirve peticiones
+if __name__ != '__main__' or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+    start_background_tasks()
+
 if __name__ == '__main__':
     logger.info(f"{datetime.now().isoformat()}|SEARCH_API_SERVICE|SYSTEM|startup Service starting on port 5000")
     app.run(host='0.0.0.0', port=5000, debug=True)
@@ -0,0 +1,238 @@
+import os
+import sys
+import json
+import time
+import threading
+from collections import namedtuple
+from logger import setup_logger
+
+SERVICES_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# telemetry.py es compartido por los servicios y vive en services/
+sys.path.append(SERVICES_DIR)
+from telemetry import decode_binary_records
+
+def telemetry_dir(env_prefix, default_log_dir):
+    """Directorio de telemetría de un servicio, con las mismas variables que usa el servicio"""
+    log_dir = os.environ.get(f'{env_prefix}_LOG_DIR', default_log_dir)
+    return os.environ.get(f'{env_prefix}_TELEMETRY_DIR', os.path.join(log_dir, 'telemetry'))
+
+# Módulo -> (directorio de telemetría, prefijo del archivo diario). El sufijo es la
+# fecha (YYYYMMDD), así que el orden por nombre es el orden cronológico.
+LOG_SOURCES = {
+    "poke_api": (telemetry_dir('POKE_API', os.path.join(SERVICES_DIR, 'poke_api_service', 'logs', 'poke_api_service')), 'poke_api_service_'),
+    "poke_stats": (telemetry_dir('POKE_STATS', os.path.join(SERVICES_DIR, 'logs', 'poke_stats_service')), 'poke_stats_service_'),
+    "poke_images": (telemetry_dir('POKE_IMAGES', os.path.join(SERVICES_DIR, 'logs', 'poke_images_service')), 'poke_images_service_'),
+}
+TELEMETRY_EXTENSIONS = ('.telemetry.jsonl', '.telemetry.bin')
+
+LOG_INGEST_STATE_PATH = os.environ.get(
+    'SEARCH_API_LOG_INGEST_STATE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'log_ingest_state.json')
+)
+# Serie temporal propia para las latencias leídas de la telemetría
+LOG_TS_PATH = os.environ.get(
+    'SEARCH_API_LOG_TS_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'timeseries_logs.sqlite3')
+)
+LOG_INGEST_INTERVAL = float(os.environ.get('SEARCH_API_LOG_INGEST_INTERVAL', 10))
+LOG_READ_CHUNK = 64 * 1024
+
+# Endpoints que no cuentan en la serie por módulo: health_check lo generan las
+# propias sondas de search_api cada pocos segundos y diluiría la latencia real
+MODULE_SERIES_EXCLUDED_ENDPOINTS = ('health_check',)
+
+LatencyRecord = namedtuple('LatencyRecord', ['module', 'endpoint', 'timestamp', 'latency_ms', 'available'])
+
+def tail_file(path, offset, chunk_size=LOG_READ_CHUNK):
+    """
+    Líneas completas del archivo desde el byte offset, con el offset siguiente a cada una.
+    Una línea a medio escribir (sin salto final) se deja para la próxima lectura.
+    """
+    with open(path, 'rb') as log_file:
+        log_file.seek(offset)
+        pending = b''
+        while True:
+            chunk = log_file.read(chunk_size)
+            if not chunk:
+                break
+            lines = (pending + chunk).split(b'\n')
+            pending = lines.pop()
+            for line in lines:
+                offset += len(line) + 1
+                yield line.decode('utf-8', errors='replace'), offset
+
+def tail_jsonl(path, offset):
+    """Registros de un archivo .telemetry.jsonl desde el byte offset (None si la línea no es JSON)"""
+    for line, next_offset in tail_file(path, offset):
+        try:
+            yield json.loads(line), next_offset
+        except ValueError:
+            yield None, next_offset
+
+def tail_binary(path, offset, chunk_size=LOG_READ_CHUNK):
+    """Registros completos de un archivo .telemetry.bin desde el byte offset"""
+    with open(path, 'rb') as telemetry_file:
+        telemetry_file.seek(offset)
+        pending = b''
+        while True:
+            chunk = telemetry_file.read(chunk_size)
+            if not chunk:
+                break
+            pending += chunk
+            consumed = 0
+            for record, consumed in decode_binary_records(pending):
+                yield record, offset + consumed
+            offset += consumed
+            pending = pending[consumed:]
+
+def parse_record(module, record):
+    """LatencyRecord de un registro de telemetría, o None si le faltan campos"""
+    try:
+        return LatencyRecord(
+            module, str(record["endpoint"]).lower(), float(record["ts"]),
+            float(record["latency_ms"]), int(record["status"]) < 500
+        )
+    except (KeyError, TypeError, ValueError):
+        return None
+
+def log_files(module):
+    """Archivos de telemetría del módulo en orden cronológico"""
+    log_dir, prefix = LOG_SOURCES[module]
+    try:
+        names = os.listdir(log_dir)
+    except OSError:
+        return []
+    return sorted(name for name in names if name.startswith(prefix) and name.endswith(TELEMETRY_EXTENSIONS))
+
+class LogIngester:
+    def __init__(self, store, modules=None, state_path=LOG_INGEST_STATE_PATH, interval=LOG_INGEST_INTERVAL):
+        """
+        Lectura incremental de la telemetría de los servicios (un registro por
+        petición, ver services/telemetry.py) hacia una TimeSeriesStore.
+        Por módulo se recuerda el archivo y el byte hasta donde se leyó; cada
+        pasada lee solo lo nuevo y sigue con los archivos de días posteriores
+        (rotación diaria). Cada muestra se registra bajo "módulo:endpoint" y, salvo
+        los health checks, también bajo "módulo". Con muestreo en el servicio
+        ({PREFIX}_TELEMETRY_SAMPLE_RATE < 1) las series ven solo las peticiones muestreadas.
+        Los offsets se guardan solo cuando la serie se volcó a disco sin errores,
+        así un reinicio no pierde líneas.
+        """
+        self.logger = setup_logger()
+        self.store = store
+        self.modules = list(LOG_SOURCES) if modules is None else list(modules)
+        self.state_path = state_path
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._positions = self._load_state()
+        self.records_read = 0
+        self.records_ingested = 0
+        self.passes = 0
+        self.last_pass_ms = None
+
+    def _load_state(self):
+        try:
+            with open(self.state_path, encoding='utf-8') as state_file:
+                return {module: tuple(position) for module, position in json.load(state_file).items()}
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self):
+        try:
+            os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+            temp_path = f"{self.state_path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as state_file:
+                json.dump(self._positions, state_file)
+            os.replace(temp_path, self.state_path)
+        except OSError as e:
+            self.logger.error(f"Log ingest state could not be saved path: {self.state_path} error: {str(e)}")
+
+    def iter_new_entries(self, module):
+        """
+        Registros de telemetría nuevos del módulo desde la última posición guardada.
+        La posición avanza cuando se pide el siguiente registro, es decir, cuando el
+        anterior ya se procesó. Si el archivo es más corto que el offset (truncado)
+        se relee desde cero.
+        """
+        current_file, current_offset = self._positions.get(module, (None, 0))
+        log_dir, _ = LOG_SOURCES[module]
+        for name in log_files(module):
+            if current_file is not None and name < current_file:
+                continue
+            offset = current_offset if name == current_file else 0
+            path = os.path.join(log_dir, name)
+            try:
+                if os.path.getsize(path) < offset:
+                    offset = 0
+                self._positions[module] = (name, offset)
+                tail = tail_binary if name.endswith('.bin') else tail_jsonl
+                for entry, next_offset in tail(path, offset):
+                    yield entry
+                    self._positions[module] = (name, next_offset)
+            except OSError as e:
+                self.logger.error(f"Log ingest could not read file: {path} error: {str(e)}")
+                return
+
+    def iter_records(self, module):
+        """LatencyRecords de los registros nuevos del módulo"""
+        for entry in self.iter_new_entries(module):
+            self.records_read += 1
+            record = parse_record(module, entry) if isinstance(entry, dict) else None
+            if record is not None:
+                yield record
+
+    def ingest(self):
+        """Una pasada por todos los módulos; devuelve cuántas muestras se registraron"""
+        with self._lock:
+            start = time.time()
+            ingested = 0
+            for module in self.modules:
+                for record in self.iter_records(module):
+                    if record.endpoint not in MODULE_SERIES_EXCLUDED_ENDPOINTS:
+                        self.store.record(record.module, record.timestamp, record.latency_ms, record.available)
+                    self.store.record(f"{record.module}:{record.endpoint}", record.timestamp, record.latency_ms, record.available)
+                    ingested += 1
+            # Si el volcado falla, las muestras siguen pendientes en la serie (se reintentan en
+            # la próxima pasada) y los offsets en disco se quedan donde estaban
+            if self.store.flush():
+                self._save_state()
+            self.records_ingested += ingested
+            self.passes += 1
+            self.last_pass_ms = round((time.time() - start) * 1000, 2)
+            return ingested
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                ingested = self.ingest()
+                if ingested:
+                    self.logger.info(f"Log ingest records: {ingested} latency: {self.last_pass_ms}ms")
+            except Exception as e:
+                self.logger.error(f"Log ingest pass failed: {str(e)}")
+            self._stop_event.wait(self.interval)
+
+    def start(self):
+        """Arrancar el hilo de ingesta (idempotente)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='log-ingester', daemon=True)
+        self._thread.start()
+        self.logger.info(f"Log ingester started interval: {self.interval}s modules: {self.modules}")
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+
+    def get_stats(self):
+        return {
+            "modules": self.modules,
+            "positions": {module: {"file": name, "offset": offset} for module, (name, offset) in self._positions.items()},
+            "records_read": self.records_read,
+            "records_ingested": self.records_ingested,
+            "passes": self.passes,
+            "last_pass_ms": self.last_pass_ms,
+            "running": self._thread is not None and self._thread.is_alive()
+        }
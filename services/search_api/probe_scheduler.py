@@ -0,0 +1,141 @@
+import os
+import time
+import threading
+from collections import namedtuple
+from types import MappingProxyType
+from logger import setup_logger
+
+# Cada cuántos segundos se sondea cada módulo en segundo plano
+PROBE_INTERVAL = float(os.environ.get('SEARCH_API_PROBE_INTERVAL', 5))
+# Resultados más viejos que esto no se sirven desde la caché (p. ej. si el hilo se detuvo)
+PROBE_MAX_AGE = float(os.environ.get('SEARCH_API_PROBE_MAX_AGE', 3 * PROBE_INTERVAL))
+
+ProbeResult = namedtuple('ProbeResult', ['status_code', 'latency_ms', 'available', 'probed_at'])
+
+class ProbeScheduler:
+    def __init__(self, probe_function, targets, interval=PROBE_INTERVAL, max_age=PROBE_MAX_AGE, listeners=()):
+        """
+        Sondeo periódico de los módulos en un hilo daemon.
+        probe_function(targets) devuelve ({módulo: (status, latency_ms, body)}, wall_clock_ms).
+        Los últimos resultados se guardan en un dict inmutable que se reemplaza
+        de una sola vez, así las lecturas no toman locks.
+        Cada listener recibe {módulo: ProbeResult} tras cada sondeo programado (p. ej. la
+        serie temporal); los sondeos en vivo pedidos por clientes no se notifican, así
+        la frecuencia de ?fresh=1 no sesga uptime ni percentiles.
+        """
+        self.logger = setup_logger()
+        self.probe_function = probe_function
+        self.targets = list(targets)
+        self.listeners = list(listeners)
+        self.interval = interval
+        self.max_age = max_age
+        self._results = MappingProxyType({})
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.runs = 0
+        self.last_run_at = None
+        self.last_run_ms = None
+        self._in_flight = {}
+        self.live_probes = 0
+        self.coalesced = 0
+
+    def probe(self, targets=None, scheduled=False):
+        """
+        Sondear ahora (todos o los targets dados) y actualizar la caché.
+        Solo los sondeos programados (scheduled=True) se entregan a los listeners.
+        Devuelve ({módulo: ProbeResult}, wall_clock_ms).
+        """
+        targets = self.targets if targets is None else targets
+        probes, wall_clock_ms = self.probe_function(targets)
+        now = time.time()
+        fresh = {
+            mod_name: ProbeResult(status, latency_ms, status == 200, now)
+            for mod_name, (status, latency_ms, _) in probes.items()
+        }
+        with self._lock:
+            results = dict(self._results)
+            results.update(fresh)
+            self._results = MappingProxyType(results)
+            self.runs += 1
+            self.last_run_at = now
+            self.last_run_ms = wall_clock_ms
+        for listener in self.listeners if scheduled else ():
+            try:
+                listener(fresh)
+            except Exception as e:
+                self.logger.error(f"Probe listener failed: {str(e)}")
+        return fresh, wall_clock_ms
+
+    def probe_live(self, targets):
+        """
+        Sondeo en vivo pedido por una petición (caché vacía/vencida o ?fresh=1).
+        Las peticiones concurrentes por los mismos módulos comparten una sola
+        sonda (single-flight), así la tasa de peticiones no se vuelve carga de sondeo.
+        """
+        key = tuple(sorted(mod_name for mod_name, _ in targets))
+        with self._lock:
+            call = self._in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = self._in_flight[key] = {"event": threading.Event(), "result": None, "error": None}
+                self.live_probes += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            call["event"].wait()
+            if call["error"] is not None:
+                raise call["error"]
+            return call["result"]
+        try:
+            call["result"] = self.probe(targets)
+            return call["result"]
+        except Exception as e:
+            call["error"] = e
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            call["event"].set()
+
+    def get_results(self, modules):
+        """Últimos resultados de los módulos pedidos, o None si alguno falta o está vencido"""
+        results = self._results
+        oldest_allowed = time.time() - self.max_age
+        if any(mod_name not in results or results[mod_name].probed_at < oldest_allowed for mod_name in modules):
+            return None
+        return {mod_name: results[mod_name] for mod_name in modules}
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.probe(scheduled=True)
+            except Exception as e:
+                self.logger.error(f"Background probe failed: {str(e)}")
+            self._stop_event.wait(self.interval)
+
+    def start(self):
+        """Arrancar el hilo de sondeo (idempotente)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='probe-scheduler', daemon=True)
+        self._thread.start()
+        self.logger.info(f"Probe scheduler started interval: {self.interval}s modules: {[mod_name for mod_name, _ in self.targets]}")
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+
+    def get_stats(self):
+        return {
+            "interval_seconds": self.interval,
+            "max_age_seconds": self.max_age,
+            "runs": self.runs,
+            "last_run_at": self.last_run_at,
+            "last_run_ms": self.last_run_ms,
+            "live_probes": self.live_probes,
+            "coalesced": self.coalesced,
+            "running": self._thread is not None and self._thread.is_alive()
+        }
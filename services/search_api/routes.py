@@ -1,8 +1,15 @@
 from flask import Blueprint, request, jsonify
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import os
+import re
 import time
 import requests
+from requests.adapters import HTTPAdapter
 from logger import setup_logger
+from probe_scheduler import ProbeScheduler
+from timeseries_store import TimeSeriesStore, RESOLUTIONS
+from log_ingest import LogIngester, LOG_TS_PATH
 
 logger = setup_logger()
 bp = Blueprint('search_api', __name__)
@@ -12,96 +19,194 @@ POKE_API_URL = "http://localhost:5001"
 POKE_STATS_URL = "http://localhost:5002"
 POKE_IMAGES_URL = "http://localhost:5003"
 
+MODULE_URLS = {
+    "poke_api": POKE_API_URL,
+    "poke_stats": POKE_STATS_URL,
+    "poke_images": POKE_IMAGES_URL,
+}
+
+# Timeout por sonda (segundos) e hilos para sondear los módulos en paralelo
+PROBE_TIMEOUT = float(os.environ.get('SEARCH_API_PROBE_TIMEOUT', 5))
+PROBE_WORKERS = int(os.environ.get('SEARCH_API_PROBE_WORKERS', 8))
+
+def create_probe_session(pool_size=PROBE_WORKERS):
+    """Sesión compartida con conexiones keep-alive hacia los módulos (sin reintentos: una sonda mide una sola petición)"""
+    adapter = HTTPAdapter(pool_connections=len(MODULE_URLS), pool_maxsize=pool_size, max_retries=0)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+probe_session = create_probe_session()
+probe_executor = ThreadPoolExecutor(max_workers=PROBE_WORKERS, thread_name_prefix='probe')
+
 def measure_latency(url, endpoint):
     full_url = f"{url}{endpoint}"
     start = time.time()
     try:
-        resp = requests.get(full_url, timeout=5)
+        resp = probe_session.get(full_url, timeout=PROBE_TIMEOUT)
         latency_ms = round((time.time() - start) * 1000, 2)
         logger.info(f"Request to {full_url} status: {resp.status_code}, latency: {latency_ms}ms")
         return resp.status_code, latency_ms, resp.json() if resp.ok else None
-    except requests.RequestException as e:
+    except (requests.RequestException, ValueError) as e:
         latency_ms = round((time.time() - start) * 1000, 2)
         logger.error(f"Request to {full_url} failed after {latency_ms}ms: {str(e)}")
         return None, latency_ms, None
 
+def resolve_targets(module):
+    """Lista de (módulo, url) a sondear, o None si el módulo no es válido"""
+    if module == 'all':
+        return list(MODULE_URLS.items())
+    if module in MODULE_URLS:
+        return [(module, MODULE_URLS[module])]
+    return None
+
+def probe_modules(targets, endpoint='/health'):
+    """
+    Sondear los módulos en paralelo: la latencia total es la del más lento
+    en lugar de la suma. Devuelve ({módulo: (status, latency_ms, body)}, wall_clock_ms).
+    """
+    start = time.time()
+    if len(targets) == 1:
+        mod_name, base_url = targets[0]
+        results = {mod_name: measure_latency(base_url, endpoint)}
+    else:
+        futures = {mod_name: probe_executor.submit(measure_latency, base_url, endpoint) for mod_name, base_url in targets}
+        results = {mod_name: future.result() for mod_name, future in futures.items()}
+    return results, round((time.time() - start) * 1000, 2)
+
+# Serie temporal de latencia y disponibilidad alimentada por cada sondeo
+timeseries_store = TimeSeriesStore()
+
+# Latencias por servicio y endpoint derivadas de la telemetría de los servicios
+log_timeseries_store = TimeSeriesStore(path=LOG_TS_PATH)
+log_ingester = LogIngester(log_timeseries_store)
+
+# Sondeo en segundo plano: los endpoints leen el último resultado en lugar de sondear por petición
+probe_scheduler = ProbeScheduler(probe_modules, MODULE_URLS.items(), listeners=[timeseries_store.record_probes])
+
+def get_probe_results(targets):
+    """
+    Resultados de las sondas desde la caché del scheduler, o en vivo con ?fresh=1
+    (o si todavía no hay resultados). Devuelve (resultados, origen, wall_clock_ms).
+    """
+    fresh = request.args.get('fresh', '').lower() in ('1', 'true', 'yes')
+    if not fresh:
+        cached = probe_scheduler.get_results([mod_name for mod_name, _ in targets])
+        if cached is not None:
+            return cached, "cache", None
+    results, wall_clock_ms = probe_scheduler.probe_live(targets)
+    return results, "live", wall_clock_ms
+
 @bp.route('/check_latency', methods=['GET'])
 def check_latency():
     module = request.args.get('module', 'all').lower()
     start_time = time.time()
     logger.info(f"Started latency check for module: {module}")
 
-    results = {}
-    targets = []
-    if module == 'all':
-        targets = [
-            ("poke_api", POKE_API_URL),
-            ("poke_stats", POKE_STATS_URL),
-            ("poke_images", POKE_IMAGES_URL),
-        ]
-    elif module in ['poke_api', 'poke_stats', 'poke_images']:
-        url_map = {
-            "poke_api": POKE_API_URL,
-            "poke_stats": POKE_STATS_URL,
-            "poke_images": POKE_IMAGES_URL,
-        }
-        targets = [(module, url_map[module])]
-    else:
+    targets = resolve_targets(module)
+    if targets is None:
         logger.warning(f"Invalid module param: {module}")
         return jsonify({"error": "Invalid module parameter"}), 400
 
-    for mod_name, base_url in targets:
-        status, latency_ms, _ = measure_latency(base_url, '/health')
+    probes, source, probe_wall_clock = get_probe_results(targets)
+    results = {}
+    for mod_name, probe in probes.items():
         results[mod_name] = {
-            "status_code": status,
-            "latency_ms": latency_ms
+            "status_code": probe.status_code,
+            "latency_ms": probe.latency_ms,
+            "probed_at": datetime.fromtimestamp(probe.probed_at).isoformat()
         }
 
     total_latency = round((time.time() - start_time) * 1000, 2)
-    logger.info(f"Completed latency check for module: {module} total_latency: {total_latency}ms")
+    logger.info(f"Completed latency check for module: {module} source: {source} total_latency: {total_latency}ms")
 
     return jsonify({
         "module": module,
         "results": results,
+        "source": source,
+        "probe_wall_clock_ms": probe_wall_clock,
         "total_latency_ms": total_latency,
         "timestamp": datetime.now().isoformat()
     })
+# period=LastN<Minutes|Hours|Days> -> resolución de los rollups a consultar
+PERIOD_PATTERN = re.compile(r'^last(\d+)(minutes|hours|days)$')
+PERIOD_RESOLUTIONS = {'minutes': 'minute', 'hours': 'hour', 'days': 'day'}
+GRAPH_STATS = ('avg', 'p50', 'p95', 'p99')
+GRAPH_SOURCES = ('probes', 'logs')
+
+def parse_period(period):
+    """(resolución, número de buckets) para el período, o None si no es válido o excede la retención"""
+    match = PERIOD_PATTERN.match(period)
+    if match is None:
+        return None
+    buckets = int(match.group(1))
+    resolution = PERIOD_RESOLUTIONS[match.group(2)]
+    step, retention = RESOLUTIONS[resolution]
+    if buckets < 1 or buckets * step > retention:
+        return None
+    return resolution, buckets
+
 @bp.route('/render_graph', methods=['GET'])
 def render_graph():
     """
-    Endpoint para renderizar datos para gráficos (simulados).
+    Endpoint para renderizar datos para gráficos desde los rollups de la serie temporal.
     Parámetros query:
     - metric: 'availability' o 'latency'
     - module: 'poke_api', 'poke_stats', 'poke_images' o 'all'
-    - period: 'Last5Days' o 'Last7Days'
+    - period: 'LastN' + 'Minutes', 'Hours' o 'Days' (p. ej. 'Last5Days', 'Last24Hours')
+    - stat: para latency, 'avg', 'p50', 'p95' o 'p99' (por defecto 'avg')
+    - source: 'probes' (sondas de /health, por defecto) o 'logs' (latencias de la telemetría de los servicios)
+    - endpoint: con source=logs, limitar a un endpoint (p. ej. 'get_pokemon'); availability es la tasa sin errores
+    data tiene un valor por bucket (el más reciente al final); None si no hubo muestras.
     """
     metric = request.args.get('metric', '').lower()
     module = request.args.get('module', 'all').lower()
     period = request.args.get('period', 'Last5Days').lower()
+    stat = request.args.get('stat', 'avg').lower()
+    source = request.args.get('source', 'probes').lower()
+    endpoint = request.args.get('endpoint', '').lower()
 
     logger.info(f"Render graph request metric={metric}, module={module}, period={period}")
 
     # Validaciones básicas
     if metric not in ['availability', 'latency']:
         return jsonify({"error": "Invalid metric parameter"}), 400
-    if module not in ['poke_api', 'poke_stats', 'poke_images', 'all']:
+    targets = resolve_targets(module)
+    if targets is None:
         return jsonify({"error": "Invalid module parameter"}), 400
-    if period not in ['last5days', 'last7days']:
+    parsed_period = parse_period(period)
+    if parsed_period is None:
         return jsonify({"error": "Invalid period parameter"}), 400
-
-    # Datos simulados para respuesta
-    mock_data = {
-        "last5days": [95, 96, 97, 95, 94] if metric == "availability" else [120, 110, 130, 115, 125],
-        "last7days": [94, 95, 96, 95, 93, 94, 92] if metric == "availability" else [125, 120, 130, 115, 135, 125, 140],
-    }
-
-    data = mock_data.get(period, [])
+    if stat not in GRAPH_STATS:
+        return jsonify({"error": "Invalid stat parameter"}), 400
+    if source not in GRAPH_SOURCES:
+        return jsonify({"error": "Invalid source parameter"}), 400
+    if endpoint and source != 'logs':
+        return jsonify({"error": "endpoint requires source=logs"}), 400
+
+    resolution, buckets = parsed_period
+    series_keys = [f"{mod_name}:{endpoint}" if endpoint else mod_name for mod_name, _ in targets]
+    store = log_timeseries_store if source == 'logs' else timeseries_store
+    series = store.get_series(series_keys, resolution, buckets)
+    value_key = "uptime_pct" if metric == "availability" else f"{stat}_ms"
+    data = []
+    details = []
+    for bucket_start, rollup in series:
+        summary = rollup.to_dict() if rollup is not None else None
+        data.append(summary[value_key] if summary is not None else None)
+        details.append({"bucket_start": datetime.fromtimestamp(bucket_start).isoformat(), **(summary or {"samples": 0})})
 
     response = {
         "metric": metric,
         "module": module,
         "period": period,
+        "resolution": resolution,
+        "stat": "uptime_pct" if metric == "availability" else stat,
+        "source": source,
+        "endpoint": endpoint or None,
         "data": data,
+        "buckets": details,
         "timestamp": datetime.now().isoformat()
     }
 
@@ -112,39 +217,27 @@ def check_availability():
     start_time = time.time()
     logger.info(f"Started availability check for module: {module}")
 
-    results = {}
-    targets = []
-    if module == 'all':
-        targets = [
-            ("poke_api", POKE_API_URL),
-            ("poke_stats", POKE_STATS_URL),
-            ("poke_images", POKE_IMAGES_URL),
-        ]
-    elif module in ['poke_api', 'poke_stats', 'poke_images']:
-        url_map = {
-            "poke_api": POKE_API_URL,
-            "poke_stats": POKE_STATS_URL,
-            "poke_images": POKE_IMAGES_URL,
-        }
-        targets = [(module, url_map[module])]
-    else:
+    targets = resolve_targets(module)
+    if targets is None:
         logger.warning(f"Invalid module param: {module}")
         return jsonify({"error": "Invalid module parameter"}), 400
 
-    for mod_name, base_url in targets:
-        try:
-            resp = requests.get(f"{base_url}/health", timeout=5)
-            available = resp.status_code == 200
-        except requests.RequestException:
-            available = False
-        results[mod_name] = available
+    probes, source, probe_wall_clock = get_probe_results(targets)
+    results = {}
+    latencies = {}
+    for mod_name, probe in probes.items():
+        results[mod_name] = probe.available
+        latencies[mod_name] = probe.latency_ms
 
     total_latency = round((time.time() - start_time) * 1000, 2)
-    logger.info(f"Completed availability check for module: {module} total_latency: {total_latency}ms")
+    logger.info(f"Completed availability check for module: {module} source: {source} total_latency: {total_latency}ms")
 
     return jsonify({
         "module": module,
         "availability": results,
+        "latency_ms": latencies,
+        "source": source,
+        "probe_wall_clock_ms": probe_wall_clock,
         "total_latency_ms": total_latency,
         "timestamp": datetime.now().isoformat()
     })
@@ -0,0 +1,355 @@
+import os
+import math
+import json
+import time
+import sqlite3
+import threading
+from array import array
+from logger import setup_logger
+
+# Archivo SQLite donde se vuelcan las muestras crudas y los rollups
+TS_PATH = os.environ.get(
+    'SEARCH_API_TS_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'timeseries.sqlite3')
+)
+TS_FLUSH_INTERVAL = float(os.environ.get('SEARCH_API_TS_FLUSH_INTERVAL', 10))
+# Muestras crudas que se guardan en memoria por módulo (y pendientes de volcar)
+TS_RING_CAPACITY = int(os.environ.get('SEARCH_API_TS_RING_CAPACITY', 4096))
+TS_RAW_RETENTION_DAYS = float(os.environ.get('SEARCH_API_TS_RAW_RETENTION_DAYS', 7))
+
+# Resolución -> (segundos por bucket, retención en segundos). Los buckets se alinean a UTC.
+RESOLUTIONS = {
+    'minute': (60, 2 * 86400),
+    'hour': (3600, 35 * 86400),
+    'day': (86400, 400 * 86400),
+}
+
+# Histograma de latencia con límites log-espaciados: los percentiles tienen
+# un error relativo de ~10% y los buckets se pueden sumar entre sí
+HISTOGRAM_BASE_MS = 1.0
+HISTOGRAM_GROWTH = 1.1
+
+def histogram_index(latency_ms):
+    if latency_ms <= HISTOGRAM_BASE_MS:
+        return 0
+    return int(math.log(latency_ms / HISTOGRAM_BASE_MS, HISTOGRAM_GROWTH)) + 1
+
+def histogram_upper_bound(index):
+    return HISTOGRAM_BASE_MS * HISTOGRAM_GROWTH ** index
+
+class Rollup:
+    """Agregado de un bucket: conteos de disponibilidad y histograma de latencia"""
+    __slots__ = ('count', 'up_count', 'latency_count', 'latency_sum', 'latency_min', 'latency_max', 'histogram')
+
+    def __init__(self):
+        self.count = 0
+        self.up_count = 0
+        self.latency_count = 0
+        self.latency_sum = 0.0
+        self.latency_min = None
+        self.latency_max = None
+        self.histogram = {}
+
+    def add(self, latency_ms, available):
+        self.count += 1
+        if available:
+            self.up_count += 1
+        # Sin respuesta (timeout, conexión rechazada) no hay latencia que agregar
+        if latency_ms is None:
+            return
+        self.latency_count += 1
+        self.latency_sum += latency_ms
+        self.latency_min = latency_ms if self.latency_min is None else min(self.latency_min, latency_ms)
+        self.latency_max = latency_ms if self.latency_max is None else max(self.latency_max, latency_ms)
+        index = histogram_index(latency_ms)
+        self.histogram[index] = self.histogram.get(index, 0) + 1
+
+    def merge(self, other):
+        self.count += other.count
+        self.up_count += other.up_count
+        self.latency_count += other.latency_count
+        self.latency_sum += other.latency_sum
+        for attr, pick in (('latency_min', min), ('latency_max', max)):
+            value = getattr(other, attr)
+            if value is not None:
+                current = getattr(self, attr)
+                setattr(self, attr, value if current is None else pick(current, value))
+        for index, value in other.histogram.items():
+            self.histogram[index] = self.histogram.get(index, 0) + value
+
+    def percentile(self, fraction):
+        """Percentil aproximado desde el histograma, acotado por el mínimo y máximo reales"""
+        if not self.latency_count:
+            return None
+        target = fraction * self.latency_count
+        cumulative = 0
+        for index in sorted(self.histogram):
+            cumulative += self.histogram[index]
+            if cumulative >= target:
+                return round(min(max(histogram_upper_bound(index), self.latency_min), self.latency_max), 2)
+        return round(self.latency_max, 2)
+
+    def to_dict(self):
+        return {
+            "samples": self.count,
+            "uptime_pct": round(self.up_count * 100 / self.count, 2) if self.count else None,
+            "avg_ms": round(self.latency_sum / self.latency_count, 2) if self.latency_count else None,
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "min_ms": self.latency_min,
+            "max_ms": self.latency_max
+        }
+
+class RingBuffer:
+    """
+    Buffer circular compacto de muestras crudas (arrays de tipos primitivos).
+    written cuenta todas las muestras escritas; las posiciones sirven para saber
+    qué falta volcar a disco y cuántas se perdieron por desborde.
+    """
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.timestamps = array('d', bytes(8 * capacity))
+        self.latencies = array('d', bytes(8 * capacity))
+        self.available = array('b', bytes(capacity))
+        self.written = 0
+
+    def append(self, timestamp, latency_ms, available):
+        position = self.written % self.capacity
+        self.timestamps[position] = timestamp
+        self.latencies[position] = math.nan if latency_ms is None else latency_ms
+        self.available[position] = 1 if available else 0
+        self.written += 1
+
+    def since(self, start):
+        """Muestras desde la posición start (las que sigan en el buffer) y cuántas se perdieron"""
+        oldest = max(0, self.written - self.capacity)
+        dropped = max(0, oldest - start)
+        samples = []
+        for sequence in range(max(start, oldest), self.written):
+            position = sequence % self.capacity
+            latency = self.latencies[position]
+            samples.append((self.timestamps[position], None if math.isnan(latency) else latency, bool(self.available[position])))
+        return samples, dropped
+
+class TimeSeriesStore:
+    def __init__(self, path=TS_PATH, flush_interval=TS_FLUSH_INTERVAL, ring_capacity=TS_RING_CAPACITY):
+        """
+        Serie temporal de latencia y disponibilidad por módulo.
+        - Cada muestra entra en un ring buffer en memoria y actualiza al momento
+          los rollups de minuto, hora y día (conteos + histograma de latencia).
+        - Un hilo vuelca periódicamente las muestras nuevas (append-only) y los
+          rollups modificados a SQLite; al arrancar se recargan los rollups.
+        Las consultas leen solo los buckets del período, sin recorrer muestras.
+        """
+        self.logger = setup_logger()
+        self.path = path
+        self.flush_interval = flush_interval
+        self.ring_capacity = ring_capacity
+        self._lock = threading.Lock()
+        # Serializa los volcados (hilo de volcado, stop_flusher, ingesta de logs)
+        self._flush_lock = threading.Lock()
+        self._rings = {}
+        self._flushed = {}
+        self._rollups = {resolution: {} for resolution in RESOLUTIONS}
+        self._dirty = set()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.samples_recorded = 0
+        self.samples_flushed = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.flush_errors = 0
+        self._disk_enabled = self._init_disk()
+        if self._disk_enabled:
+            self._load_rollups()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=5)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _init_disk(self):
+        """Crear las tablas si no existen; si falla, la serie vive solo en memoria"""
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with self._connect() as connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS samples ("
+                    "module TEXT NOT NULL, ts REAL NOT NULL, latency_ms REAL, available INTEGER NOT NULL)"
+                )
+                connection.execute("CREATE INDEX IF NOT EXISTS samples_ts ON samples (ts)")
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS rollups ("
+                    "resolution TEXT NOT NULL, module TEXT NOT NULL, bucket_start INTEGER NOT NULL, "
+                    "count INTEGER NOT NULL, up_count INTEGER NOT NULL, latency_count INTEGER NOT NULL, "
+                    "latency_sum REAL NOT NULL, latency_min REAL, latency_max REAL, histogram TEXT NOT NULL, "
+                    "PRIMARY KEY (resolution, module, bucket_start))"
+                )
+            return True
+        except sqlite3.Error as e:
+            self.logger.error(f"Time series disk disabled path: {self.path} error: {str(e)}")
+            return False
+
+    def _load_rollups(self):
+        """Recargar los rollups dentro de la retención de cada resolución"""
+        now = time.time()
+        loaded = 0
+        try:
+            with self._connect() as connection:
+                for resolution, (_, retention) in RESOLUTIONS.items():
+                    rows = connection.execute(
+                        "SELECT module, bucket_start, count, up_count, latency_count, latency_sum, "
+                        "latency_min, latency_max, histogram FROM rollups WHERE resolution = ? AND bucket_start >= ?",
+                        (resolution, int(now - retention))
+                    )
+                    for module, bucket_start, count, up_count, latency_count, latency_sum, latency_min, latency_max, histogram in rows:
+                        rollup = Rollup()
+                        rollup.count, rollup.up_count, rollup.latency_count = count, up_count, latency_count
+                        rollup.latency_sum, rollup.latency_min, rollup.latency_max = latency_sum, latency_min, latency_max
+                        rollup.histogram = {int(index): value for index, value in json.loads(histogram).items()}
+                        self._rollups[resolution][(module, bucket_start)] = rollup
+                        loaded += 1
+        except sqlite3.Error as e:
+            self.logger.error(f"Time series rollups could not be loaded error: {str(e)}")
+        self.logger.info(f"Time series loaded rollups: {loaded} path: {self.path}")
+
+    def record(self, module, timestamp, latency_ms, available):
+        """Registrar una muestra y actualizar sus rollups"""
+        with self._lock:
+            ring = self._rings.get(module)
+            if ring is None:
+                ring = self._rings[module] = RingBuffer(self.ring_capacity)
+                self._flushed[module] = 0
+            ring.append(timestamp, latency_ms, available)
+            for resolution, (step, _) in RESOLUTIONS.items():
+                key = (module, int(timestamp // step * step))
+                rollup = self._rollups[resolution].get(key)
+                if rollup is None:
+                    rollup = self._rollups[resolution][key] = Rollup()
+                rollup.add(latency_ms, available)
+                self._dirty.add((resolution, key))
+            self.samples_recorded += 1
+
+    def record_probes(self, results):
+        """Listener del ProbeScheduler: {módulo: ProbeResult} de los sondeos programados"""
+        for module, probe in results.items():
+            latency_ms = probe.latency_ms if probe.status_code is not None else None
+            self.record(module, probe.probed_at, latency_ms, probe.available)
+
+    def get_series(self, modules, resolution, buckets, end=None):
+        """
+        Los últimos `buckets` buckets de la resolución (el actual incluido),
+        combinando los módulos pedidos. Devuelve [(bucket_start, Rollup o None)].
+        """
+        step, _ = RESOLUTIONS[resolution]
+        end = time.time() if end is None else end
+        last_start = int(end // step * step)
+        series = []
+        with self._lock:
+            rollups = self._rollups[resolution]
+            for bucket_start in range(last_start - (buckets - 1) * step, last_start + step, step):
+                merged = None
+                for module in modules:
+                    rollup = rollups.get((module, bucket_start))
+                    if rollup is not None:
+                        if merged is None:
+                            merged = Rollup()
+                        merged.merge(rollup)
+                series.append((bucket_start, merged))
+        return series
+
+    def flush(self):
+        """
+        Volcar las muestras nuevas y los rollups modificados a SQLite y podar lo vencido.
+        Las posiciones volcadas y el conjunto de rollups modificados solo se actualizan
+        si la escritura se confirma; si falla, la próxima pasada reintenta lo mismo.
+        Devuelve True si todo lo pendiente quedó en disco (o no hay disco), False si falló.
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending = []
+                cursors = {}
+                dropped = 0
+                for module, ring in self._rings.items():
+                    samples, module_dropped = ring.since(self._flushed[module])
+                    dropped += module_dropped
+                    pending.extend((module, ts, latency, int(available)) for ts, latency, available in samples)
+                    cursors[module] = ring.written
+                dirty_keys = self._dirty
+                self._dirty = set()
+                dirty = []
+                for resolution, key in dirty_keys:
+                    rollup = self._rollups[resolution].get(key)
+                    if rollup is not None:
+                        dirty.append((
+                            resolution, key[0], key[1], rollup.count, rollup.up_count, rollup.latency_count,
+                            rollup.latency_sum, rollup.latency_min, rollup.latency_max, json.dumps(rollup.histogram)
+                        ))
+                # Poda en memoria de buckets fuera de retención
+                now = time.time()
+                for resolution, (_, retention) in RESOLUTIONS.items():
+                    oldest = now - retention
+                    rollups = self._rollups[resolution]
+                    for key in [key for key in rollups if key[1] < oldest]:
+                        del rollups[key]
+
+            if self._disk_enabled and (pending or dirty):
+                try:
+                    with self._connect() as connection:
+                        connection.executemany("INSERT INTO samples (module, ts, latency_ms, available) VALUES (?, ?, ?, ?)", pending)
+                        connection.executemany(
+                            "INSERT OR REPLACE INTO rollups (resolution, module, bucket_start, count, up_count, latency_count, "
+                            "latency_sum, latency_min, latency_max, histogram) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", dirty
+                        )
+                        connection.execute("DELETE FROM samples WHERE ts < ?", (now - TS_RAW_RETENTION_DAYS * 86400,))
+                        for resolution, (_, retention) in RESOLUTIONS.items():
+                            connection.execute("DELETE FROM rollups WHERE resolution = ? AND bucket_start < ?", (resolution, int(now - retention)))
+                except sqlite3.Error as e:
+                    with self._lock:
+                        # Los rollups se vuelven a marcar para reescribirlos con su estado más reciente
+                        self._dirty |= dirty_keys
+                        self.flush_errors += 1
+                    self.logger.error(f"Time series flush failed samples: {len(pending)} error: {str(e)}")
+                    return False
+
+            with self._lock:
+                self._flushed.update(cursors)
+                self.dropped += dropped
+                if self._disk_enabled and (pending or dirty):
+                    self.samples_flushed += len(pending)
+                    self.flushes += 1
+            return True
+
+    def _run(self):
+        while not self._stop_event.wait(self.flush_interval):
+            self.flush()
+
+    def start_flusher(self):
+        """Arrancar el hilo de volcado a disco (idempotente)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='timeseries-flusher', daemon=True)
+        self._thread.start()
+
+    def stop_flusher(self):
+        """Detener el hilo y volcar lo pendiente"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 1)
+        self.flush()
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                "modules": sorted(self._rings),
+                "samples_recorded": self.samples_recorded,
+                "samples_flushed": self.samples_flushed,
+                "dropped": self.dropped,
+                "rollup_buckets": {resolution: len(rollups) for resolution, rollups in self._rollups.items()},
+                "flushes": self.flushes,
+                "flush_errors": self.flush_errors,
+                "path": self.path if self._disk_enabled else None
+            }
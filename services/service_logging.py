@@ -0,0 +1,114 @@
+"""
+Logging asíncrono compartido por los servicios Flask.
+Cada servicio lo configura desde su logger.py con setup_service_logger(...):
+nombre del logger, prefijo de las variables de entorno, directorio y formato
+de fecha del archivo diario. Variables: {env_prefix}_LOG_LEVEL (nivel mínimo; los
+mensajes por debajo se descartan antes de formatearse), {env_prefix}_LOG_ASYNC
+(0 = escribir en el hilo de la petición) y {env_prefix}_LOG_QUEUE_SIZE (registros
+en espera del hilo escritor; si se llena, los nuevos se descartan y se cuentan).
+Los servicios se ejecutan desde su propio directorio, así que agregan services/ al
+sys.path antes de importar este módulo.
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+
+class StandardFormatter(logging.Formatter):
+    """
+    Formato: {Fecha}|{Modulo}|{API}|{Funcion} Message
+    La fecha sale del registro y el mensaje se interpola aquí, en el hilo escritor.
+    """
+    def format(self, record):
+        return f"{datetime.fromtimestamp(record.created).isoformat()}|{record.getMessage()}"
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler que no bloquea: con la cola llena descarta el registro y lo cuenta"""
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self._counters_lock = threading.Lock()
+        self.enqueued = 0
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Sin formatear: el hilo escritor lo hace con los handlers de destino
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+            counter = "enqueued"
+        except queue.Full:
+            counter = "dropped"
+        # Los hilos de las peticiones escriben a la vez: += sin lock pierde cuentas
+        with self._counters_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get_counters(self):
+        with self._counters_lock:
+            return self.enqueued, self.dropped
+
+def setup_service_logger(name, env_prefix, log_dir, date_format='%Y%m%d'):
+    """
+    Configurar el logger estándar del servicio (una sola vez por proceso).
+    Formato: {Fecha}|{Modulo}|{API}|{Funcion} Message
+    Los registros pasan por una cola acotada y un hilo escribe en archivo y consola.
+    """
+
+    #configurar logger
+    logger = logging.getLogger(name)
+    logger.setLevel(os.environ.get(f'{env_prefix}_LOG_LEVEL', 'INFO').upper())
+
+    #evitar duplicar handlers si ya está configurado
+    if logger.handlers:
+        return logger
+
+    # Crear directorio de logs si no existe
+    os.makedirs(log_dir, exist_ok=True)
+
+    # Nombre del archivo de log con fecha
+    log_filename = f"{name}_{datetime.now().strftime(date_format)}.log"
+    log_path = os.path.join(log_dir, log_filename)
+
+    # Handler para archivo
+    file_handler = logging.FileHandler(log_path, encoding='utf-8')
+    file_handler.setFormatter(StandardFormatter())
+
+    # Handler para consola
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(StandardFormatter())
+
+    if os.environ.get(f'{env_prefix}_LOG_ASYNC', '1') == '0':
+        logger.addHandler(file_handler)
+        logger.addHandler(console_handler)
+        return logger
+
+    # Cola + hilo escritor: el I/O de disco y consola sale del hilo de la petición
+    queue_size = int(os.environ.get(f'{env_prefix}_LOG_QUEUE_SIZE', 10000))
+    queue_handler = DroppingQueueHandler(queue.Queue(queue_size))
+    listener = QueueListener(queue_handler.queue, file_handler, console_handler, respect_handler_level=True)
+    listener.start()
+    # Vaciar la cola al salir
+    atexit.register(listener.stop)
+    logger.addHandler(queue_handler)
+
+    return logger
+
+def service_logging_stats(name):
+    """Registros encolados y descartados por el handler asíncrono del logger name"""
+    logger = logging.getLogger(name)
+    for handler in logger.handlers:
+        if isinstance(handler, DroppingQueueHandler):
+            enqueued, dropped = handler.get_counters()
+            return {
+                "async": True,
+                "level": logging.getLevelName(logger.level),
+                "enqueued": enqueued,
+                "dropped": dropped,
+                "pending": handler.queue.qsize(),
+                "queue_size": handler.queue.maxsize
+            }
+    return {"async": False, "level": logging.getLevelName(logger.level)}
@@ -0,0 +1,331 @@
+"""
+Telemetría estructurada por petición, compartida por los servicios Flask.
+Cada servicio la activa con init_telemetry(app, service=..., env_prefix=..., log_dir=...);
+la configuración se lee de {env_prefix}_TELEMETRY* (p. ej. POKE_API_TELEMETRY_SAMPLE_RATE).
+Los servicios se ejecutan desde su propio directorio; su logger.py agrega services/
+al sys.path (ver service_logging.py), así que este módulo se importa después del logger.
+"""
+import atexit
+import json
+import logging
+import math
+import os
+import queue
+import random
+import struct
+import threading
+import time
+from datetime import datetime
+from flask import g, request, has_request_context
+
+# Registro binario little-endian: timestamp, latencia, latencia downstream (NaN si no hubo),
+# status, bytes de respuesta (0xFFFFFFFF si se desconoce), índice del método y largo del
+# endpoint; a continuación el endpoint en UTF-8
+BINARY_RECORD = struct.Struct('<dffHIBB')
+BINARY_UNKNOWN_SIZE = 0xFFFFFFFF
+METHODS = ('GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'HEAD', 'OPTIONS')
+
+def parse_endpoint_rates(value):
+    """'a=0.1,b=0' -> {'a': 0.1, 'b': 0.0}"""
+    rates = {}
+    for item in value.split(','):
+        endpoint, _, rate = item.partition('=')
+        if endpoint.strip() and rate.strip():
+            rates[endpoint.strip()] = float(rate)
+    return rates
+
+def encode_binary(record):
+    endpoint = record["endpoint"].encode('utf-8')[:255]
+    method = METHODS.index(record["method"]) if record["method"] in METHODS else 255
+    downstream = math.nan if record["downstream_ms"] is None else record["downstream_ms"]
+    size = BINARY_UNKNOWN_SIZE if record["response_bytes"] is None else min(record["response_bytes"], BINARY_UNKNOWN_SIZE - 1)
+    return BINARY_RECORD.pack(
+        record["ts"], record["latency_ms"], downstream, record["status"], size, method, len(endpoint)
+    ) + endpoint
+
+def decode_binary_records(data):
+    """
+    Registros completos de un bloque de telemetría binaria, cada uno con el offset
+    siguiente. Un registro a medio escribir al final del bloque se ignora.
+    """
+    offset = 0
+    while offset + BINARY_RECORD.size <= len(data):
+        ts, latency, downstream, status, size, method, endpoint_length = BINARY_RECORD.unpack_from(data, offset)
+        end = offset + BINARY_RECORD.size + endpoint_length
+        if end > len(data):
+            break
+        endpoint = data[offset + BINARY_RECORD.size:end].decode('utf-8', errors='replace')
+        offset = end
+        yield {
+            "ts": ts,
+            "endpoint": endpoint,
+            "method": METHODS[method] if method < len(METHODS) else None,
+            "status": status,
+            "latency_ms": round(latency, 3),
+            "downstream_ms": None if math.isnan(downstream) else round(downstream, 3),
+            "response_bytes": None if size == BINARY_UNKNOWN_SIZE else size
+        }, offset
+
+def read_binary_records(path):
+    """Decodificar un archivo de telemetría binaria (dicts con las mismas claves que el JSON)"""
+    with open(path, 'rb') as telemetry_file:
+        data = telemetry_file.read()
+    for record, _ in decode_binary_records(data):
+        yield record
+
+def add_downstream_latency(latency_ms):
+    """Sumar tiempo de llamadas a dependencias a la petición en curso (sin petición no hace nada)"""
+    if has_request_context():
+        g.telemetry_downstream_ms = g.get('telemetry_downstream_ms', 0.0) + latency_ms
+
+def telemetry_enabled(env_prefix):
+    """{env_prefix}_TELEMETRY=0 desactiva la telemetría del servicio"""
+    return os.environ.get(f'{env_prefix}_TELEMETRY', '1') != '0'
+
+class TelemetryRecorder:
+    def __init__(self, service, directory, record_format='jsonl', sample_rate=1.0, endpoint_rates='',
+                 slow_ms=500, queue_size=10000):
+        """
+        Registro por petición (endpoint, método, status, latencia, bytes de respuesta
+        y latencia downstream) con muestreo. El hilo de la petición solo decide si se
+        muestrea y encola una tupla; un hilo escritor codifica y escribe en un
+        archivo diario. Con la cola llena el registro se descarta y se cuenta.
+        """
+        if record_format not in ('jsonl', 'binary'):
+            raise ValueError(f"Unknown telemetry format: {record_format}")
+        self.logger = logging.getLogger(service)
+        self.service = service
+        self.directory = directory
+        self.record_format = record_format
+        self.sample_rate = sample_rate
+        self.endpoint_rates = parse_endpoint_rates(endpoint_rates) if isinstance(endpoint_rates, str) else dict(endpoint_rates)
+        self.slow_ms = slow_ms
+        self._queue = queue.Queue(queue_size)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._file = None
+        self._file_day = None
+        self.seen = 0
+        self.sampled = 0
+        self.dropped = 0
+        self.written = 0
+        self.bytes_written = 0
+
+    @classmethod
+    def from_env(cls, service, env_prefix, log_dir):
+        """
+        Recorder configurado con las variables {env_prefix}_TELEMETRY_*:
+        FORMAT ('jsonl' o 'binary'), SAMPLE_RATE (fracción registrada; errores 5xx y
+        peticiones lentas se registran siempre), ENDPOINT_RATES ("get_pokemon=0.05,health_check=0"),
+        SLOW_MS, QUEUE_SIZE y DIR (por defecto {log_dir}/telemetry)
+        """
+        setting = lambda name, default: os.environ.get(f'{env_prefix}_TELEMETRY_{name}', default)
+        return cls(
+            service,
+            setting('DIR', os.path.join(log_dir, 'telemetry')),
+            record_format=setting('FORMAT', 'jsonl').lower(),
+            sample_rate=float(setting('SAMPLE_RATE', 1.0)),
+            endpoint_rates=setting('ENDPOINT_RATES', ''),
+            slow_ms=float(setting('SLOW_MS', 500)),
+            queue_size=int(setting('QUEUE_SIZE', 10000))
+        )
+
+    def should_sample(self, endpoint, status, latency_ms):
+        if status >= 500 or latency_ms >= self.slow_ms:
+            return True
+        rate = self.endpoint_rates.get(endpoint, self.sample_rate)
+        return rate >= 1 or random.random() < rate
+
+    def record(self, endpoint, method, status, latency_ms, response_bytes=None, downstream_ms=None):
+        sampled = self.should_sample(endpoint, status, latency_ms)
+        with self._lock:
+            self.seen += 1
+            if not sampled:
+                return False
+            self.sampled += 1
+        try:
+            self._queue.put_nowait((time.time(), endpoint, method, status, latency_ms, response_bytes, downstream_ms))
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+
+    def _open_file(self, now):
+        day = datetime.fromtimestamp(now).strftime('%Y%m%d')
+        if self._file is not None and day == self._file_day:
+            return self._file
+        if self._file is not None:
+            self._file.close()
+        os.makedirs(self.directory, exist_ok=True)
+        extension = 'jsonl' if self.record_format == 'jsonl' else 'bin'
+        self._file = open(os.path.join(self.directory, f"{self.service}_{day}.telemetry.{extension}"), 'ab')
+        self._file_day = day
+        return self._file
+
+    def _encode(self, item):
+        ts, endpoint, method, status, latency_ms, response_bytes, downstream_ms = item
+        record = {
+            "ts": ts,
+            "endpoint": endpoint,
+            "method": method,
+            "status": status,
+            "latency_ms": round(latency_ms, 3),
+            "downstream_ms": None if downstream_ms is None else round(downstream_ms, 3),
+            "response_bytes": response_bytes
+        }
+        if self.record_format == 'binary':
+            return encode_binary(record)
+        return (json.dumps(record, separators=(',', ':')) + '\n').encode('utf-8')
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            # Escribir en lote todo lo que ya esté en la cola
+            batch = [item]
+            stop = False
+            while len(batch) < 1000:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            try:
+                telemetry_file = self._open_file(batch[-1][0])
+                payload = b''.join(self._encode(entry) for entry in batch)
+                telemetry_file.write(payload)
+                telemetry_file.flush()
+                self.written += len(batch)
+                self.bytes_written += len(payload)
+            except (OSError, ValueError) as e:
+                self.logger.error("%s|TELEMETRY|write Failed - Records: %s - Error: %s", self.service.upper(), len(batch), e)
+            if stop:
+                break
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def start(self):
+        """Arrancar el hilo escritor (idempotente)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name='telemetry-writer', daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        """Escribir lo pendiente y detener el hilo"""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        try:
+            self._queue.put(None, timeout=5)
+        except queue.Full:
+            return
+        self._thread.join(timeout=5)
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                "enabled": True,
+                "format": self.record_format,
+                "sample_rate": self.sample_rate,
+                "endpoint_rates": self.endpoint_rates,
+                "slow_ms": self.slow_ms,
+                "seen": self.seen,
+                "sampled": self.sampled,
+                "dropped": self.dropped,
+                "written": self.written,
+                "bytes_written": self.bytes_written,
+                "pending": self._queue.qsize(),
+                "directory": self.directory
+            }
+
+def request_latency_ms():
+    """
+    Milisegundos transcurridos desde el inicio de la petición en curso (para el
+    campo latency_ms de las respuestas), o None fuera de una petición.
+    """
+    if not has_request_context() or g.get('telemetry_start') is None:
+        return None
+    return round((time.perf_counter() - g.telemetry_start) * 1000, 2)
+
+def init_telemetry(app, service, env_prefix, log_dir, recorder=None):
+    """
+    Middleware para una app Flask: mide cada petición con before/after_request y
+    la entrega al recorder (por defecto, TelemetryRecorder.from_env del servicio).
+    Reemplaza el cronometraje y las líneas "Completed - Latency" escritas a mano en
+    cada ruta. En respuestas en streaming la latencia llega hasta que se envían las
+    cabeceras y el tamaño (sin Content-Length) es desconocido.
+    Devuelve el recorder, o None si la telemetría está desactivada (el inicio de la
+    petición se sigue midiendo para request_latency_ms).
+    """
+    @app.before_request
+    def start_request_telemetry():
+        g.telemetry_start = time.perf_counter()
+
+    if recorder is None:
+        if not telemetry_enabled(env_prefix):
+            return None
+        recorder = TelemetryRecorder.from_env(service, env_prefix, log_dir)
+    recorder.start()
+
+    @app.after_request
+    def record_request_telemetry(response):
+        start = g.get('telemetry_start')
+        if start is not None:
+            recorder.record(
+                request.endpoint or 'unknown',
+                request.method,
+                response.status_code,
+                (time.perf_counter() - start) * 1000,
+                response.content_length,
+                g.get('telemetry_downstream_ms')
+            )
+        return response
+
+    return recorder
+
+def init_aiohttp_telemetry(app, service, env_prefix, log_dir, recorder=None):
+    """
+    Equivalente de init_telemetry para una aplicación aiohttp (modo asyncio de
+    poke_api_service): un middleware registra cada petición con el nombre del
+    handler como endpoint, igual que el endpoint de Flask. Sin contexto de Flask
+    no hay latencia downstream. Devuelve el recorder, o None si está desactivada.
+    """
+    from aiohttp import web
+
+    if recorder is None:
+        if not telemetry_enabled(env_prefix):
+            return None
+        recorder = TelemetryRecorder.from_env(service, env_prefix, log_dir)
+    recorder.start()
+
+    @web.middleware
+    async def record_request_telemetry(request, handler):
+        start = time.perf_counter()
+        status = 500
+        response = None
+        try:
+            response = await handler(request)
+            status = response.status
+            return response
+        except web.HTTPException as e:
+            status = e.status
+            raise
+        finally:
+            recorder.record(
+                getattr(handler, '__name__', 'unknown'),
+                request.method,
+                status,
+                (time.perf_counter() - start) * 1000,
+                response.content_length if response is not None else None,
+                None
+            )
+
+    app.middlewares.append(record_request_telemetry)
+    return recorder